@@ -0,0 +1,6 @@
+# import necessary modules
+import os
+import sys
+
+# make the generator modules importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
@@ -0,0 +1,62 @@
+# import necessary modules
+import sys
+import argparse
+import tempfile
+from benchmarks.corpus import DEFAULT_CORPUS, generate_corpus
+from benchmarks.suite import BENCHMARKS, DEFAULT_THRESHOLD, run_benchmarks, save_results, load_results, compare_results, remove_corpus
+
+# parse command line arguments
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks",
+                                     description="Benchmark the generator against a reproducible synthetic site.")
+    parser.add_argument("--pages", type=int, default=DEFAULT_CORPUS["pages"], help="number of pages (default: %(default)s)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_CORPUS["page_size"],
+                        help="approximate characters of markdown per page (default: %(default)s)")
+    parser.add_argument("--link-density", type=float, default=DEFAULT_CORPUS["link_density"],
+                        help="fraction of words that are links (default: %(default)s)")
+    parser.add_argument("--code-density", type=float, default=DEFAULT_CORPUS["code_density"],
+                        help="fraction of blocks that are code blocks (default: %(default)s)")
+    parser.add_argument("--depth", type=int, default=DEFAULT_CORPUS["depth"],
+                        help="directory levels pages are spread across (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_CORPUS["seed"], help="random seed (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5, help="repeats per benchmark, the best is kept (default: %(default)s)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), metavar="NAME",
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--output", "-o", metavar="FILE", help="write the results to a json file")
+    parser.add_argument("--baseline", metavar="FILE", help="compare the results with a stored baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fraction slower than the baseline that counts as a regression (default: %(default)s)")
+    return parser.parse_args(argv)
+
+# main function - returns the exit status, 1 if any benchmark regressed
+def main(argv=None):
+    args = parse_args(argv)
+    corpus = {"pages": args.pages, "page_size": args.page_size, "link_density": args.link_density,
+              "code_density": args.code_density, "depth": args.depth, "seed": args.seed}
+
+    # generate the corpus and run the benchmarks
+    root = tempfile.mkdtemp(prefix="ssg-bench-")
+    try:
+        sources = generate_corpus(root, **corpus)
+        print(f"corpus: {corpus}")
+        results = run_benchmarks(root, sources, corpus, args.only, args.repeat)
+    finally:
+        remove_corpus(root)
+
+    if args.output:
+        save_results(results, args.output)
+
+    # report any regressions against the baseline
+    if args.baseline:
+        regressed = False
+        print(f"\ncompared with {args.baseline} (threshold {args.threshold:.0%}):")
+        for name, previous, current, ratio, slower in compare_results(results, load_results(args.baseline), args.threshold):
+            marker = "  REGRESSION" if slower else ""
+            print(f"{name:24s} {previous * 1e3:10.2f} ms -> {current * 1e3:10.2f} ms  {ratio:6.2f}x{marker}")
+            regressed = regressed or slower
+        return 1 if regressed else 0
+    return 0
+
+# run the benchmarks if this package is executed
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+# import necessary modules
+import os
+import sys
+import timeit
+
+# make the generator modules importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from markdown_blocks import markdown_to_blocks, markdown_to_html_node
+
+# number of sections in the synthetic document
+SECTIONS = 2000
+
+# build a large synthetic markdown document covering every block type
+def synthetic_document(sections):
+    parts = ["# Synthetic document"]
+    for i in range(sections):
+        parts.append(f"## Section {i}")
+        parts.append(f"A paragraph about section {i} with **bold** text\nthat continues on a second line.")
+        parts.append(f"```\ndef section_{i}():\n    return {i}\n```")
+        parts.append(f"> a quote about\n> section {i}")
+        parts.append("1. first\n2. second\n3. third")
+        parts.append("- one\n- two\n- three")
+    return "\n\n".join(parts)
+
+# time splitting and converting a large document
+def main():
+    markdown = synthetic_document(SECTIONS)
+    blocks = min(timeit.repeat(lambda: markdown_to_blocks(markdown), number=5, repeat=5)) / 5
+    convert = min(timeit.repeat(lambda: markdown_to_html_node(markdown), number=5, repeat=5)) / 5
+    print(f"document size:         {len(markdown) / 1024:8.1f} KiB")
+    print(f"markdown_to_blocks:    {blocks * 1e3:8.2f} ms")
+    print(f"markdown_to_html_node: {convert * 1e3:8.2f} ms")
+
+# run the benchmark if this script is executed
+if __name__ == "__main__":
+    main()
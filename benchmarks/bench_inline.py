@@ -0,0 +1,50 @@
+# import necessary modules
+import os
+import sys
+import timeit
+
+# make the generator modules importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from split_nodes import text_to_textnodes, split_nodes_delimiter, split_nodes_link, split_nodes_image
+from textnode import TextNode, TextType
+
+# number of paragraphs tokenized per measurement
+RUNS = 200
+
+# number of alternating measurements of each approach
+ROUNDS = 7
+
+# the five-pass pipeline text_to_textnodes used before the single-pass scanner
+def text_to_textnodes_five_pass(text):
+    nodes = [TextNode(text, TextType.PLAIN)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_link(nodes)
+    return split_nodes_image(nodes)
+
+# compare the five-pass pipeline with the single-pass scanner on a few paragraph shapes
+def main():
+    paragraphs = {
+        "links-100": " ".join(f"see [page {i}](https://example.com/page{i}) and" for i in range(100)),
+        "links-1000": " ".join(f"see [page {i}](https://example.com/page{i}) and" for i in range(1000)),
+        "image-heavy": " ".join(f"look ![img {i}](/images/{i}.png) here" for i in range(100)),
+        "mixed": " ".join(f"**bold {i}** then _italic_ and `code` with [a link](/x{i})" for i in range(50)),
+        "plain": "just some plain words without any markup at all " * 50,
+    }
+
+    for name, text in paragraphs.items():
+        # check both approaches produce the same nodes
+        assert text_to_textnodes(text) == text_to_textnodes_five_pass(text)
+
+        # take the best of several runs to reduce noise, alternating the two approaches so a change in load
+        # during the measurement affects both alike
+        before = after = float("inf")
+        for _ in range(ROUNDS):
+            before = min(before, timeit.timeit(lambda: text_to_textnodes_five_pass(text), number=RUNS))
+            after = min(after, timeit.timeit(lambda: text_to_textnodes(text), number=RUNS))
+        print(f"{name:12} five-pass: {before / RUNS * 1e6:9.1f} us  single-pass: {after / RUNS * 1e6:9.1f} us  speedup: {before / after:6.2f}x")
+
+# run the benchmark if this script is executed
+if __name__ == "__main__":
+    main()
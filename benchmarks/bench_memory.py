@@ -0,0 +1,62 @@
+# import necessary modules
+import os
+import sys
+import resource
+import tracemalloc
+
+# make the generator modules importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from markdown_blocks import markdown_to_html_node
+from split_nodes import text_to_textnodes
+
+# number of sections in the synthetic document
+SECTIONS = 5000
+
+# build a large synthetic markdown document with plenty of inline runs
+def synthetic_document(sections):
+    parts = ["# Synthetic document"]
+    for i in range(sections):
+        parts.append(f"## Section {i}")
+        parts.append(f"Some **bold {i}** text, some _italic_ text, `code {i}` and a [link](/page/{i}) in a paragraph.")
+        parts.append(f"- first item with ![image](/images/{i}.png)\n- second item\n- third **item**")
+        parts.append(f"> a quote about section {i}")
+    return "\n\n".join(parts)
+
+# count every node in an HTMLNode tree
+def count_nodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        count += 1
+        if item.children:
+            stack.extend(item.children)
+    return count
+
+# measure the memory held by a list of text nodes and an html tree built from the document
+def main():
+    markdown = synthetic_document(SECTIONS)
+    paragraph = " ".join(f"**b{i}** and _i{i}_ and [l{i}](/x{i})" for i in range(SECTIONS))
+
+    # measure text nodes
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    text_nodes = text_to_textnodes(paragraph)
+    text_bytes = tracemalloc.get_traced_memory()[0] - before
+
+    # measure the html tree
+    before = tracemalloc.get_traced_memory()[0]
+    html_node = markdown_to_html_node(markdown)
+    html_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    html_count = count_nodes(html_node)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # kilobytes on linux
+
+    print(f"text nodes: {len(text_nodes):8d}  {text_bytes / len(text_nodes):7.1f} bytes/node (incl. strings)")
+    print(f"html nodes: {html_count:8d}  {html_bytes / html_count:7.1f} bytes/node (incl. strings and lists)")
+    print(f"peak rss:   {peak_rss / 1024:8.1f} MiB")
+
+# run the benchmark if this script is executed
+if __name__ == "__main__":
+    main()
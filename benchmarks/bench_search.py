@@ -0,0 +1,110 @@
+# import necessary modules
+import os
+import sys
+import time
+import random
+import shutil
+import logging
+import tempfile
+import statistics
+from itertools import accumulate
+
+# make the generator modules importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from document import Document
+from search import SearchIndex, query_index
+
+# size of the synthetic corpus - pages, distinct words, and words per page
+PAGES = 10000
+VOCABULARY = 50000
+PAGE_WORDS = 400
+
+# number of pages edited for the incremental update
+CHANGED_PAGES = 10
+
+# number of random queries of each length to time
+QUERIES = 200
+
+# letters that the syllables of the synthetic vocabulary are made of
+CONSONANTS = "bcdfghklmnprstvw"
+VOWELS = "aeiou"
+
+# a vocabulary of made-up words with zipfian frequencies, like the words of real text
+def make_vocabulary(rng):
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add("".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) + rng.choice(("", "", *CONSONANTS))
+                          for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    weights = list(accumulate(1 / rank for rank in range(1, VOCABULARY + 1)))
+    return words, weights
+
+# markdown of a page - a heading followed by paragraphs of zipfian words
+def make_page(rng, number, words, weights):
+    text = rng.choices(words, cum_weights=weights, k=PAGE_WORDS)
+    paragraphs = [" ".join(text[i:i + 80]) for i in range(0, PAGE_WORDS, 80)]
+    return f"# Page {number} {text[0]} {text[1]}\n\n" + "\n\n".join(paragraphs)
+
+# index the terms of pages and write the changed shards, returning the time taken
+def index_pages(index, dest, pages):
+    start = time.perf_counter()
+    for number, markdown in pages:
+        document = Document.parse(markdown)
+        index.add_page(os.path.join(dest, f"page{number}.html"), document.title, document.search_terms())
+    index.save()
+    return time.perf_counter() - start
+
+# total size in bytes and sizes of the files in a directory
+def file_sizes(directory):
+    return [os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)]
+
+# build, update and query an index of a synthetic corpus
+def main():
+    # silence the index logging
+    logging.disable(logging.INFO)
+    work_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    rng = random.Random(0)
+    words, weights = make_vocabulary(rng)
+    pages = [(number, make_page(rng, number, words, weights)) for number in range(PAGES)]
+    print(f"corpus: {PAGES} pages x {PAGE_WORDS} words, {VOCABULARY} word vocabulary")
+
+    root = tempfile.mkdtemp(dir=work_dir)
+    try:
+        dest = os.path.join(root, "docs")
+        state = os.path.join(root, "search.json")
+
+        # build the whole index, then reindex a few edited pages
+        elapsed = index_pages(SearchIndex(dest, "/", state), dest, pages)
+        print(f"  full build:         {elapsed:8.2f} s")
+        edited = [(number, make_page(rng, number, words, weights)) for number in rng.sample(range(PAGES), CHANGED_PAGES)]
+        elapsed = index_pages(SearchIndex.load(dest, "/", state), dest, edited)
+        print(f"  update {CHANGED_PAGES} pages:    {elapsed:8.2f} s")
+
+        # size of the index and its shards
+        directory = os.path.join(dest, "search")
+        shards = file_sizes(os.path.join(directory, "terms"))
+        chunks = file_sizes(os.path.join(directory, "docs"))
+        print(f"  shards:             {len(shards)} files, {sum(shards) / 1024:.0f} KiB, median "
+              f"{statistics.median(shards) / 1024:.1f} KiB, largest {max(shards) / 1024:.1f} KiB")
+        print(f"  page chunks:        {len(chunks)} files, {sum(chunks) / 1024:.0f} KiB")
+        print(f"  state:              {os.path.getsize(state) / 1024:.0f} KiB")
+
+        # time queries of one to three words drawn like the words of the pages, counting the bytes they fetch
+        for length in (1, 2, 3):
+            times, fetched = [], []
+            for _ in range(QUERIES):
+                query = " ".join(rng.choices(words, cum_weights=weights, k=length))
+                start = time.perf_counter()
+                _, files = query_index(directory, query)
+                times.append(time.perf_counter() - start)
+                fetched.append(sum(os.path.getsize(os.path.join(directory, name)) for name in files
+                                   if os.path.exists(os.path.join(directory, name))))
+            print(f"  {length}-word query:       median {statistics.median(times) * 1e3:6.2f} ms, "
+                  f"max {max(times) * 1e3:6.2f} ms, median {statistics.median(fetched) / 1024:6.1f} KiB fetched")
+    finally:
+        shutil.rmtree(root)
+
+# run the benchmark if this script is executed
+if __name__ == "__main__":
+    main()
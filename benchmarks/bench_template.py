@@ -0,0 +1,41 @@
+# import necessary modules
+import os
+import sys
+import timeit
+
+# make the generator modules importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from template import Template
+
+# number of pages rendered per measurement
+PAGES = 20000
+
+# the per-page template work done before templates were compiled
+def render_uncompiled(template_path, title, content, base_path):
+    with open(template_path, "r", encoding="utf-8") as template_file:
+        template = template_file.read()
+    html = template.replace("{{ Title }}", title).replace("{{ Content }}", content)
+    return html.replace("href=\"/", f'href="{base_path}').replace("src=\"/", f'src="{base_path}')
+
+# compare the per-page template cost before and after compiling the template once
+def main():
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    template_path = os.path.join(root, "template.html")
+    base_path = "/static-site-generator/"
+    title = "Why Glorfindel is More Impressive than Legolas"
+    content = "<div>" + "<p>Some <b>bold</b> text with a <a href=\"/blog\">link</a>.</p>" * 200 + "</div>"
+
+    # check both approaches produce the same output
+    template = Template.load(template_path, base_path)
+    assert template.render(Title=title, Content=content) == render_uncompiled(template_path, title, content, base_path)
+
+    before = timeit.timeit(lambda: render_uncompiled(template_path, title, content, base_path), number=PAGES)
+    after = timeit.timeit(lambda: template.render(Title=title, Content=content), number=PAGES)
+
+    print(f"uncompiled: {before / PAGES * 1e6:8.2f} us/page")
+    print(f"compiled:   {after / PAGES * 1e6:8.2f} us/page")
+    print(f"speedup:    {before / after:8.2f}x")
+
+# run the benchmark if this script is executed
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# import necessary modules
+import os
+import sys
+import time
+import shutil
+import logging
+import tempfile
+
+# make the generator modules importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from copy_directory import copy_directory
+from transfer import FileTransfer, TRANSFER_MODES
+
+# shapes of the static trees to copy - (name, number of files, bytes per file)
+TREES = [("many-small", 5000, 4 * 1024), ("few-large", 4, 64 * 1024 * 1024)]
+
+# thread counts to compare
+WORKERS = (1, 8)
+
+# create a static tree of files filled with random bytes
+def make_tree(root, count, size):
+    for i in range(count):
+        directory = os.path.join(root, f"dir{i % 50}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file{i}.bin"), "wb") as file:
+            file.write(os.urandom(size))
+
+# time copying each tree with each transfer mode and thread count
+def main():
+    # silence the per-file copy logging
+    logging.disable(logging.INFO)
+    work_dir = sys.argv[1] if len(sys.argv) > 1 else None
+
+    for name, count, size in TREES:
+        root = tempfile.mkdtemp(dir=work_dir)
+        try:
+            source = os.path.join(root, "static")
+            make_tree(source, count, size)
+            print(f"{name}: {count} files x {size // 1024} KiB")
+
+            for mode in TRANSFER_MODES:
+                for workers in WORKERS:
+                    destination = os.path.join(root, "docs")
+                    start = time.perf_counter()
+                    with FileTransfer(mode, workers) as transfer:
+                        copy_directory(source, destination, transfer=transfer)
+                    elapsed = time.perf_counter() - start
+                    used = ", ".join(f"{technique}={n}" for technique, n in transfer.counts.items() if n)
+                    print(f"  {mode:9} workers={workers}: {elapsed * 1e3:9.1f} ms  ({used})")
+                    shutil.rmtree(destination)
+        finally:
+            shutil.rmtree(root)
+
+# run the benchmark if this script is executed
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# import necessary modules
+import os
+import sys
+import time
+import random
+import shutil
+import logging
+import tempfile
+import statistics
+
+# make the generator modules and the corpus generator importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.corpus import generate_corpus
+from block_cache import BlockCache
+from generate_content import generate_page_recursive
+from links import LinkIndex
+from manifest import BuildManifest
+from watch import SiteWatcher
+
+# size of the synthetic site
+PAGES = 5000
+
+# number of single page edits to time
+EDITS = 20
+
+# rebuild time of a single edited page that watch mode aims for, in seconds
+TARGET_SECONDS = 0.1
+
+# build a synthetic site, then time the watcher rebuilding it after each of a series of single page edits
+def main():
+    # silence the per-page logging and the link report
+    logging.disable(logging.WARNING)
+    work_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    rng = random.Random(0)
+
+    root = tempfile.mkdtemp(dir=work_dir)
+    try:
+        sources = generate_corpus(root, pages=PAGES)
+        content, static, dest = (os.path.join(root, name) for name in ("content", "static", "docs"))
+        template = os.path.join(root, "template.html")
+        shutil.copytree(static, dest)
+        print(f"corpus: {PAGES} pages")
+
+        # build the site once, the way --watch does before watching
+        start = time.perf_counter()
+        manifest = BuildManifest.load(dest, "/")
+        links = LinkIndex(dest, "/")
+        block_cache = BlockCache()
+        generate_page_recursive(content, template, dest, "/", manifest, block_cache=block_cache, links=links)
+        manifest.save()
+        links.report()
+        print(f"  initial build:      {time.perf_counter() - start:8.2f} s")
+
+        # edit one page at a time, appending a paragraph, and time the rebuild the watcher would run
+        watcher = SiteWatcher(content, static, template, dest, "/", manifest, block_cache=block_cache, links=links)
+        times = []
+        for number in range(EDITS):
+            path = rng.choice(sources)
+            with open(path, "a", encoding="utf-8") as page_file:
+                page_file.write(f"\n\nEdit {number} of the page.")
+            start = time.perf_counter()
+            watcher.rebuild({path})
+            times.append(time.perf_counter() - start)
+        median, worst = statistics.median(times), max(times)
+        print(f"  single page edit:   median {median * 1e3:6.1f} ms, max {worst * 1e3:6.1f} ms "
+              f"({'meets' if worst <= TARGET_SECONDS else 'misses'} the {TARGET_SECONDS * 1e3:.0f} ms target)")
+
+        # the manifest is written once the edits stop
+        start = time.perf_counter()
+        watcher.flush()
+        print(f"  manifest write:     {(time.perf_counter() - start) * 1e3:6.1f} ms, "
+              f"{os.path.getsize(manifest.path) / 1024:.0f} KiB, after the edits stop")
+    finally:
+        shutil.rmtree(root)
+
+# run the benchmark if this script is executed
+if __name__ == "__main__":
+    main()
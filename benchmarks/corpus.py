@@ -0,0 +1,124 @@
+# import necessary modules
+import os
+import random
+
+# words used to fill synthetic paragraphs
+WORDS = ("the", "hobbit", "ring", "shire", "road", "goes", "ever", "on", "and", "elves", "mountain", "river",
+         "forest", "wizard", "journey", "dragon", "gold", "song", "light", "shadow", "king", "return", "of")
+
+# template used by every synthetic site
+TEMPLATE = """<!DOCTYPE html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+# default corpus parameters
+DEFAULT_CORPUS = {
+    "pages": 200, # number of markdown pages
+    "page_size": 4000, # approximate characters of markdown per page
+    "link_density": 0.05, # fraction of words that are links
+    "code_density": 0.15, # fraction of blocks that are code blocks
+    "depth": 3, # directory levels pages are spread across
+    "seed": 0, # random seed, the same parameters always produce the same site
+}
+
+# build a sentence of random words, turning some into inline markup - links point at pages of the corpus
+def synthetic_sentence(rng, words, link_density, urls=()):
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < link_density and urls:
+            parts.append(f"[{word}]({rng.choice(urls)})")
+        elif roll < link_density + 0.03:
+            parts.append(f"**{word}**")
+        elif roll < link_density + 0.06:
+            parts.append(f"_{word}_")
+        elif roll < link_density + 0.08:
+            parts.append(f"`{word}`")
+        else:
+            parts.append(word)
+    return " ".join(parts).capitalize() + "."
+
+# build a single block of a random type
+def synthetic_block(rng, link_density, code_density, urls=()):
+    # code blocks are drawn first so their share follows the code density
+    if rng.random() < code_density:
+        lines = [f"def {rng.choice(WORDS)}_{i}():\n    return {i}" for i in range(rng.randint(1, 4))]
+        return "```\n" + "\n".join(lines) + "\n```"
+
+    kind = rng.randrange(6)
+    if kind == 0:
+        return "#" * rng.randint(2, 4) + " " + synthetic_sentence(rng, rng.randint(2, 6), 0)
+    if kind == 1:
+        return "\n".join(f"> {synthetic_sentence(rng, rng.randint(4, 12), link_density, urls)}" for _ in range(rng.randint(1, 3)))
+    if kind == 2:
+        return "\n".join(f"- {synthetic_sentence(rng, rng.randint(3, 10), link_density, urls)}" for _ in range(rng.randint(2, 6)))
+    if kind == 3:
+        return "\n".join(f"{i}. {synthetic_sentence(rng, rng.randint(3, 10), link_density, urls)}" for i in range(1, rng.randint(3, 7)))
+    return "\n".join(synthetic_sentence(rng, rng.randint(8, 24), link_density, urls) for _ in range(rng.randint(1, 4)))
+
+# build the markdown of one page, roughly page_size characters long
+def synthetic_page(rng, title, page_size, link_density, code_density, urls=()):
+    blocks = [f"# {title}"]
+    size = len(blocks[0])
+    while size < page_size:
+        block = synthetic_block(rng, link_density, code_density, urls)
+        blocks.append(block)
+        size += len(block) + 2
+    return "\n\n".join(blocks)
+
+# directory of a page, spreading pages across the given number of directory levels
+def page_directory(index, depth):
+    parts = []
+    for level in range(depth):
+        parts.append(f"section-{index % (level + 3)}")
+        index //= level + 3
+    return os.path.join(*parts) if parts else ""
+
+# root-relative url of a page, the same way the site links to it - the first page is the index of its directory
+def page_url(index, depth):
+    directory = page_directory(index, depth).replace(os.sep, "/")
+    name = "" if index == 0 else f"page-{index}"
+    return f"/{directory}/{name}" if directory else f"/{name}"
+
+# write a reproducible synthetic site (content, static and template) to a directory
+def generate_corpus(root, pages=200, page_size=4000, link_density=0.05, code_density=0.15, depth=3, seed=0):
+    rng = random.Random(seed)
+    content_path = os.path.join(root, "content")
+    static_path = os.path.join(root, "static")
+
+    # write the markdown pages, linking only to pages of the corpus so the link check finds nothing broken
+    urls = [page_url(index, depth) for index in range(pages)]
+    sources = []
+    for index in range(pages):
+        directory = os.path.join(content_path, page_directory(index, depth))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "index.md" if index == 0 else f"page-{index}.md")
+        with open(path, "w", encoding="utf-8") as page_file:
+            page_file.write(synthetic_page(rng, f"Page {index}", page_size, link_density, code_density, urls))
+        sources.append(path)
+
+    # write a stylesheet and some images
+    os.makedirs(os.path.join(static_path, "images"), exist_ok=True)
+    with open(os.path.join(static_path, "index.css"), "w", encoding="utf-8") as css_file:
+        css_file.write("body { font-family: sans-serif; }\n" * 50)
+    for index in range(max(1, pages // 20)):
+        with open(os.path.join(static_path, "images", f"image-{index}.png"), "wb") as image_file:
+            image_file.write(rng.randbytes(16384))
+
+    # write the template
+    template_path = os.path.join(root, "template.html")
+    with open(template_path, "w", encoding="utf-8") as template_file:
+        template_file.write(TEMPLATE)
+
+    return sources
@@ -0,0 +1,143 @@
+# import necessary modules
+import os
+import json
+import shutil
+import timeit
+import logging
+import platform
+import contextlib
+from markdown_blocks import markdown_to_html_node, markdown_to_blocks, block_to_block_type
+from split_nodes import split_nodes_delimiter, extract_markdown_links
+from textnode import TextNode, TextType
+from generate_content import generate_page
+from template import Template
+import main as site
+
+# version of the results format - bump this when the meaning of a result changes
+RESULTS_VERSION = 2
+
+# default regression threshold - a benchmark regresses when it is this fraction slower than the baseline
+DEFAULT_THRESHOLD = 0.10
+
+# time a function, returning the best seconds per call over several repeats
+def best_time(function, number=1, repeat=5):
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+# run a block with the current directory changed
+@contextlib.contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+# read every page of a corpus into memory
+def read_pages(sources):
+    pages = []
+    for source in sources:
+        with open(source, "r", encoding="utf-8") as page_file:
+            pages.append(page_file.read())
+    return pages
+
+# time parsing every page of the corpus into html node trees
+def bench_markdown_to_html_node(root, sources, repeat):
+    pages = read_pages(sources)
+    return best_time(lambda: [markdown_to_html_node(page) for page in pages], repeat=repeat)
+
+# time serializing every page's html node tree
+def bench_to_html(root, sources, repeat):
+    nodes = [markdown_to_html_node(page) for page in read_pages(sources)]
+    return best_time(lambda: [node.to_html() for node in nodes], repeat=repeat)
+
+# time generating every page from disk to disk with a compiled template
+def bench_generate_page(root, sources, repeat):
+    template_path = os.path.join(root, "template.html")
+    template = Template.load(template_path, "/blog/")
+    dest_path = os.path.join(root, "pages")
+    os.makedirs(dest_path, exist_ok=True)
+    outputs = [os.path.join(dest_path, f"{index}.html") for index in range(len(sources))]
+    return best_time(lambda: [generate_page(source, template_path, output, "/blog/", template)
+                              for source, output in zip(sources, outputs)], repeat=repeat)
+
+# time a full build of the corpus, the same as running main.py in its directory
+def bench_full_build(root, sources, repeat):
+    with working_directory(root):
+        return best_time(lambda: site.main(["/blog/"]), repeat=repeat)
+
+# time splitting bold delimiters out of a long run of text nodes
+def bench_split_nodes_delimiter(root, sources, repeat):
+    nodes = [TextNode(f"some **bold {i}** text and **more bold** here", TextType.PLAIN) for i in range(2000)]
+    return best_time(lambda: split_nodes_delimiter(nodes, "**", TextType.BOLD), number=10, repeat=repeat)
+
+# time extracting links from every page of the corpus
+def bench_extract_markdown_links(root, sources, repeat):
+    pages = read_pages(sources)
+    return best_time(lambda: [extract_markdown_links(page) for page in pages], number=10, repeat=repeat)
+
+# time classifying every block of the corpus
+def bench_block_to_block_type(root, sources, repeat):
+    blocks = [block for page in read_pages(sources) for block in markdown_to_blocks(page)]
+    return best_time(lambda: [block_to_block_type(block) for block in blocks], number=10, repeat=repeat)
+
+# benchmarks in the order they run - name -> function(root, sources, repeat) returning seconds
+BENCHMARKS = {
+    "markdown_to_html_node": bench_markdown_to_html_node,
+    "to_html": bench_to_html,
+    "generate_page": bench_generate_page,
+    "full_build": bench_full_build,
+    "split_nodes_delimiter": bench_split_nodes_delimiter,
+    "extract_markdown_links": bench_extract_markdown_links,
+    "block_to_block_type": bench_block_to_block_type,
+}
+
+# run the selected benchmarks against a generated corpus, returning the results
+def run_benchmarks(root, sources, corpus, names=None, repeat=5):
+    results = {}
+    # silence per-file logging and warnings so they are not timed
+    logging.disable(logging.WARNING)
+    try:
+        for name in names or BENCHMARKS:
+            results[name] = BENCHMARKS[name](root, sources, repeat)
+            print(f"{name:24s} {results[name] * 1e3:10.2f} ms")
+    finally:
+        logging.disable(logging.NOTSET)
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "corpus": corpus,
+        "results": results,
+    }
+
+# write results to a json file
+def save_results(results, path):
+    with open(path, "w", encoding="utf-8") as results_file:
+        json.dump(results, results_file, indent=2)
+
+# read results from a json file
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as results_file:
+        return json.load(results_file)
+
+# compare results with a baseline, returning (name, baseline, current, ratio, regressed) for each shared benchmark
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD):
+    # timings are only comparable for the same corpus and results format
+    if results["version"] != baseline.get("version"):
+        raise ValueError(f"Baseline results version {baseline.get('version')} does not match {results['version']}")
+    if results["corpus"] != baseline["corpus"]:
+        raise ValueError(f"Baseline corpus {baseline['corpus']} does not match {results['corpus']}")
+
+    comparisons = []
+    for name, current in results["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        ratio = current / previous
+        comparisons.append((name, previous, current, ratio, ratio > 1 + threshold))
+    return comparisons
+
+# remove a generated corpus
+def remove_corpus(root):
+    shutil.rmtree(root, ignore_errors=True)
@@ -1,2 +1,4 @@
-python3 src/main.py
-cd public && python3 -m http.server 8888
\ No newline at end of file
+python3 src/main.py --watch &
+watcher=$!
+trap "kill $watcher" EXIT
+cd docs && python3 -m http.server 8888
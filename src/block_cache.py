@@ -0,0 +1,121 @@
+# import necessary modules
+import os
+import pickle
+import hashlib
+import logging
+from collections import OrderedDict
+from htmlnode import LeafNode
+from markdown_blocks import block_to_html_node
+import parse_cache
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# default size limit of the rendered fragments kept in memory
+DEFAULT_BLOCK_CACHE_BYTES = 32 * 1024 * 1024
+
+# file name of the persisted block cache inside the build caches
+BLOCK_CACHE_NAME = "blocks.pickle"
+
+# approximate bytes held per entry besides the fragment itself - key, dict slot and string header
+ENTRY_OVERHEAD = 120
+
+# in-memory cache of rendered html fragments and the links found in them, keyed by the hash of each block's text,
+# evicting least recently used blocks
+class BlockCache:
+    # constructor
+    def __init__(self, max_bytes=DEFAULT_BLOCK_CACHE_BYTES, path=None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.fragments = OrderedDict() # block hash -> (html fragment, (kind, url) of its links), least recently used first
+        self.size = 0 # approximate bytes held by the fragments
+        self.hits = 0
+        self.misses = 0
+        self.changed = False # whether blocks were added or evicted since it was loaded or saved
+
+    # load a persisted cache, starting empty if it is missing, unreadable or from another parser version
+    @classmethod
+    def load(cls, path, max_bytes=DEFAULT_BLOCK_CACHE_BYTES):
+        cache = cls(max_bytes, path)
+        try:
+            with open(path, "rb") as cache_file:
+                version, fragments = pickle.load(cache_file)
+        except FileNotFoundError:
+            return cache
+        # an unreadable cache only costs speed
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable block cache: {path} - {e}")
+            return cache
+
+        if version == parse_cache.PARSER_VERSION:
+            for key, (fragment, links) in fragments:
+                cache.store(key, fragment, links)
+            cache.changed = False
+        return cache
+
+    # write the cache to its path, if it has one and its blocks changed - blocks only reordered by use are
+    # not worth rewriting it for
+    def save(self):
+        if self.path is None or not self.changed:
+            return
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(temp_path, "wb") as cache_file:
+                pickle.dump((parse_cache.PARSER_VERSION, list(self.fragments.items())), cache_file,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path)
+            self.changed = False
+        # log any errors encountered during writing
+        except Exception as e:
+            logging.error(f"Error writing block cache: {self.path} - {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    # compute the cache key of a block
+    def key(self, block):
+        return hashlib.blake2b(block.text.encode("utf-8"), digest_size=16).digest()
+
+    # add a fragment and its links, evicting the least recently used ones beyond the size limit
+    def store(self, key, fragment, links=()):
+        self.fragments[key] = (fragment, tuple(links))
+        self.size += len(fragment) + ENTRY_OVERHEAD
+        self.changed = True
+        while self.size > self.max_bytes and self.fragments:
+            _, (evicted, _) = self.fragments.popitem(last=False)
+            self.size -= len(evicted) + ENTRY_OVERHEAD
+
+    # render a block to an html node, reusing the fragment rendered for the same text before, and add the links
+    # found when it was rendered to the links list if given
+    def render(self, block, links=None):
+        key = self.key(block)
+        entry = self.fragments.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.fragments.move_to_end(key)
+            fragment, block_links = entry
+        else:
+            self.misses += 1
+            block_links = []
+            fragment = block_to_html_node(block, block_links).to_html()
+            self.store(key, fragment, block_links)
+        if links is not None:
+            links.extend(block_links)
+
+        # a leaf without a tag renders its value as is
+        return LeafNode(None, fragment)
+
+    # fraction of blocks served from the cache
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    # log the hit-rate statistics
+    def log_stats(self):
+        logging.info(f"Block cache: {self.hits} hits, {self.misses} misses ({self.hit_rate:.1%} hit rate), "
+                     f"{len(self.fragments)} blocks, {self.size / 1024 / 1024:.1f} MiB")
+
+    # represent the cache as a string
+    def __repr__(self):
+        return f"BlockCache({len(self.fragments)} blocks, {self.size} bytes, {self.hits} hits, {self.misses} misses)"
@@ -2,6 +2,8 @@
 import os
 import shutil
 import logging
+from manifest import hash_file
+from transfer import FileTransfer
 
 # configure logging for debugging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -15,7 +17,7 @@ def clear_directory(directory):
         logging.info(f"Clearing directory: {directory} ...")
         
         # iterate over items in the directory and remove them
-        for item in os.listdir(directory):
+        for item in sorted(os.listdir(directory)):
             item_path = os.path.join(directory, item)
             try:
                 # if item is a directory, remove it recursively, else remove the file
@@ -35,31 +37,37 @@ def clear_directory(directory):
     else:
         logging.warning(f"Directory does not exist: {directory} - nothing to clear.")
 
-# copy contents from source directory to destination directory
-def copy_directory(source, destination):
+# copy contents from source directory to destination directory, optionally clearing it first,
+# transferring files with the given FileTransfer (or a plain copy2 when none is given)
+def copy_directory(source, destination, clear=True, transfer=None):
     # if source directory does not exist or is not a directory, log an error
     if not os.path.exists(source) or not os.path.isdir(source):
         logging.error(f"Source directory does not exist or is not a directory: {source}")
         return
       
-    # if destination directory exists, clear it, else create it
+    # if destination directory exists, clear it (unless asked not to), else create it
     if os.path.exists(destination) and os.path.isdir(destination):
-        clear_directory(destination)
+        if clear:
+            clear_directory(destination)
     else:
         os.makedirs(destination, exist_ok=True)
     
     # log the copying action
     logging.info(f"Copying files from {source} to {destination} ...")
 
+    # use a plain inline copy if the caller did not provide a transfer
+    owned_transfer = FileTransfer("copy") if transfer is None else None
+    file_transfer = transfer or owned_transfer
+
     # iterate over items in the source directory and copy them to the destination
-    for item in os.listdir(source):
+    for item in sorted(os.listdir(source)):
         source_path = os.path.join(source, item)
         destination_path = os.path.join(destination, item)
 
         # if item is a directory, copy it recursively
         if os.path.isdir(source_path):
             os.makedirs(destination_path, exist_ok=True)
-            copy_directory(source_path, destination_path)
+            copy_directory(source_path, destination_path, clear, file_transfer)
 
         # if item is a symlink, replicate the symlink
         elif os.path.islink(source_path):
@@ -67,18 +75,151 @@ def copy_directory(source, destination):
 
             # only create the symlink if the target exists
             if os.path.exists(link_target):
+                # replace any existing entry left behind by an uncleared destination
+                if os.path.lexists(destination_path):
+                    os.remove(destination_path)
                 os.symlink(link_target, destination_path)
                 logging.info(f"Copied symlink: {source_path} to {destination_path}")
             else:
                 logging.warning(f"Symlink does not exist: {link_target} - skipping symlink: {source_path}")
         
-        # if item is a file, copy it
+        # if item is a file, copy it - the transfer logs the copy and any errors
+        else:
+            file_transfer.submit(source_path, destination_path)
+
+    # wait for the queued transfers if this call created the transfer
+    if owned_transfer is not None:
+        owned_transfer.close()
+
+# outcome of syncing a directory - relative paths of copied, skipped and removed files
+class SyncResult:
+    # constructor
+    def __init__(self):
+        self.copied = []
+        self.skipped = []
+        self.removed = []
+
+    # relative paths of every file now mirrored from the source
+    @property
+    def files(self):
+        return sorted(self.copied + self.skipped)
+
+    # represent the sync result as a string
+    def __repr__(self):
+        return f"SyncResult(copied: {len(self.copied)}, skipped: {len(self.skipped)}, removed: {len(self.removed)})"
+
+# check if a destination file is already up to date with its source
+def is_file_synced(source_path, destination_path, checksum=False):
+    # the destination must be a regular file of the same size
+    if os.path.islink(destination_path) or not os.path.isfile(destination_path):
+        return False
+    source_stat = os.stat(source_path)
+    destination_stat = os.stat(destination_path)
+    if source_stat.st_size != destination_stat.st_size:
+        return False
+
+    # compare contents if asked, refreshing the timestamps so the next quick check passes
+    if checksum:
+        if hash_file(source_path) != hash_file(destination_path):
+            return False
+        if source_stat.st_mtime_ns != destination_stat.st_mtime_ns:
+            shutil.copystat(source_path, destination_path)
+        return True
+
+    # otherwise trust the modification time preserved by copy2
+    return source_stat.st_mtime_ns == destination_stat.st_mtime_ns
+
+# sync contents from source directory to destination directory, copying only new or changed files
+# and removing files synced previously whose source was deleted - other files are left untouched
+def sync_directory(source, destination, checksum=False, previous=None, transfer=None, result=None, relative=""):
+    result = result if result is not None else SyncResult()
+
+    # use a plain inline copy if the caller did not provide a transfer
+    owned_transfer = FileTransfer("copy") if transfer is None else None
+    file_transfer = transfer or owned_transfer
+
+    # if source directory does not exist or is not a directory, log an error
+    if not os.path.exists(source) or not os.path.isdir(source):
+        logging.error(f"Source directory does not exist or is not a directory: {source}")
+        return result
+
+    # create the destination directory if needed
+    os.makedirs(destination, exist_ok=True)
+
+    # iterate over items in the source directory
+    for item in sorted(os.listdir(source)):
+        source_path = os.path.join(source, item)
+        destination_path = os.path.join(destination, item)
+        relative_path = os.path.join(relative, item)
+
+        # if item is a directory, sync it recursively
+        if os.path.isdir(source_path):
+            sync_directory(source_path, destination_path, checksum, None, file_transfer, result, relative_path)
+
+        # if item is a symlink, replicate the symlink if it is missing or points elsewhere
+        elif os.path.islink(source_path):
+            link_target = os.readlink(source_path)
+
+            # only create the symlink if the target exists
+            if not os.path.exists(link_target):
+                logging.warning(f"Symlink does not exist: {link_target} - skipping symlink: {source_path}")
+                continue
+            if os.path.islink(destination_path) and os.readlink(destination_path) == link_target:
+                result.skipped.append(relative_path)
+                continue
+            if os.path.lexists(destination_path):
+                os.remove(destination_path)
+            os.symlink(link_target, destination_path)
+            result.copied.append(relative_path)
+
+        # if item is a file, copy it unless the destination is up to date
         else:
             try:
-                shutil.copy2(source_path, destination_path)
-                # log the file copying for debugging
-                logging.info(f"Copied file: {source_path} to {destination_path}")
-            
-            # log any errors encountered during file copying
+                if is_file_synced(source_path, destination_path, checksum):
+                    result.skipped.append(relative_path)
+                    continue
+            # log any errors encountered while comparing files
             except Exception as e:
-                logging.error(f"Error copying file: {source_path} to {destination_path} - {e}")
\ No newline at end of file
+                logging.error(f"Error comparing file: {source_path} to {destination_path} - {e}")
+                continue
+
+            # queue the copy - the transfer logs the copy and any errors
+            result.copied.append(relative_path)
+            file_transfer.submit(source_path, destination_path, relative_path)
+
+    # wait for the queued transfers if this call created the transfer
+    if owned_transfer is not None:
+        owned_transfer.close()
+
+    # once the whole tree is synced, wait for the copies, drop failed ones and remove files
+    # from the previous sync that no longer exist in the source
+    if relative == "":
+        file_transfer.wait()
+        for _, _, relative_path, _ in file_transfer.failed:
+            if relative_path in result.copied:
+                result.copied.remove(relative_path)
+        if previous:
+            remove_stale_files(destination, set(previous) - set(result.files), result)
+
+    return result
+
+# remove stale files from a synced destination, along with any directories they leave empty
+def remove_stale_files(destination, stale_files, result):
+    for relative_path in sorted(stale_files):
+        destination_path = os.path.join(destination, relative_path)
+        if not os.path.lexists(destination_path):
+            continue
+        try:
+            os.remove(destination_path)
+            result.removed.append(relative_path)
+            logging.info(f"Removed stale file: {destination_path}")
+
+            # remove parent directories that are now empty, stopping at the destination root
+            parent = os.path.dirname(destination_path)
+            while os.path.abspath(parent) != os.path.abspath(destination) and not os.listdir(parent):
+                os.rmdir(parent)
+                parent = os.path.dirname(parent)
+
+        # log any errors encountered during removal
+        except Exception as e:
+            logging.error(f"Error removing stale file: {destination_path} - {e}")
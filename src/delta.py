@@ -0,0 +1,88 @@
+# import necessary modules
+import os
+import json
+import logging
+from manifest import hash_file, MANIFEST_NAME, LINKS_NAME
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# name of the deploy delta written to the destination directory
+DELTA_NAME = ".deploy-delta.json"
+
+# files describing the build rather than being part of the site
+delta_excluded = {MANIFEST_NAME, LINKS_NAME, DELTA_NAME}
+
+# move a freshly written temporary file over its destination unless the destination already has identical
+# bytes, so unchanged outputs keep their mtime - returns True if the destination was replaced
+def replace_if_changed(temp_path, dest_path):
+    try:
+        unchanged = (os.path.getsize(temp_path) == os.path.getsize(dest_path)
+                     and hash_file(temp_path) == hash_file(dest_path))
+    except FileNotFoundError:
+        unchanged = False
+
+    if unchanged:
+        os.remove(temp_path)
+        return False
+    os.replace(temp_path, dest_path)
+    return True
+
+# write a json file atomically via a temporary file and rename - compact files leave out all whitespace
+# and are encoded in one go, which uses the much faster c encoder
+def write_json_atomic(path, data, compact=False):
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as json_file:
+            if compact:
+                json_file.write(json.dumps(data, separators=(",", ":"), sort_keys=True, ensure_ascii=False))
+            else:
+                json.dump(data, json_file, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
+    # remove the partial file and let the caller report the error
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+# record [size, mtime, hash] for every file in the destination directory, in sorted order,
+# reusing the previous hash of files whose size and mtime are unchanged
+def snapshot_outputs(dest_dir, previous=None):
+    previous = previous or {}
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(dest_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            relative = os.path.relpath(path, dest_dir).replace(os.sep, "/")
+            if relative in delta_excluded or filename.endswith(".tmp"):
+                continue
+            stat = os.stat(path)
+            entry = previous.get(relative)
+            if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                files[relative] = entry
+            else:
+                files[relative] = [stat.st_size, stat.st_mtime_ns, hash_file(path)]
+    return files
+
+# compare two snapshots, listing the files a deploy has to upload or delete
+def compute_delta(previous, current):
+    return {
+        "added": sorted(path for path in current if path not in previous),
+        "changed": sorted(path for path in current if path in previous and current[path][2] != previous[path][2]),
+        "removed": sorted(path for path in previous if path not in current),
+    }
+
+# snapshot the destination directory, write the delta against the previous snapshot and return the new snapshot
+def write_delta(dest_dir, previous):
+    files = snapshot_outputs(dest_dir, previous)
+    delta = compute_delta(previous, files)
+    path = os.path.join(dest_dir, DELTA_NAME)
+    try:
+        write_json_atomic(path, delta)
+        logging.info(f"Deploy delta: {len(delta['added'])} added, {len(delta['changed'])} changed, "
+                     f"{len(delta['removed'])} removed - written to {path}")
+    # log any errors encountered during writing
+    except Exception as e:
+        logging.error(f"Error writing deploy delta: {path} - {e}")
+    return files
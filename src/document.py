@@ -0,0 +1,260 @@
+# import necessary modules
+import re
+import datetime
+import itertools
+from htmlnode import ParentNode, StreamingParentNode
+from markdown_blocks import scan_lines, block_to_html_node, BlockType
+from search import page_terms
+
+# line that opens and closes a front matter section
+FRONT_MATTER_FENCE = "---"
+
+# markdown files at least this large are streamed rather than read and parsed in memory
+STREAM_MIN_SIZE = 64 * 1024 * 1024
+
+# regex to match a "key: value" front matter line
+front_matter_line = re.compile(r"^([A-Za-z_][\w-]*)\s*:\s*(.*?)\s*$")
+
+# regex to match an H1 heading line and capture its text
+title_pattern = re.compile(r'^#\s+(.*?)(\n|$)')
+
+# error raised for front matter that cannot be parsed
+class FrontMatterError(ValueError):
+    pass
+
+# convert a front matter scalar to a bool, int, date or string
+def parse_scalar(value):
+    # strip matching quotes, keeping the value as a string
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value.lower() in ("true", "yes"):
+        return True
+    if value.lower() in ("false", "no"):
+        return False
+    if re.fullmatch(r"-?\d+", value):
+        return int(value)
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        return value
+
+# parse the lines of a front matter section into a dict
+def parse_front_matter(lines):
+    metadata = {}
+    key = None # key of a block list being collected, e.g. "tags:" followed by "- item" lines
+    for number, line in enumerate(lines, start=2):
+        stripped = line.strip()
+
+        # skip blank lines and comments
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        # an indented "- item" line adds to the list of the previous key
+        if stripped.startswith("- ") and key is not None and line[0].isspace():
+            metadata[key].append(parse_scalar(stripped[2:].strip()))
+            continue
+
+        match = front_matter_line.match(line)
+        if match is None:
+            raise FrontMatterError(f"Invalid front matter on line {number}: {line}")
+        key, value = match.groups()
+
+        # an empty value starts a block list, a [a, b] value is an inline list
+        if not value:
+            metadata[key] = []
+        elif value.startswith("[") and value.endswith("]"):
+            metadata[key] = [parse_scalar(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+            key = None
+        else:
+            metadata[key] = parse_scalar(value)
+            key = None
+    return metadata
+
+# split markdown lines into front matter and body lines - a document without a closed
+# front matter section at the very start has no front matter
+def split_front_matter(lines):
+    if not lines or lines[0].rstrip() != FRONT_MATTER_FENCE:
+        return {}, lines
+    for index in range(1, len(lines)):
+        if lines[index].rstrip() == FRONT_MATTER_FENCE:
+            return parse_front_matter(lines[1:index]), lines[index + 1:]
+    return {}, lines
+
+# yield the lines of a text file without their line endings, like splitting the whole file on newlines
+def iter_lines(file):
+    for line in file:
+        yield line[:-1] if line.endswith("\n") else line
+
+# split an iterator of markdown lines into front matter and an iterator of body lines, reading only as far
+# as the end of the front matter
+def read_front_matter(lines):
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    if first.rstrip() != FRONT_MATTER_FENCE:
+        return {}, itertools.chain((first,), lines)
+    front_matter = []
+    for line in lines:
+        if line.rstrip() == FRONT_MATTER_FENCE:
+            return parse_front_matter(front_matter), lines
+        front_matter.append(line)
+    return {}, iter([first] + front_matter)
+
+# regex to match a word of page text, leaving out markup
+word_pattern = re.compile(r"[\w'’]+")
+
+# count the words of a block, leaving out the fences of a code block
+def block_words(block):
+    lines = block.lines[1:-1] if block.block_type == BlockType.CODE else block.lines
+    return sum(len(word_pattern.findall(line)) for line in lines)
+
+# find the title in the first heading of a sequence of blocks
+def title_from_blocks(blocks):
+    for block in blocks:
+        if block.block_type == BlockType.HEADING:
+            # extract and return the heading text without leading #
+            return title_pattern.sub(r'\1', block.lines[0]).strip()
+    return None
+
+# a markdown page parsed once into its front matter, title and blocks
+class Document:
+    # fixed attributes instead of a per-instance __dict__
+    __slots__ = ("path", "metadata", "title", "blocks", "children", "links")
+
+    # constructor
+    def __init__(self, blocks, metadata=None, path=None):
+        self.path = path
+        self.metadata = metadata or {}
+        self.blocks = blocks
+        self.children = None # html nodes of the blocks, converted on first use
+        self.links = None # (kind, url) of every link and image, recorded while the blocks are converted
+
+        # a front matter title takes precedence over the first heading
+        title = self.metadata.get("title")
+        if title is None:
+            title = title_from_blocks(blocks)
+        if title is None:
+            raise ValueError("No title (H1) found in markdown")
+        self.title = str(title)
+
+    # parse a markdown string
+    @classmethod
+    def parse(cls, markdown, path=None):
+        metadata, lines = split_front_matter(markdown.split("\n"))
+        return cls(list(scan_lines(lines)), metadata, path)
+
+    # read and parse a markdown file
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as markdown_file:
+            return cls.parse(markdown_file.read(), path)
+
+    # publication date from the front matter, if any
+    @property
+    def date(self):
+        return self.metadata.get("date")
+
+    # tags from the front matter, always as a list
+    @property
+    def tags(self):
+        tags = self.metadata.get("tags", [])
+        return [str(tag) for tag in tags] if isinstance(tags, list) else [str(tags)]
+
+    # check if the front matter marks the page as a draft
+    @property
+    def draft(self):
+        return self.metadata.get("draft") is True
+
+    # template named in the front matter, if any
+    @property
+    def template(self):
+        return self.metadata.get("template")
+
+    # convert the blocks to an HTMLNode tree wrapped in a div, reusing fragments from a block cache if given
+    def to_html_node(self, block_cache=None):
+        if self.children is None:
+            self.links = []
+            if block_cache is None:
+                self.children = [block_to_html_node(block, self.links) for block in self.blocks]
+            else:
+                self.children = [block_cache.render(block, self.links) for block in self.blocks]
+        return ParentNode("div", self.children, None)
+
+    # list the (kind, url) of every distinct link and image in the page, in order of first use, as recorded
+    # when the page was converted - converting it now if it was not
+    def find_links(self):
+        if self.children is None:
+            self.to_html_node()
+        return list(dict.fromkeys(self.links))
+
+    # number of words in the page
+    def count_words(self):
+        return sum(block_words(block) for block in self.blocks)
+
+    # weighted terms of the page text for the search index
+    def search_terms(self):
+        return page_terms(self.blocks)
+
+    # metadata shown in listings of the page
+    def summary(self):
+        date = self.date
+        return {"title": self.title, "date": None if date is None else str(date), "tags": self.tags,
+                "draft": self.draft, "words": self.count_words()}
+
+    # represent the document as a string
+    def __repr__(self):
+        return f"Document({self.path}, {self.title}, {self.metadata}, {len(self.blocks)} blocks)"
+
+# a markdown page read in two passes instead of being held in memory - the first pass reads the front matter
+# and as far as the title, the second scans and converts one block at a time while the page is written
+class StreamedDocument(Document):
+    __slots__ = ("found_links", "found_words")
+
+    # read the front matter and title of a markdown file
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as markdown_file:
+            metadata, lines = read_front_matter(iter_lines(markdown_file))
+            # the blocks are only scanned up to the first heading to find the title
+            document = cls(scan_lines(lines), metadata, path)
+        document.blocks = None
+        document.found_links = {}
+        document.found_words = 0
+        return document
+
+    # scan the blocks of the file again, one at a time
+    def iter_blocks(self):
+        with open(self.path, "r", encoding="utf-8") as markdown_file:
+            metadata, lines = read_front_matter(iter_lines(markdown_file))
+            yield from scan_lines(lines)
+
+    # convert the blocks to HTMLNodes as the page is rendered - fragments are not cached, a streamed page
+    # would only evict the fragments of every other page
+    def to_html_node(self, block_cache=None):
+        return StreamingParentNode("div", self.iter_nodes(), None)
+
+    # convert the blocks one at a time, collecting their distinct links and counting their words on the way
+    def iter_nodes(self):
+        self.found_links, self.found_words = {}, 0
+        for block in self.iter_blocks():
+            links = []
+            node = block_to_html_node(block, links)
+            self.found_links.update(dict.fromkeys(links))
+            self.found_words += block_words(block)
+            yield node
+
+    # list the distinct links found while the page was last rendered, the blocks are not kept to scan again
+    def find_links(self):
+        return list(self.found_links)
+
+    # number of words counted while the page was last rendered
+    def count_words(self):
+        return self.found_words
+
+    # weighted terms of the page text, scanning the blocks of the file once more
+    def search_terms(self):
+        return page_terms(self.iter_blocks())
+
+    # represent the document as a string
+    def __repr__(self):
+        return f"StreamedDocument({self.path}, {self.title}, {self.metadata})"
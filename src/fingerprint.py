@@ -0,0 +1,79 @@
+# import necessary modules
+import os
+import json
+import shutil
+import logging
+from manifest import hash_file
+from delta import write_json_atomic
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# number of hex digits of the content hash added to asset names
+FINGERPRINT_LENGTH = 8
+
+# name of the asset manifest written to the destination directory
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+
+# add a short content hash to a file name, e.g. index.css -> index.3f9a1c8d.css
+def fingerprint_name(path, digest):
+    root, extension = os.path.splitext(path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{extension}"
+
+# map the url path of every static file to its fingerprinted url path, hashing the source files
+def collect_assets(static_dir):
+    assets = {}
+    for dirpath, dirnames, filenames in os.walk(static_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            url = os.path.relpath(path, static_dir).replace(os.sep, "/")
+            assets[url] = fingerprint_name(url, hash_file(path))
+    return assets
+
+# read the asset manifest of the previous build
+def load_asset_manifest(dest_dir):
+    path = os.path.join(dest_dir, ASSET_MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return {}
+    # an unreadable manifest just means stale fingerprinted files may be left behind
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable asset manifest: {path} - {e}")
+        return {}
+
+# create the fingerprinted copy of every copied static file, remove the ones no longer used and write the manifest
+def update_fingerprinted_assets(dest_dir, assets):
+    previous = load_asset_manifest(dest_dir)
+
+    # link each fingerprinted name to the copied file - the copy is replaced rather than modified when it
+    # changes, so the link keeps the content its hash names
+    for url, fingerprinted in assets.items():
+        source = os.path.join(dest_dir, *url.split("/"))
+        destination = os.path.join(dest_dir, *fingerprinted.split("/"))
+        if os.path.exists(destination) or not os.path.exists(source):
+            continue
+        try:
+            os.link(source, destination)
+        # fall back to copying where hardlinks are not supported
+        except OSError:
+            shutil.copy2(source, destination)
+        logging.info(f"Fingerprinted asset: {url} as {fingerprinted}")
+
+    # remove fingerprinted files of assets that changed or were deleted
+    current = set(assets.values())
+    for fingerprinted in previous.values():
+        if fingerprinted not in current:
+            path = os.path.join(dest_dir, *fingerprinted.split("/"))
+            if os.path.lexists(path):
+                os.remove(path)
+                logging.info(f"Removed stale fingerprinted asset: {path}")
+
+    # write the manifest, or remove it when fingerprinting is off
+    path = os.path.join(dest_dir, ASSET_MANIFEST_NAME)
+    if assets:
+        write_json_atomic(path, assets)
+    elif os.path.exists(path):
+        os.remove(path)
@@ -1,15 +1,25 @@
 # import necessary modules
 import os
-import re
 import logging
-from markdown_blocks import markdown_to_html_node, markdown_to_blocks, is_heading_block
+from concurrent.futures import ProcessPoolExecutor
+from document import Document, StreamedDocument, split_front_matter, title_from_blocks, STREAM_MIN_SIZE
+from markdown_blocks import scan_lines
+from template import Template
+from layouts import Layouts
+from planner import BuildPlan
+from delta import replace_if_changed
+from pipeline import generate_pages_pipeline
+import tracing
 
 # configure logging for debugging
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s',
                     handlers=[logging.FileHandler("generate_content.log"), logging.StreamHandler()])
 
-# recursively generate HTML pages from markdown files in a directory using a template
-def generate_page_recursive(content_dir, template_path, dest_dir, base_path):
+# recursively generate HTML pages from markdown files in a directory using the default template, or the layout
+# of each page's section or front matter - returns the number of pages generated
+def generate_page_recursive(content_dir, template_path, dest_dir, base_path, manifest=None, jobs=1, cache=None, block_cache=None,
+                            assets=None, pipeline=False, stream_min_size=STREAM_MIN_SIZE, links=None, page_index=None,
+                            search_index=None, layouts=None):
     # check if content path exists and is a directory
     if not os.path.exists(content_dir) or not os.path.isdir(content_dir):
         logging.error(f"Content does not exist or is not a directory: {content_dir}")
@@ -28,104 +38,263 @@ def generate_page_recursive(content_dir, template_path, dest_dir, base_path):
     # log the start of the page generation process
     logging.info(f"Generating pages from {content_dir} to {dest_dir} using template {template_path}...")
 
-    # iterate over files and directories in the content directory
-    for file in os.listdir(content_dir):
-        # skip hidden files and directories
-        if file.startswith('.'):
-            continue
-        
-        # define full paths for content and destination
-        content_path = os.path.join(content_dir, file)
-        dest_path = os.path.join(dest_dir, file)
-
-        # if content is a directory, recurse into it
-        if os.path.isdir(content_path):
-            # create the corresponding directory in the destination path
-            try:
-                os.makedirs(dest_path, exist_ok=True)
-            # handle any errors during directory creation
-            except Exception as e:
-                logging.error(f"Error creating directory: {dest_path} - {e}")
-                continue
-            
-            # recurse into the directory    
-            generate_page_recursive(content_path, template_path, dest_path, base_path)
-        
-        # if content is a file, generate a page from it
+    # compile each template and partial once for the whole build
+    if layouts is None:
+        layouts = Layouts(template_path, base_path, assets)
+
+    # render the pages through the async pipeline, which discovers them as its first stage and overlaps reading
+    # and writing with rendering, or plan the whole build first and render serially or across a pool of worker
+    # processes - the block cache lives in this process, so it is only used when rendering on this process
+    plan = BuildPlan()
+    search_terms = search_index is not None
+    if pipeline:
+        pages = pipeline_pages(plan.discover(content_dir, dest_dir, layouts, manifest, page_index, search_index),
+                               layouts)
+        results = generate_pages_pipeline(pages, jobs, cache, block_cache, stream_min_size, search_terms)
+    else:
+        # plan the build - find every page and decide which must be generated before rendering anything
+        with tracing.span("plan_build", "walk", content_dir=content_dir):
+            for _ in plan.discover(content_dir, dest_dir, layouts, manifest, page_index, search_index):
+                pass
+
+        # create the destination directories of the pages to generate
+        for directory in sorted({os.path.dirname(job.output) for job in plan.jobs}):
+            make_page_directory(directory)
+
+        # parallel runners start the largest pages first, so the build does not end waiting on one big page
+        page_jobs = plan.largest_first() if jobs > 1 else plan.jobs
+        pages = [(job.source, job.output) for job in page_jobs]
+        templates = [layouts.get(job.template) for job in page_jobs]
+        if jobs > 1 and len(pages) > 1:
+            results = generate_pages_parallel(pages, base_path, templates, jobs, cache, stream_min_size, search_terms,
+                                              [job.size for job in page_jobs])
         else:
-            dest_file_path = os.path.splitext(dest_path)[0] + ".html"
-            
-            # generate the HTML page
-            try:
-                generate_page(content_path, template_path, dest_file_path, base_path)
-            # handle any errors during page generation
-            except Exception as e:
-                logging.error(f"Error generating page for {content_path}: {e}")
-
-# generate a complete HTML page from a markdown file using a template
-def generate_page(markdown_path, template_path, dest_path, base_path):
+            results = (generate_page_job(content_path, template.path, dest_file_path, base_path, template,
+                                         cache=cache, block_cache=block_cache, stream_min_size=stream_min_size,
+                                         search_terms=search_terms)
+                       for (content_path, dest_file_path), template in zip(pages, templates))
+
+    # report errors and record generated pages, their links and template, their metadata and their text in the
+    # manifest, link index, page index and search index - the plan is complete once the results are available
+    page_templates = {job.source: (job.template, job.template_hash) for job in plan.jobs}
+    generated_count = 0
+    for content_path, dest_file_path, generated, error, events, page_links, summary in results:
+        # keep the spans recorded in worker processes
+        if events:
+            tracing.active.events.extend(events)
+        if error is not None:
+            logging.error(f"Error generating page for {content_path}: {error}")
+            continue
+        generated_count += generated
+        if generated and manifest is not None:
+            manifest.record(content_path, dest_file_path, page_links, page_templates[content_path])
+        if generated and links is not None:
+            links.add_page(dest_file_path, page_links)
+        if generated and page_index is not None:
+            page_index.update(content_path, dest_file_path, summary)
+        if generated and search_index is not None:
+            search_index.add_page(dest_file_path, summary["title"], summary["terms"])
+
+    # skip pages whose inputs and template are unchanged since the last build
+    for content_path, dest_file_path in plan.fresh:
+        logging.info(f"Page is up to date, skipping: {dest_file_path}")
+        manifest.record(content_path, dest_file_path)
+        # its links are known from the build that generated it
+        if links is not None:
+            links.add_page(dest_file_path, manifest.page_links(content_path))
+
+    # forget pages whose source was deleted
+    if page_index is not None:
+        page_index.remove_missing(content_path for content_path, _ in plan.pages)
+    if search_index is not None:
+        search_index.remove_missing(dest_file_path for _, dest_file_path in plan.pages)
+    return generated_count
+
+# create the destination directory of pages, the pages inside report their own errors
+def make_page_directory(directory):
+    try:
+        os.makedirs(directory, exist_ok=True)
+    # handle any errors during directory creation
+    except Exception as e:
+        logging.error(f"Error creating directory: {directory} - {e}")
+
+# hand the pipeline each page to generate with its compiled template as it is discovered, creating its
+# destination directory first
+def pipeline_pages(page_jobs, layouts):
+    directories = set()
+    for job in page_jobs:
+        directory = os.path.dirname(job.output)
+        if directory not in directories:
+            directories.add(directory)
+            make_page_directory(directory)
+        yield job.source, job.output, layouts.get(job.template)
+
+# map a markdown file in the content directory to its HTML page in the destination directory
+def page_output_path(content_dir, dest_dir, content_path):
+    relative = os.path.relpath(content_path, content_dir)
+    return os.path.join(dest_dir, os.path.splitext(relative)[0] + ".html")
+
+# generate a single page, returning the outcome instead of raising so it can run in a worker process,
+# along with the spans it recorded there if trace is set, and the links and listing metadata of the page,
+# including its search terms if search_terms is set
+def generate_page_job(content_path, template_path, dest_file_path, base_path, template=None, trace=False, cache=None,
+                      block_cache=None, stream_min_size=STREAM_MIN_SIZE, search_terms=False):
+    if trace:
+        tracing.start()
+    page_links, summary = [], {}
+    try:
+        with tracing.span("generate_page", "page", path=content_path):
+            generated = generate_page(content_path, template_path, dest_file_path, base_path, template,
+                                      cache=cache, block_cache=block_cache, stream_min_size=stream_min_size,
+                                      links=page_links, summary=summary, search_terms=search_terms)
+        error = None
+    # hand any errors during page generation back to the caller
+    except Exception as e:
+        generated, error = False, str(e)
+    events = tracing.stop().events if trace else None
+    return content_path, dest_file_path, generated, error, events, page_links, summary
+
+# generate pages across a pool of worker processes with the compiled template of each page, yielding results
+# in page order - pages are batched by their size in bytes if given, or by count
+def generate_pages_parallel(pages, base_path, templates, jobs, cache=None, stream_min_size=STREAM_MIN_SIZE,
+                            search_terms=False, sizes=None):
+    logging.info(f"Generating {len(pages)} pages with {jobs} worker processes...")
+
+    # batch several pages per task to keep inter-process overhead low
+    batches = size_batches(sizes or [1] * len(pages), jobs * 4)
+    trace = tracing.active is not None
+    tasks = [[(content_path, template.path, dest_file_path, base_path, template, trace, cache, None, stream_min_size,
+               search_terms)
+              for (content_path, dest_file_path), template in zip(pages[start:end], templates[start:end])]
+             for start, end in batches]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for results in executor.map(generate_page_batch, tasks):
+            yield from results
+
+# split a list of sizes into (start, end) ranges of about a count-th of the total size each - pages larger than
+# a range get one of their own, so the largest pages of a largest-first list are spread across the workers
+def size_batches(sizes, count):
+    budget = sum(sizes) / max(1, count)
+    batches, start, total = [], 0, 0
+    for index, size in enumerate(sizes):
+        if index > start and total + size > budget:
+            batches.append((start, index))
+            start, total = index, 0
+        total += size
+    if start < len(sizes):
+        batches.append((start, len(sizes)))
+    return batches
+
+# generate a batch of pages in a worker process
+def generate_page_batch(batch):
+    return [generate_page_job(*arguments) for arguments in batch]
+
+# generate a complete HTML page from a markdown file using a template (compiled once by the caller if given),
+# reusing the parsed document if the caller already has it, or a cached parse of the same content,
+# and rendering only blocks missing from the block cache if given - markdown files of at least stream_min_size
+# bytes are read and converted one block at a time as the page is written, so memory stays bounded -
+# the (kind, url) of every link and image in the page are added to the links list, and its listing metadata
+# (and search terms if search_terms is set) to the summary dict, if given
+def generate_page(markdown_path, template_path, dest_path, base_path, template=None, document=None, cache=None,
+                  block_cache=None, stream_min_size=STREAM_MIN_SIZE, links=None, summary=None, search_terms=False):
     # check if source markdown file exists
     if not os.path.exists(markdown_path) or not os.path.isfile(markdown_path):
         logging.error(f"Markdown file does not exist: {markdown_path}")
-        return
+        return False
 
     # check if destination path exists and is a directory
     dest_dir = os.path.dirname(dest_path)
     if not os.path.exists(dest_dir) or not os.path.isdir(dest_dir):
         logging.error(f"Destination path is not a valid directory: {dest_dir}")
-        return
+        return False
 
     # confirm the page generation action
     logging.info(f"Generating page from {markdown_path} to {dest_path} using template {template_path}...")
 
-    # read the markdown file
-    with open(markdown_path, "r", encoding="utf-8") as markdown_file:
-        markdown = markdown_file.read()
+    # read only the front matter and title of a large markdown file, leaving its blocks to be scanned while writing
+    if document is None and os.path.getsize(markdown_path) >= stream_min_size:
+        with tracing.span("read_front_matter", "page", path=markdown_path):
+            document = StreamedDocument.load(markdown_path)
 
-    # read the template file
-    with open(template_path, "r", encoding="utf-8") as template_file:
-        template = template_file.read()
+    # read and parse the markdown file once into its front matter, title and blocks
+    if document is None:
+        with tracing.span("read", "page", path=markdown_path):
+            with open(markdown_path, "r", encoding="utf-8") as markdown_file:
+                markdown = markdown_file.read()
+        with tracing.span("parse", "page"):
+            if cache is None:
+                document = Document.parse(markdown, markdown_path)
+            else:
+                document = cache.parse(markdown, markdown_path, block_cache)
 
-    # extract the title from the markdown content
-    title = extract_title(markdown)
+    # read and compile the template file if the caller did not provide one
+    if template is None:
+        with tracing.span("load_template", "page"):
+            template = Template.load(template_path, base_path)
 
-    # convert the markdown content to an HTMLNode
-    html_node = markdown_to_html_node(markdown)
+    # take the title from the front matter or the first heading
+    title = document.title
+
+    # convert the parsed blocks to an HTMLNode
+    with tracing.span("to_html_node", "page"):
+        html_node = document.to_html_node(block_cache)
     if html_node is None:
         logging.error("Error converting markdown to HTMLNode")
-        return
-
-    # convert to an HTML string
-    content = html_node.to_html()
-
-    # replace placeholders in template file with actual title and content
-    html = template.replace("{{ Title }}", title).replace("{{ Content }}", content)
+        return False
 
-    # adjust paths for href and src attributes
-    final_html = html.replace("href=\"/", f'href="{base_path}').replace("src=\"/", f'src="{base_path}')
+    # when tracing, serialize the page and fill the template up front so each phase gets its own span,
+    # rather than interleaving them in one stream - the output is the same either way, but a streamed page
+    # is never built in memory
+    page = None
+    if tracing.active is not None and not isinstance(document, StreamedDocument):
+        with tracing.span("to_html", "page"):
+            content = html_node.to_html()
+        with tracing.span("template", "page"):
+            page = template.render(Title=title, Content=content)
 
-    # write the final HTML to the destination file
+    # stream the filled template to a temporary file beside the destination, adjusting paths for the base path,
+    # so the full page is never built in memory and a failed page never leaves a partial file behind -
+    # the destination is only replaced if the bytes differ, so unchanged pages keep their mtime
+    temp_path = dest_path + ".tmp"
     try:
-        with open(dest_path, "w", encoding="utf-8") as dest_file:
-            dest_file.write(final_html)
-    # handle any errors during file writing
-    except Exception as e:
-        logging.error(f"Error writing to destination file: {dest_path} - {e}")
-        return
+        with tracing.span("write", "page", path=dest_path):
+            with open(temp_path, "w", encoding="utf-8") as dest_file:
+                if page is None:
+                    template.write(dest_file, Title=title, Content=html_node)
+                else:
+                    dest_file.write(page)
+            changed = replace_if_changed(temp_path, dest_path)
+    # remove the partial file and let the caller report the error
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    # collect the links and metadata of the page, a streamed page has found them while it was written
+    if links is not None:
+        links.extend(document.find_links())
+    if summary is not None:
+        summary.update(document.summary())
+        if search_terms:
+            summary["terms"] = document.search_terms()
 
     # confirm successful generation of the page
-    logging.info(f"Page generated successfully: {dest_path}")
+    if changed:
+        logging.info(f"Page generated successfully: {dest_path}")
+    else:
+        logging.info(f"Page unchanged, kept existing file: {dest_path}")
+    return True
 
-# extract the title (H1 heading) from a markdown string
+# extract the title (front matter title or H1 heading) from a markdown string
 def extract_title(markdown):
-    # split the markdown into blocks
-    blocks = markdown_to_blocks(markdown)
+    metadata, lines = split_front_matter(markdown.split("\n"))
+    if "title" in metadata:
+        return str(metadata["title"])
 
-    # iterate through the blocks to find the title
-    for block in blocks:
-        if is_heading_block(block):
-            # extract and return the heading text without leading #
-            return re.sub(r'^#\s+(.*?)(\n|$)', r'\1', block).strip()
+    # scan the markdown into blocks, stopping at the first heading
+    title = title_from_blocks(scan_lines(lines))
 
     # if no title found, raise an error
-    raise ValueError("No title (H1) found in markdown")
\ No newline at end of file
+    if title is None:
+        raise ValueError("No title (H1) found in markdown")
+    return title
\ No newline at end of file
@@ -1,5 +1,8 @@
 # html class for representing html nodes
 class HTMLNode:
+    # fixed attributes instead of a per-instance __dict__, large pages create thousands of nodes
+    __slots__ = ("tag", "value", "children", "props")
+
     # constructor
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
@@ -11,6 +14,16 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError
 
+    # function to yield the html string in fragments
+    def iter_html(self):
+        raise NotImplementedError
+
+    # function to write the html fragments to a file object or a list buffer
+    def write_html(self, writer):
+        write = writer.write if hasattr(writer, "write") else writer.append
+        for fragment in self.iter_html():
+            write(fragment)
+
     # function to convert properties to html string
     def props_to_html(self):
         if self.props is None:
@@ -23,9 +36,14 @@ class HTMLNode:
 
 # leaf node class for nodes with no children
 class LeafNode(HTMLNode):
-    # constructor
+    __slots__ = ()
+
+    # constructor - sets the attributes directly, leaf nodes are created for every inline run
     def __init__(self, tag, value, props=None):
-        super().__init__(tag, value, None, props)
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
 
     # function to convert to html string
     def to_html(self):
@@ -38,29 +56,93 @@ class LeafNode(HTMLNode):
         # return html string
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    # function to yield the html string in fragments
+    def iter_html(self):
+        yield self.to_html()
+
     # function to represent the leaf node as a string
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 # parent node class for nodes with children
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
+    # constructor
+    def __init__(self, tag, children, props=None):
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self.props = props
+
+    # function to convert to html string
+    def to_html(self):
+        return "".join(self.iter_html())
+
+    # function to yield the html string in fragments, walking the tree with an explicit stack
+    def iter_html(self):
+        # stack of nodes still to visit and closing tags still to emit
+        stack = [self]
+        while stack:
+            item = stack.pop()
+
+            # leaf nodes render in one piece
+            if isinstance(item, LeafNode):
+                yield item.to_html()
+
+            # closing tags are pushed as plain strings
+            elif isinstance(item, str):
+                yield item
+
+            # emit the opening tag, then visit the children before the closing tag
+            elif isinstance(item, ParentNode):
+                # check for tag
+                if item.tag is None:
+                    raise ValueError("Invalid HTML: no tag") # raise error if no tag
+                # check for children
+                if item.children is None:
+                    raise ValueError("Invalid HTML: no children") # raise error if no children
+                yield f"<{item.tag}{item.props_to_html()}>"
+                stack.append(f"</{item.tag}>")
+                stack.extend(reversed(item.children))
+
+            # any other node types render themselves
+            else:
+                yield from item.iter_html()
+
+    # function to represent the parent node as a string
+    def __repr__(self):
+        return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
+
+# parent node whose children are produced one at a time while it renders, so a very large page never has
+# all of its nodes in memory at once - the children iterable can only be rendered once
+class StreamingParentNode(HTMLNode):
+    __slots__ = ()
+
     # constructor
     def __init__(self, tag, children, props=None):
-        super().__init__(tag, None, children, props)
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self.props = props
 
     # function to convert to html string
     def to_html(self):
+        return "".join(self.iter_html())
+
+    # function to yield the html string in fragments, rendering each child as it is produced
+    def iter_html(self):
         # check for tag
         if self.tag is None:
             raise ValueError("Invalid HTML: no tag") # raise error if no tag
         # check for children
         if self.children is None:
             raise ValueError("Invalid HTML: no children") # raise error if no children
-        # convert each child to html and concatenate them
-        children_html = "".join(child.to_html() for child in self.children)
-        # return html string with children nested inside parent tag
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        yield f"<{self.tag}{self.props_to_html()}>"
+        for child in self.children:
+            yield from child.iter_html()
+        yield f"</{self.tag}>"
 
-    # function to represent the parent node as a string
+    # function to represent the streaming parent node as a string
     def __repr__(self):
-        return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
\ No newline at end of file
+        return f"StreamingParentNode({self.tag}, {self.props})"
@@ -0,0 +1,100 @@
+# import necessary modules
+import os
+import hashlib
+import logging
+from document import FrontMatterError, iter_lines, read_front_matter
+from manifest import hash_file
+from template import Template
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# directory of the section layouts, beside the default template
+LAYOUTS_DIR = "layouts"
+
+# directory of the partials inside the layouts directory
+PARTIALS_DIR = "partials"
+
+# layouts directory of a default template
+def layouts_dir(template_path):
+    return os.path.join(os.path.dirname(template_path), LAYOUTS_DIR)
+
+# picks the template of each page and compiles every template and partial once per build
+#
+#   template.html             default template
+#   layouts/blog.html         pages under content/blog/, unless a deeper directory has its own layout
+#   layouts/docs/api.html     pages under content/docs/api/
+#   layouts/landing.html      pages with "template: landing" in their front matter
+#   layouts/partials/*.html   partials, included with {% include "header.html" %}
+class Layouts:
+    # constructor
+    def __init__(self, template_path, base_path="/", assets=None):
+        self.template_path = os.path.normpath(template_path)
+        self.directory = layouts_dir(self.template_path)
+        self.base_path = base_path
+        self.assets = assets
+        self.enabled = os.path.isdir(self.directory) # without layouts every page uses the default template
+        self.templates = {} # template path -> compiled template
+        self.partials = {} # partial path -> source
+        self.hashes = {} # file path -> sha256 of its contents
+        self.directories = {} # content directory relative to the content root -> template path
+
+    # read a partial, once per build
+    def read_partial(self, name):
+        path = os.path.normpath(os.path.join(self.directory, PARTIALS_DIR, name))
+        if path not in self.partials:
+            with open(path, "r", encoding="utf-8") as partial_file:
+                self.partials[path] = partial_file.read()
+        return path, self.partials[path]
+
+    # compiled template of a template path, compiled on first use
+    def get(self, path):
+        if path not in self.templates:
+            self.templates[path] = Template.load(path, self.base_path, self.assets, self.read_partial)
+        return self.templates[path]
+
+    # hash of everything a template is compiled from - the template and the partials it includes
+    def hash(self, path):
+        digest = hashlib.sha256()
+        for dependency in self.get(path).dependencies:
+            if dependency not in self.hashes:
+                self.hashes[dependency] = hash_file(dependency)
+            digest.update(f"{dependency}\0{self.hashes[dependency]}\0".encode("utf-8"))
+        return digest.hexdigest()
+
+    # path of a named layout
+    def layout_path(self, name):
+        name = str(name)
+        return os.path.normpath(os.path.join(self.directory, name if name.endswith(".html") else name + ".html"))
+
+    # template of a directory relative to the content root - the layout of the directory or its nearest parent
+    # that has one, or the default template
+    def resolve(self, directory):
+        directory = os.path.normpath(directory)
+        if directory not in self.directories:
+            template_path = self.template_path
+            if self.enabled and directory != ".":
+                layout = os.path.join(self.directory, directory + ".html")
+                template_path = layout if os.path.isfile(layout) else self.resolve(os.path.dirname(directory))
+            self.directories[directory] = template_path
+        return self.directories[directory]
+
+    # template of a page - the layout named in its front matter, or the template of its directory
+    def page_template(self, content_dir, content_path):
+        if not self.enabled:
+            return self.template_path
+
+        # only the front matter is read, the page itself is parsed when it is rendered
+        try:
+            with open(content_path, "r", encoding="utf-8") as markdown_file:
+                metadata, _ = read_front_matter(iter_lines(markdown_file))
+        # an invalid page is reported when it is rendered
+        except (OSError, UnicodeDecodeError, FrontMatterError):
+            metadata = {}
+        if metadata.get("template"):
+            return self.layout_path(metadata["template"])
+        return self.resolve(os.path.dirname(os.path.relpath(content_path, content_dir)))
+
+    # represent the layouts as a string
+    def __repr__(self):
+        return f"Layouts({self.template_path}, {self.directory}, {len(self.templates)} compiled)"
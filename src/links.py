@@ -0,0 +1,202 @@
+# import necessary modules
+import os
+import re
+import logging
+import posixpath
+from urllib.parse import unquote
+from textnode import TextType
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# kinds of urls collected from a page, recorded as the text type of their node while the page is converted
+LINK = TextType.LINK.value
+IMAGE = TextType.IMAGE.value
+
+# regex to match urls that point outside the site - a scheme such as https: or mailto:, or a protocol-relative //
+external_url = re.compile(r"^(?:[A-Za-z][A-Za-z0-9+.-]*:|//)")
+
+# list every file in the output directory as a url path, without the leading /
+def list_outputs(dest_dir):
+    outputs = set()
+    for dirpath, _, filenames in os.walk(dest_dir):
+        for filename in filenames:
+            outputs.add(os.path.relpath(os.path.join(dirpath, filename), dest_dir).replace(os.sep, "/"))
+    return outputs
+
+# url paths a link can be written as to reach an output, e.g. "blog/index.html" is reached by "blog/index.html",
+# "blog/index", "blog/" and "blog"
+def target_paths(output):
+    paths = {output}
+    if output.endswith(".html"):
+        paths.add(output[:-len(".html")])
+    if output == "index.html" or output.endswith("/index.html"):
+        directory = output[:-len("index.html")]
+        paths.update((directory, directory.rstrip("/")))
+    return paths
+
+# links and images of every generated page, checked against the output files at the end of the build - once
+# checked, the index keeps the outputs and the broken links of every page, so a rebuild only re-checks the pages
+# it changed and the pages linking to outputs it added or removed
+class LinkIndex:
+    # constructor
+    def __init__(self, dest_dir, base_path="/"):
+        self.dest_dir = dest_dir
+        self.base_path = base_path
+        self.pages = {} # url path of each page, without the leading / -> [(kind, url)]
+        self.outputs = None # url paths of every output file, known once the links are checked
+        self.broken = {} # page -> [(page, kind, url, reason)] of its broken links
+        self.targets = {} # resolved url path -> pages linking to it
+        self.resolved = {} # page -> resolved url paths of its links
+        self.changed = set() # pages to check again since the last check
+
+    # url path of an output file, without the leading /
+    def page_key(self, output_path):
+        return os.path.relpath(output_path, self.dest_dir).replace(os.sep, "/")
+
+    # record the links of a generated page, replacing those of an earlier build of it
+    def add_page(self, output_path, links):
+        page = self.page_key(output_path)
+        self.pages[page] = list(links)
+        self.changed.add(page)
+        self.add_output(output_path)
+
+    # forget a page whose output was removed
+    def remove_page(self, output_path):
+        page = self.page_key(output_path)
+        self.pages.pop(page, None)
+        self.changed.add(page)
+        self.remove_output(output_path)
+
+    # note an output file written since the last check, so the pages linking to it are checked again
+    def add_output(self, output_path):
+        output = self.page_key(output_path)
+        if self.outputs is not None and output not in self.outputs:
+            self.outputs.add(output)
+            self.output_changed(output)
+
+    # note an output file removed since the last check, so the pages linking to it are checked again
+    def remove_output(self, output_path):
+        output = self.page_key(output_path)
+        if self.outputs is not None and output in self.outputs:
+            self.outputs.discard(output)
+            self.output_changed(output)
+
+    # mark the pages linking to an output for checking
+    def output_changed(self, output):
+        for path in target_paths(output):
+            self.changed.update(self.targets.get(path, ()))
+
+    # resolve a link of a page to an output path, returning (path, None), (None, None) for links that are not
+    # checked, or (None, reason) for links that can never resolve
+    def resolve(self, page, url):
+        # other sites and email addresses are not checked, nor are links to a fragment of the same page
+        if external_url.match(url):
+            return None, None
+        path = unquote(url.split("#", 1)[0].split("?", 1)[0])
+        if not path:
+            return None, None
+
+        # root-relative urls get the base path added when pages are written, so they resolve from the top of
+        # the output
+        if path.startswith("/"):
+            return path[1:], None
+
+        # relative urls resolve against the page's directory, and must stay inside the site
+        resolved = posixpath.normpath(posixpath.join(posixpath.dirname(page), path))
+        if resolved == ".." or resolved.startswith("../"):
+            return None, "points outside the site"
+        if resolved == ".":
+            resolved = ""
+        return resolved + "/" if path.endswith("/") and resolved else resolved, None
+
+    # check if a resolved link finds an output - images must name a file, links may also name a page without
+    # its .html or a directory with an index
+    def found(self, kind, path):
+        if kind == IMAGE:
+            return path in self.outputs
+        if path == "" or path.endswith("/"):
+            return path + "index.html" in self.outputs
+        return path in self.outputs or path + ".html" in self.outputs or path + "/index.html" in self.outputs
+
+    # reason a link finds no output - a root-relative url that starts with the base path likely has it twice,
+    # as the base path is added when pages are written
+    def missing_reason(self, kind, url):
+        if self.base_path != "/" and url.startswith(self.base_path):
+            return f"not found, and already starts with the base path {self.base_path}, which is added at build time"
+        return "missing image" if kind == IMAGE else "no such page or file"
+
+    # check the links of a page against the outputs, remembering what they resolve to and which are broken
+    def check_page(self, page):
+        for path in self.resolved.pop(page, ()):
+            pages = self.targets[path]
+            pages.discard(page)
+            if not pages:
+                del self.targets[path]
+        self.broken.pop(page, None)
+        if page not in self.pages:
+            return []
+
+        broken, resolved = [], set()
+        for kind, url in self.pages[page]:
+            path, reason = self.resolve(page, url)
+            if reason is not None:
+                broken.append((page, kind, url, reason))
+                continue
+            if path is None:
+                continue
+            resolved.add(path)
+            if not self.found(kind, path):
+                broken.append((page, kind, url, self.missing_reason(kind, url)))
+
+        self.resolved[page] = resolved
+        for path in resolved:
+            self.targets.setdefault(path, set()).add(page)
+        if broken:
+            self.broken[page] = broken
+        return broken
+
+    # check the links of every page against a collection of output url paths, returning
+    # (page, kind, url, reason) for each broken link in page order
+    def check(self, outputs):
+        self.outputs = set(outputs)
+        self.broken, self.targets, self.resolved, self.changed = {}, {}, {}, set()
+        for page in self.pages:
+            self.check_page(page)
+        return self.broken_links()
+
+    # check only the pages changed since the last check, and those linking to outputs added or removed since,
+    # returning the broken links found in them
+    def check_changed(self):
+        broken = []
+        for page in sorted(self.changed):
+            broken.extend(self.check_page(page))
+        self.changed = set()
+        return broken
+
+    # every broken link found by the checks so far, in page order
+    def broken_links(self):
+        return [link for page in sorted(self.broken) for link in self.broken[page]]
+
+    # check the links and log every broken one, returning the broken links - checking only what changed since
+    # the last check if outputs is not given
+    def report(self, outputs=None):
+        incremental = outputs is None and self.outputs is not None
+        if incremental:
+            checked = len(self.changed)
+            found = self.check_changed()
+        else:
+            found = self.check(outputs if outputs is not None else list_outputs(self.dest_dir))
+        for page, kind, url, reason in found:
+            logging.warning(f"Broken {kind} in {page}: {url} - {reason}")
+        broken = self.broken_links()
+        if incremental:
+            logging.info(f"Checked the links of {checked} changed pages: {len(broken)} broken in the site.")
+        else:
+            total = sum(len(links) for links in self.pages.values())
+            logging.info(f"Checked {total} links in {len(self.pages)} pages: {len(broken)} broken.")
+        return broken
+
+    # represent the link index as a string
+    def __repr__(self):
+        return f"LinkIndex({self.dest_dir}, {self.base_path}, {len(self.pages)} pages)"
@@ -0,0 +1,164 @@
+# import necessary modules
+import os
+import re
+import json
+import hashlib
+import logging
+from urllib.parse import quote
+from htmlnode import LeafNode, ParentNode
+from pipeline import write_page
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# number of pages listed on each listing page
+DEFAULT_PAGE_SIZE = 10
+
+# directory of the tag pages in the output
+TAGS_DIR = "tags"
+
+# regex to match runs of characters that can not appear in a tag's url - anything but letters and digits,
+# of any script
+slug_pattern = re.compile(r"[\W_]+")
+
+# length of the hash that tells apart tags with the same slug
+SLUG_HASH_LENGTH = 8
+
+# url-safe name of a tag, e.g. "Middle Earth" -> "middle-earth" and "日本" -> "日本" - links percent-encode it
+def tag_slug(tag):
+    return slug_pattern.sub("-", tag.lower()).strip("-") or "tag"
+
+# unique url-safe names of a collection of tags - tags sharing a slug, e.g. "C++" and "C#", get a hash of the
+# tag appended, except a tag that is exactly the slug, so no tag page overwrites another
+def tag_slugs(tags):
+    groups = {}
+    for tag in tags:
+        groups.setdefault(tag_slug(tag), []).append(tag)
+    slugs = {}
+    for slug, group in groups.items():
+        for tag in group:
+            if len(group) == 1 or tag == slug:
+                slugs[tag] = slug
+            else:
+                slugs[tag] = f"{slug}-{hashlib.sha256(tag.encode('utf-8')).hexdigest()[:SLUG_HASH_LENGTH]}"
+    return slugs
+
+# url of page number of a paginated listing - the first page can have its own url
+def listing_url(base_url, number, first_url=None):
+    if number == 1:
+        return first_url or base_url
+    return f"{base_url}page/{number}/"
+
+# output path of a listing page url
+def listing_output_path(dest_dir, url):
+    return os.path.join(dest_dir, *url.strip("/").split("/"), "index.html")
+
+# build the content of a listing page - a list of pages with an optional navigation to the neighbouring pages
+def listing_node(rows, newer_url=None, older_url=None):
+    items = []
+    for url, title, date, words in rows:
+        children = [LeafNode("a", title, {"href": quote(url)})]
+        if date:
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("time", date, {"datetime": date}))
+        children.append(LeafNode(None, f" ({words} words)"))
+        items.append(ParentNode("li", children))
+    nodes = [ParentNode("ul", items, {"class": "listing"})]
+
+    # link the neighbouring listing pages
+    if newer_url or older_url:
+        links = []
+        if newer_url:
+            links.append(LeafNode("a", "Newer", {"href": quote(newer_url), "rel": "prev"}))
+        if older_url:
+            links.append(LeafNode("a", "Older", {"href": quote(older_url), "rel": "next"}))
+        nodes.append(ParentNode("nav", links, {"class": "pagination"}))
+    return ParentNode("div", nodes)
+
+# build the content of the page listing every tag, with the slug of each tag
+def tags_node(tags, slugs):
+    items = [ParentNode("li", [LeafNode("a", tag, {"href": quote(f"/{TAGS_DIR}/{slugs[tag]}/")}),
+                               LeafNode(None, f" ({count})")])
+             for tag, count in tags]
+    return ParentNode("div", [ParentNode("ul", items, {"class": "tags"})])
+
+# renders listing, tag and archive pages from the page index, writing only those whose content changed
+class ListingRenderer:
+    # constructor
+    def __init__(self, page_index, layouts, dest_dir, build_hash, page_size=DEFAULT_PAGE_SIZE):
+        self.page_index = page_index
+        self.layouts = layouts # templates of the sections - a listing uses the layout of its directory
+        self.dest_dir = dest_dir
+        self.build_hash = build_hash # hash of the base path and assets - a change re-renders every listing
+        self.page_size = page_size
+        self.written = [] # urls of listing pages written by the last render
+        self.removed = [] # urls of listing pages removed by the last render
+        self.produced = set() # urls of listing pages produced by the last render
+
+    # render one listing page unless it was already rendered from the same content and template and its output
+    # still exists
+    def render_page(self, url, title, content, key):
+        self.produced.add(url)
+        output_path = listing_output_path(self.dest_dir, url)
+        template_path = self.layouts.resolve(url.strip("/"))
+        digest = hashlib.sha256(json.dumps([self.build_hash, template_path, self.layouts.hash(template_path), title,
+                                            key]).encode("utf-8")).hexdigest()
+        if self.page_index.listing_hash(url) == digest and os.path.isfile(output_path):
+            return
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        write_page(output_path, self.layouts.get(template_path).iter_render({"Title": title, "Content": content()}))
+        self.page_index.set_listing_hash(url, digest)
+        self.written.append(url)
+        logging.info(f"Listing page generated: {output_path}")
+
+    # split pages into listing pages linked to their neighbours
+    def render_paginated(self, base_url, title, rows, first_url=None):
+        count = max(1, (len(rows) + self.page_size - 1) // self.page_size)
+        for number in range(1, count + 1):
+            page_rows = rows[(number - 1) * self.page_size:number * self.page_size]
+            newer_url = listing_url(base_url, number - 1, first_url) if number > 1 else None
+            older_url = listing_url(base_url, number + 1, first_url) if number < count else None
+            page_title = title if number == 1 else f"{title} - page {number}"
+            self.render_page(listing_url(base_url, number, first_url), page_title,
+                             lambda: listing_node(page_rows, newer_url, older_url),
+                             [page_rows, newer_url, older_url])
+
+    # render every listing page, then remove those no longer produced - returns the urls written
+    def render(self):
+        self.written, self.removed, self.produced = [], [], set()
+
+        # an archive of each section, starting on the section's own url unless it has an index page of its own
+        for section, own_url in self.page_index.sections():
+            base_url = f"/{section}/"
+            first_url = f"{base_url}page/1/" if own_url else None
+            self.render_paginated(base_url, section.replace("-", " ").title(), self.page_index.section_pages(section),
+                                  first_url)
+
+        # a page per tag and a page listing every tag
+        tags = self.page_index.tags()
+        slugs = tag_slugs(tag for tag, _ in tags)
+        for tag, _ in tags:
+            self.render_paginated(f"/{TAGS_DIR}/{slugs[tag]}/", f"Tagged: {tag}", self.page_index.tagged_pages(tag))
+        if tags:
+            self.render_page(f"/{TAGS_DIR}/", "Tags", lambda: tags_node(tags, slugs), [tags, slugs])
+
+        # remove listing pages of sections, tags or page numbers that no longer exist - unless a content page
+        # now owns the url, e.g. a section that got its own index page
+        for url in self.page_index.listing_paths():
+            if url not in self.produced:
+                self.page_index.remove_listing(url)
+                if self.page_index.has_url(url):
+                    continue
+                output_path = listing_output_path(self.dest_dir, url)
+                if os.path.isfile(output_path):
+                    os.remove(output_path)
+                    logging.info(f"Removed stale listing page: {output_path}")
+                self.removed.append(url)
+
+        logging.info(f"Listing pages: {len(self.written)} written, {len(self.produced) - len(self.written)} unchanged.")
+        return self.written
+
+    # represent the listing renderer as a string
+    def __repr__(self):
+        return f"ListingRenderer({self.dest_dir}, {self.page_size} per page)"
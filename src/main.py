@@ -1,17 +1,107 @@
 # import necessary modules
+import argparse
+import cProfile
 import logging
+import os
+import pstats
 import sys
-from copy_directory import copy_directory
+import tracing
+from copy_directory import copy_directory, sync_directory
 from generate_content import generate_page_recursive
+from document import STREAM_MIN_SIZE
+from manifest import BuildManifest, hash_build_inputs, cache_dir
+from parse_cache import ParseCache, PARSE_CACHE_NAME
+from block_cache import BlockCache, BLOCK_CACHE_NAME
+from fingerprint import collect_assets, update_fingerprinted_assets
+from precompress import precompress_directory, DEFAULT_MIN_SIZE
+from delta import write_delta
+from links import LinkIndex, list_outputs
+from page_index import PageIndex
+from listings import ListingRenderer, DEFAULT_PAGE_SIZE
+from search import SearchIndex
+from layouts import Layouts
+from planner import plan_build
+from transfer import FileTransfer, TRANSFER_MODES
+from watch import SiteWatcher
 
 # configure logging for debugging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# number of functions listed by --profile
+PROFILE_TOP = 25
+
+# parse command line arguments
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a static site from markdown content.")
+    parser.add_argument("base_path", nargs="?", default="/",
+                        help="base path the site is served from (default: /)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only rebuild pages whose inputs changed since the last build and sync only changed static files")
+    parser.add_argument("--checksum", action="store_true",
+                        help="compare static files by content hash as well as size when syncing")
+    parser.add_argument("--transfer", choices=sorted(TRANSFER_MODES), default="auto",
+                        help="how static files are copied: reflink, zerocopy, hardlink (local previews only), "
+                             "copy, or auto to use the fastest supported (default: auto)")
+    parser.add_argument("--copy-workers", type=int, default=4, metavar="N",
+                        help="number of threads used to copy static files (default: 4)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="number of worker processes used to render pages (default: 1, 0: one per CPU)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="discover, read, render and write pages as concurrent stages, overlapping file I/O with rendering "
+                             "(helps most on network filesystems)")
+    parser.add_argument("--watch", action="store_true",
+                        help="after building, watch the sources and rebuild only what each change affects (implies --incremental)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="parse and render every page from scratch instead of reusing parsed pages and rendered "
+                             "blocks cached in .cache beside the output directory (at most 64 MiB of pages and 32 MiB "
+                             "of blocks, least recently used evicted first)")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="also publish static files under names with a content hash (e.g. index.3f9a1c8d.css) "
+                             "and point page references at them, so they can be cached indefinitely")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write maximum-level .gz (and .br/.zst when brotli/zstandard are installed) siblings "
+                             "of html, css, js, svg and json output")
+    parser.add_argument("--precompress-min-size", type=int, default=DEFAULT_MIN_SIZE, metavar="BYTES",
+                        help="only precompress files at least this large (default: %(default)s)")
+    parser.add_argument("--stream-min-size", type=int, default=STREAM_MIN_SIZE, metavar="BYTES",
+                        help="render markdown files at least this large one block at a time instead of in memory "
+                             "(default: %(default)s)")
+    parser.add_argument("--listings", action="store_true",
+                        help="index the metadata of every page and generate section archives and tag pages from it")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, metavar="N",
+                        help="number of pages on each archive and tag page (default: %(default)s)")
+    parser.add_argument("--search", action="store_true",
+                        help="build a full-text search index of every page, sharded by term prefix, with a loader "
+                             "at search/search.js")
+    parser.add_argument("--fail-on-broken-links", action="store_true",
+                        help="exit with an error if a page links to a missing page or image")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the pages the build would generate, why, and its estimated cost, without writing "
+                             "anything")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record how long each phase of the build takes, as a chrome trace-event file "
+                             "(open in chrome://tracing or ui.perfetto.dev)")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile the build with cProfile and print the functions taking the most time")
+    return parser.parse_args(argv)
+
+# stop profiling and print the functions the build spent the most time in, if profiling, and stop tracing and
+# write the recorded spans to trace_path, if tracing
+def finish_profiling(profiler, trace_path):
+    if profiler is not None:
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats(pstats.SortKey.TIME).print_stats(PROFILE_TOP)
+    if trace_path:
+        tracing.stop().save(trace_path)
+
 # main function
-def main():
+def main(argv=None):
+    # parse the command line arguments
+    args = parse_args(argv)
+
     # determine the base path of the script
-    base_path = sys.argv[1] if len(sys.argv) > 1 else "/"
-    
+    base_path = args.base_path
+
     # normalise base path
     if not base_path.endswith('/'):
         base_path = base_path + '/'
@@ -19,10 +109,22 @@ def main():
         base_path = '/' + base_path
 
     logging.info(f"Base path: {base_path}")
-    
+
+    # determine the number of worker processes for page rendering
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    # record spans for each phase of the build
+    if args.trace:
+        tracing.start()
+
+    # profile the build
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+
     # log the start of the site generation process
     logging.info("Starting site generation...")
-    
+
     # define destination directories
     static_path = "./static"
     dest_path = "./docs"
@@ -31,18 +133,122 @@ def main():
     content_path = "./content"
     template_path = "./template.html"
 
+    # hash the static files to fingerprint them
+    assets = collect_assets(static_path) if args.fingerprint else None
+
+    # load the manifest of the previous build for incremental builds
+    manifest = BuildManifest.load(dest_path, base_path, assets) if args.incremental or args.watch else None
+
+    # pick each page's template from its section or front matter, compiling every template and partial once
+    layouts = Layouts(template_path, base_path, assets)
+
+    # print the plan of the build and stop before anything is written - the page index is not consulted, as
+    # opening it would create it
+    if args.dry_run:
+        search_index = SearchIndex.load(dest_path, base_path) if args.search else None
+        plan = plan_build(content_path, dest_path, layouts, manifest, search_index=search_index)
+        print("\n".join(plan.describe(jobs)))
+        finish_profiling(profiler, args.trace)
+        return
+
+    # reuse pages parsed by earlier builds, e.g. when only the template changed, and blocks rendered before,
+    # e.g. when one paragraph of a long page changed - watching always keeps the blocks in memory across rebuilds
+    cache = None if args.no_cache else ParseCache(os.path.join(cache_dir(dest_path), PARSE_CACHE_NAME))
+    if args.no_cache:
+        block_cache = BlockCache() if args.watch else None
+    else:
+        block_cache = BlockCache.load(os.path.join(cache_dir(dest_path), BLOCK_CACHE_NAME))
+
+    # collect the links and images of every page to check them once the output is complete
+    links = LinkIndex(dest_path, base_path)
+
+    # index the title, date, tags and length of every page to generate listings from
+    page_index = PageIndex(dest_path) if args.listings else None
+
     # copy contents from static directory to destination directory
-    logging.info("Clearing destination directory and copying static files...")
-    copy_directory(static_path, dest_path)
+    with tracing.span("copy_static", "static"), FileTransfer(args.transfer, args.copy_workers) as transfer:
+        if manifest is not None:
+            # keep the existing output, copying only new or changed static files
+            logging.info("Syncing static files with existing output...")
+            result = sync_directory(static_path, dest_path, args.checksum, manifest.previous_static, transfer)
+            manifest.static = result.files
+            logging.info(f"Static files synced: {len(result.copied)} copied, {len(result.skipped)} skipped, {len(result.removed)} removed.")
+        else:
+            logging.info("Clearing destination directory and copying static files...")
+            copy_directory(static_path, dest_path, transfer=transfer)
+
+    # publish the fingerprinted copies, or remove those of an earlier build
+    update_fingerprinted_assets(dest_path, assets or {})
     logging.info("Static files copied successfully.")
 
+    # index the text of every page for search, reusing the index of the last build if it is still in the output
+    search_index = SearchIndex.load(dest_path, base_path) if args.search else None
+
     # generate HTML page from markdown file using template
     logging.info("Generating HTML pages from markdown content...")
-    generate_page_recursive(content_path, template_path, dest_path, base_path)
+    with tracing.span("generate_pages", "build"):
+        generate_page_recursive(content_path, template_path, dest_path, base_path, manifest, jobs, cache, block_cache, assets,
+                                args.pipeline, args.stream_min_size, links, page_index, search_index, layouts)
+
+    # render the archive and tag pages affected by changed pages
+    listings = None
+    if page_index is not None:
+        with tracing.span("listings", "build"):
+            listings = ListingRenderer(page_index, layouts, dest_path, hash_build_inputs(base_path, assets),
+                                       args.page_size)
+            listings.render()
+
+    # write the search index shards of changed pages
+    if search_index is not None:
+        with tracing.span("search_index", "build"):
+            search_index.save()
+
+    # keep the cache within its size limit and keep the rendered blocks for the next build
+    if cache is not None:
+        cache.prune()
+    if block_cache is not None:
+        block_cache.log_stats()
+        block_cache.save()
+
+    # remove pages whose source was deleted
+    if manifest is not None:
+        manifest.remove_stale()
+
+    # write compressed copies of the output, skipping unchanged files in incremental builds
+    if args.precompress:
+        with tracing.span("precompress", "build"):
+            precompress_directory(dest_path, args.precompress_min_size, skip_fresh=manifest is not None)
+
+    # list the files added, changed and removed since the last build for deploys, and save the manifest
+    if manifest is not None:
+        with tracing.span("deploy_delta", "build"):
+            manifest.files = write_delta(dest_path, manifest.previous_files)
+        manifest.save()
+
+    # check every internal link and image against the output, reusing the snapshot of the output if there is one
+    with tracing.span("check_links", "build"):
+        broken = links.report(manifest.files if manifest is not None else list_outputs(dest_path))
+    failed = bool(broken) and args.fail_on_broken_links
 
     # confirm the completion of the site generation process
-    logging.info("Site generation completed successfully.")
+    if failed:
+        logging.error(f"Build failed: {len(broken)} broken links.")
+    else:
+        logging.info("Site generation completed successfully.")
+
+    # print the profile and write the recorded spans
+    finish_profiling(profiler, args.trace)
+
+    # exit with an error once the profile and trace of the failed build are out
+    if failed:
+        sys.exit(1)
+
+    # keep rebuilding as the sources change
+    if args.watch:
+        SiteWatcher(content_path, static_path, template_path, dest_path, base_path, manifest, jobs, cache, block_cache,
+                    assets, links, listings, search_index, layouts,
+                    args.precompress_min_size if args.precompress else None).run()
 
 # run main function if this script is executed
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,231 @@
+# import necessary modules
+import os
+import json
+import hashlib
+import logging
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# version of the generator - bump this to invalidate every existing manifest
+GENERATOR_VERSION = "1.0.0"
+
+# name of the manifest file stored alongside the generated output
+MANIFEST_NAME = ".build-manifest.json"
+
+# name of the file storing the links of every page beside the manifest - kept apart and compact, as it is
+# several times larger than the rest of the manifest and rarely changes between builds
+LINKS_NAME = ".build-links.json"
+
+# directory of the build caches, kept beside the output directory rather than in the working directory
+CACHE_DIR_NAME = ".cache"
+
+# directory of the build caches of a site, beside its output directory
+def cache_dir(dest_dir):
+    return os.path.join(os.path.dirname(os.path.abspath(dest_dir)), CACHE_DIR_NAME)
+
+# compute the sha256 hash of a file's contents
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        # read in chunks so large files are not loaded into memory at once
+        for chunk in iter(lambda: file.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# compute the hash of the build-wide inputs that affect every page - templates are tracked per page
+def hash_build_inputs(base_path, assets=None):
+    digest = hashlib.sha256()
+    digest.update(GENERATOR_VERSION.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(base_path.encode("utf-8"))
+
+    # fingerprinted asset names are written into every page that references them
+    if assets:
+        digest.update(b"\0")
+        digest.update(json.dumps(assets, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+# manifest of input hashes used to skip unchanged pages between builds
+class BuildManifest:
+    # constructor
+    def __init__(self, path, build_hash, previous=None, previous_links=None):
+        self.path = path
+        self.links_path = os.path.join(os.path.dirname(path), LINKS_NAME)
+        self.build_hash = build_hash
+        self.pages = {} # pages seen during this build - source path -> entry
+        self.static = [] # static files synced during this build, relative to the output directory
+
+        # only reuse previous page entries if the build-wide inputs are unchanged
+        previous = previous or {}
+        if previous.get("build") == build_hash:
+            self.previous = previous.get("pages", {})
+        else:
+            self.previous = {}
+
+        # keep the previous outputs and static files so deleted sources can be cleaned up
+        self.previous_outputs = {source: entry["output"] for source, entry in previous.get("pages", {}).items()}
+        self.previous_static = previous.get("static", [])
+
+        # [size, mtime, hash] of every output file at the end of the previous build, for the deploy delta -
+        # carried over unchanged unless this build takes a new snapshot
+        self.previous_files = previous.get("files", {})
+        self.files = self.previous_files
+
+        # source path -> [[kind, url]] of every page as last saved, so unchanged links are not written again
+        self.saved_links = previous_links or {}
+
+    # load the manifest stored in the destination directory
+    @classmethod
+    def load(cls, dest_dir, base_path, assets=None):
+        path = os.path.join(dest_dir, MANIFEST_NAME)
+        build_hash = hash_build_inputs(base_path, assets)
+
+        # read the previous manifest if one exists
+        previous = None
+        if os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as manifest_file:
+                    previous = json.load(manifest_file)
+            # an unreadable manifest just means a full rebuild
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable manifest: {path} - {e}")
+
+        # read the links of the previous pages, which are only used alongside the manifest
+        previous_links = None
+        links_path = os.path.join(dest_dir, LINKS_NAME)
+        if previous is not None and os.path.isfile(links_path):
+            try:
+                with open(links_path, "r", encoding="utf-8") as links_file:
+                    previous_links = json.load(links_file)
+            # unreadable links just mean the links of skipped pages are not checked
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable page links: {links_path} - {e}")
+
+        manifest = cls(path, build_hash, previous, previous_links)
+
+        # log when the build-wide inputs changed and every page must be rebuilt
+        if previous is not None and not manifest.previous:
+            logging.info("Base path, asset fingerprints or generator version changed - rebuilding all pages.")
+        return manifest
+
+    # why a page must be generated again - "new", "changed", "moved", "template-changed", "output-missing" or
+    # "build-changed" when the build-wide inputs changed - or None if it and the (path, hash) of its template are
+    # unchanged since the last build, remembering them for record()
+    def change_reason(self, source_path, output_path, template=None):
+        source_path = os.path.normpath(source_path)
+        output_path = os.path.normpath(output_path)
+        source_hash = hash_file(source_path)
+
+        # remember the page as seen, without a hash until it is successfully generated
+        self.pages[source_path] = {"hash": None, "output": output_path, "pending": source_hash,
+                                   "pending_template": template}
+
+        entry = self.previous.get(source_path)
+        if entry is None:
+            return "build-changed" if source_path in self.previous_outputs else "new"
+        if entry["hash"] != source_hash:
+            return "changed"
+        if entry["output"] != output_path:
+            return "moved"
+
+        # a page is re-rendered when its template or a partial it includes changed
+        if template is not None and (entry.get("template"), entry.get("template_hash")) != tuple(template):
+            return "template-changed"
+
+        # the output must still exist on disk
+        if not os.path.isfile(output_path):
+            return "output-missing"
+        return None
+
+    # check if a page and the (path, hash) of its template are unchanged since the last build
+    def is_fresh(self, source_path, output_path, template=None):
+        return self.change_reason(source_path, output_path, template) is None
+
+    # record a page as successfully generated with its links and the (path, hash) of its template (or skipped
+    # because it was fresh, keeping the links recorded when it was generated)
+    def record(self, source_path, output_path, links=None, template=None):
+        source_path = os.path.normpath(source_path)
+        output_path = os.path.normpath(output_path)
+        entry = self.pages.get(source_path)
+
+        # hash the source if is_fresh() was not called for it since it was last recorded
+        source_hash = entry["pending"] if entry and "pending" in entry else hash_file(source_path)
+        if links is None:
+            links = self.saved_links.get(source_path, []) if source_path in self.previous else []
+        if template is None and entry:
+            template = entry.get("pending_template") or (entry.get("template"), entry.get("template_hash"))
+        self.pages[source_path] = {"hash": source_hash, "output": output_path, "links": [list(link) for link in links]}
+        if template is not None and template[0] is not None:
+            self.pages[source_path]["template"], self.pages[source_path]["template_hash"] = template
+
+    # links of a recorded page as (kind, url) pairs
+    def page_links(self, source_path):
+        entry = self.pages.get(os.path.normpath(source_path), {})
+        return [tuple(link) for link in entry.get("links", [])]
+
+    # forget a deleted source file (or every page under a deleted directory) and remove its outputs
+    def remove_source(self, source_path):
+        source_path = os.path.normpath(source_path)
+        removed = []
+        for source in list(self.pages):
+            if source == source_path or source.startswith(source_path + os.sep):
+                output = self.pages.pop(source)["output"]
+                if os.path.isfile(output):
+                    os.remove(output)
+                    removed.append(output)
+                    logging.info(f"Removed output of deleted page: {output}")
+        return removed
+
+    # remove outputs whose source was deleted since the last build
+    def remove_stale(self):
+        removed = []
+        current_outputs = {entry["output"] for entry in self.pages.values()}
+        for source, output in self.previous_outputs.items():
+            # skip sources that still exist or outputs that are still produced
+            if source in self.pages or output in current_outputs:
+                continue
+            if os.path.isfile(output):
+                try:
+                    os.remove(output)
+                    removed.append(output)
+                    logging.info(f"Removed stale output: {output}")
+                # log any errors encountered during removal
+                except Exception as e:
+                    logging.error(f"Error removing stale output: {output} - {e}")
+        return removed
+
+    # write the manifest to disk, and the links of the pages if they changed since they were last written
+    def save(self):
+        pages = {}
+        links = {}
+        for source, entry in sorted(self.pages.items()):
+            pages[source] = {"hash": entry["hash"], "output": entry["output"]}
+            if entry.get("links"):
+                links[source] = entry["links"]
+            if entry.get("template"):
+                pages[source]["template"] = entry["template"]
+                pages[source]["template_hash"] = entry["template_hash"]
+        data = {"version": GENERATOR_VERSION, "build": self.build_hash, "pages": pages, "static": sorted(self.static),
+                "files": self.files}
+
+        # the links are written first, so a manifest never refers to pages whose links were not saved
+        if links != self.saved_links and self.write(self.links_path, json.dumps(links, separators=(",", ":"))):
+            self.saved_links = links
+        self.write(self.path, json.dumps(data, separators=(",", ":")))
+
+    # write a file through a temporary file and rename, so an interrupted build never leaves a truncated one -
+    # returns True if it was written
+    def write(self, path, text):
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as manifest_file:
+                manifest_file.write(text)
+            os.replace(temp_path, path)
+            return True
+        # log any errors encountered during writing
+        except Exception as e:
+            logging.error(f"Error writing manifest: {path} - {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
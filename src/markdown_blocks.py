@@ -1,5 +1,4 @@
 # import necessary modules
-import os
 import re
 from enum import Enum
 from htmlnode import ParentNode
@@ -15,52 +14,135 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
     UNORDERED_LIST = "unordered_list"
 
+# block of markdown with its type and its lines already split
+class Block:
+    # fixed attributes instead of a per-instance __dict__, large documents create many blocks
+    __slots__ = ("block_type", "lines")
+
+    # constructor
+    def __init__(self, block_type, lines):
+        self.block_type = block_type
+        self.lines = lines
+
+    # the block as a markdown string
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    # check if two blocks are equal
+    def __eq__(self, other):
+        return self.block_type == other.block_type and self.lines == other.lines
+
+    # represent the block as a string
+    def __repr__(self):
+        return f"Block({self.block_type}, {self.lines})"
+
 # function to convert markdown string to list of blocks
 def markdown_to_blocks(markdown):
-    # list to hold the final blocks
-    final_blocks = []
+    return [block.text for block in scan_blocks(markdown)]
 
-    # split the markdown by double newlines to get separate blocks
-    blocks = markdown.split("\n\n")
-    
-    # iterate through each block
-    for block in blocks:
-        block = block.strip() # trim whitespace
-      
-        # skip empty blocks
-        if block == "":
+# function to scan markdown line by line, yielding typed blocks
+def scan_blocks(markdown):
+    yield from scan_lines(markdown.split("\n"))
+
+# function to scan lines of markdown once, tracking fence state and classifying each block as it ends
+def scan_lines(lines, literal_first=False):
+    block_lines = [] # lines of the block being collected
+    fence = None # fence characters of an open code block, e.g. "```"
+
+    # iterate through each line
+    for line in lines:
+        # inside a fenced code block, every line belongs to the block until the closing fence
+        if fence is not None:
+            block_lines.append(line)
+            if is_closing_fence(line, fence):
+                block_lines[-1] = line.rstrip()
+                yield Block(BlockType.CODE, block_lines)
+                block_lines, fence = [], None
+            continue
+
+        # a blank line ends the current block
+        if not line or line.isspace():
+            if block_lines:
+                yield classify_lines(block_lines)
+                block_lines = []
             continue
 
-        # add the block to final_blocks
-        final_blocks.append(block)
+        # the first line of a block decides if it is a heading or a code block
+        if not block_lines:
+            line = line.lstrip()
+
+            # headings are always a single line
+            if is_heading_block(line):
+                yield Block(BlockType.HEADING, [line])
+                continue
+
+            # an opening fence starts a code block, unless the caller is re-scanning an unclosed one
+            open = code_fence_char.match(line)
+            if open and not literal_first:
+                fence = open_fence(line, open.group(1))
+                block_lines.append(line)
+                continue
+            literal_first = False
+
+        block_lines.append(line)
+
+    # an unclosed fence is not a code block - re-scan its lines as ordinary blocks
+    if fence is not None:
+        yield from scan_lines(block_lines, literal_first=True)
+
+    # add the final block
+    elif block_lines:
+        yield classify_lines(block_lines)
+
+# function to classify the lines of a block that is not a heading or code block, checking each line once
+def classify_lines(lines):
+    # strip trailing whitespace from the block
+    lines[-1] = lines[-1].rstrip()
+
+    # the first character decides which block type is possible
+    first = lines[0][:1]
+
+    # check if it's a quote block - every line starts with >
+    if first == ">":
+        for line in lines:
+            if not line.startswith(">"):
+                return Block(BlockType.PARAGRAPH, lines)
+        return Block(BlockType.QUOTE, lines)
+
+    # check if it's an unordered list block - every line starts with "- "
+    if first == "-":
+        for line in lines:
+            if not line.startswith("- "):
+                return Block(BlockType.PARAGRAPH, lines)
+        return Block(BlockType.UNORDERED_LIST, lines)
+
+    # check if it's an ordered list block - lines are numbered from 1
+    if first == "1":
+        for number, line in enumerate(lines, 1):
+            if not line.startswith(f"{number}. "):
+                return Block(BlockType.PARAGRAPH, lines)
+        return Block(BlockType.ORDERED_LIST, lines)
 
-    return final_blocks
+    # if not any other block type, it's a paragraph
+    return Block(BlockType.PARAGRAPH, lines)
 
 # function to determine the block type based on its content
 def block_to_block_type(block):
+    return block_from_text(block).block_type
+
+# function to classify a markdown string as a single block
+def block_from_text(block):
     # check if it's a heading block
     if is_heading_block(block):
-        return BlockType.HEADING
+        return Block(BlockType.HEADING, block.split("\n"))
 
     # check if it's a code block
-    elif is_code_block(block):
-        return BlockType.CODE
+    if is_code_block(block):
+        return Block(BlockType.CODE, block.splitlines())
 
-    # check if it's a quote block
-    elif is_quote_block(block):
-        return BlockType.QUOTE
-    
-    # check if it's an ordered list block
-    elif is_ordered_list_block(block):
-        return BlockType.ORDERED_LIST
-
-    # check if it's an unordered list block
-    elif is_unordered_list_block(block):
-        return BlockType.UNORDERED_LIST
-
-    # if not any other block type, it's a paragraph
-    else:
-        return BlockType.PARAGRAPH
+    # otherwise check the lines for quote, list or paragraph
+    return classify_lines(block.split("\n"))
 
 
 # BLOCK TYPE HELPER FUNCTIONS
@@ -72,6 +154,15 @@ def is_heading_block(block):
 # regex to match opening code fence (` or ~)
 code_fence_char = re.compile(r'^([`~])\1{2,}(?:\s|$)')
 
+# helper function to get the full opening fence, e.g. "````" for a fence of four backticks
+def open_fence(line, fence_char):
+    return fence_char * (len(line) - len(line.lstrip(fence_char)))
+
+# helper function to check if a line closes a code block - the fence character repeated at least as many times
+def is_closing_fence(line, fence):
+    line = line.rstrip()
+    return line.startswith(fence) and line.count(fence[0]) == len(line)
+
 # helper function to check if a block is a code block
 def is_code_block(block):
     # split the block into lines
@@ -82,108 +173,62 @@ def is_code_block(block):
         return False
 
     # check if the first line starts with at least 3 backticks or tildes - (` or ~)
-    open = re.match(code_fence_char, lines[0])
+    open = code_fence_char.match(lines[0])
     if not open:
         return False
 
-    # check the fence character (` or ~)
-    fence_char = open.group(1)
-
-    # determine the length of the opening fence
-    open_len = len(re.match(rf'^({re.escape(fence_char)}+)', lines[0]).group(1))
-
     # check if the last line has a matching closing fence of at least the same length
-    return re.match(rf'^{re.escape(fence_char)}{{{open_len},}}\s*$', lines[-1]) is not None
+    return is_closing_fence(lines[-1], open_fence(lines[0], open.group(1)))
 
 # helper function to check if a block is a quote block
 def is_quote_block(block):
-    # split the block into lines
-    lines = block.split("\n")
-
-    # check if every line starts with >
-    for line in lines:
-        if not line.startswith(">"):
-            return False # if any line does not start with >, it's not a quote
-    return True
+    return block_from_text(block).block_type == BlockType.QUOTE
 
 # helper function to check if a block is an ordered list block
 def is_ordered_list_block(block):
-    # split the block into lines
-    lines = block.split("\n")
-
-    # check if every line starts with 1 followed by a dot and a space, and increments correctly
-    i = 1
-    for line in lines:
-        if not line.startswith(f"{i}. "):
-            return False # if any line does not start with the expected number, it's not an ordered list
-        i += 1
-    return True
+    return block_from_text(block).block_type == BlockType.ORDERED_LIST
 
+# helper function to check if a block is an unordered list block
 def is_unordered_list_block(block):
-    # split the block into lines
-    lines = block.split("\n")
-
-    # check if every line starts with "- "
-    for line in lines:
-        if not line.startswith("- "):
-            return False # if any line does not start with "- ", it's not an unordered list
-    return True
+    return block_from_text(block).block_type == BlockType.UNORDERED_LIST
 
 # convert a markdown to an HTMLNodes
 def markdown_to_html_node(markdown):
-    # convert the markdown to blocks
-    blocks = markdown_to_blocks(markdown)
-
-    # convert each block to an HTMLNode and wrap in a ParentNode with tag "div"
+    # scan the markdown into typed blocks, convert each block to an HTMLNode and wrap in a ParentNode with tag "div"
     child_nodes = []
-    for block in blocks:
+    for block in scan_blocks(markdown):
         html_node = block_to_html_node(block)
         child_nodes.append(html_node)
     return ParentNode("div", child_nodes, None)
 
-# convert a block to an HTMLNode
-def block_to_html_node(block):
-    # check the block type
-    block_type = block_to_block_type(block)
+# convert a block (or a markdown string for a single block) to an HTMLNode, adding the (kind, url) of each link
+# and image converted to the links list if given
+def block_to_html_node(block, links=None):
+    # classify markdown strings first
+    if isinstance(block, str):
+        block = block_from_text(block)
+
+    # look up the converter for the block type
+    converter = block_converters.get(block.block_type)
 
-    # check if it's a paragraph block
-    if block_type == BlockType.PARAGRAPH:
-        return paragraph_block_to_html_node(block)
-    
-    # check if it's a heading block
-    elif block_type == BlockType.HEADING:
-        return heading_block_to_html_node(block)
-    
-    # check if it's a code block
-    elif block_type == BlockType.CODE:
-        return code_block_to_html_node(block)
-    
-    # check if it's a quote block
-    elif block_type == BlockType.QUOTE:
-        return quote_block_to_html_node(block)
-    
-    # check if it's an ordered list block
-    elif block_type == BlockType.ORDERED_LIST:
-        return ordered_list_block_to_html_node(block)
-    
-    # check if it's an unordered list block
-    elif block_type == BlockType.UNORDERED_LIST:
-        return unordered_list_block_to_html_node(block)
-    
     # if not a valid block type, raise an error
-    else:
-        raise ValueError(f"Invalid block type: {block_type}")
+    if converter is None:
+        raise ValueError(f"Invalid block type: {block.block_type}")
+    return converter(block, links)
 
 # BLOCK TYPE TO HTML NODE HELPER FUNCTIONS
 
-# function to convert text to child nodes
-def text_to_child_nodes(text):
+# function to convert text to child nodes, recording the links and images found in the links list if given
+def text_to_child_nodes(text, links=None):
     # convert the text to text nodes
     text_nodes = text_to_textnodes(text)
 
     # convert each text node to an HTMLNode
     child_nodes = []
     for text_node in text_nodes:
+        # only link and image nodes have a url - their kind is the value of their text type, "link" or "image"
+        if links is not None and text_node.url is not None:
+            links.append((text_node.text_type.value, text_node.url))
         html_node = text_node_to_html_node(text_node)
         child_nodes.append(html_node)
 
@@ -191,54 +236,39 @@ def text_to_child_nodes(text):
     return child_nodes
 
 # convert a paragraph block to an HTMLNode
-def paragraph_block_to_html_node(block):
-    # split the block into lines
-    lines = block.split("\n")
-    
-    # strip leading/trailing whitespace and join with a space
-    for line in lines:
-        line = line.strip()
-    paragraph = " ".join(lines)
+def paragraph_block_to_html_node(block, links=None):
+    # join the lines with a space
+    paragraph = " ".join(block.lines)
 
     # convert the paragraph text to child nodes
-    child_nodes = text_to_child_nodes(paragraph)
+    child_nodes = text_to_child_nodes(paragraph, links)
 
     # return a ParentNode with tag "p" and the child nodes
     return ParentNode("p", child_nodes)
 
+# heading tags by level, shared by every heading node instead of formatting a new string each time
+heading_tags = (None, "h1", "h2", "h3", "h4", "h5", "h6")
+
 # convert a heading block to an HTMLNode
-def heading_block_to_html_node(block):
-    if not is_heading_block(block):
-        raise ValueError("Invalid heading block")
-    
-    # check heading level by counting leading #
-    match = re.match(r'^(#{1,6})\s+(.*)', block)
+def heading_block_to_html_node(block, links=None):
+    line = block.lines[0]
 
-    # determine heading level
-    level = len(match.group(1))
+    # determine heading level by counting leading #
+    level = len(line) - len(line.lstrip("#"))
 
     # get the heading text
-    heading_text = match.group(2).strip()
+    heading_text = line[level:].strip()
 
     # convert the heading text to child nodes
-    child_nodes = text_to_child_nodes(heading_text)
+    child_nodes = text_to_child_nodes(heading_text, links)
 
     # return a ParentNode with the appropriate heading tag and child nodes
-    return ParentNode(f"h{level}", child_nodes)
-
-# convert a code block to an HTMLNode
-def code_block_to_html_node(block):
-    # if not a valid code block, raise an error
-    if not is_code_block(block):
-        raise ValueError("Invalid code block")
-    
-    # match the opening fence
-    open = re.match(code_fence_char, block)
-    fence_char = open.group(1)
+    return ParentNode(heading_tags[level], child_nodes)
 
-    # strip the opening and closing fence characters
-    code_text = re.sub(rf'^{re.escape(fence_char)}{{3,}}.*\n', '', block)
-    code_text = re.sub(rf'\n{re.escape(fence_char)}{{3,}}\s*$', '', code_text)
+# convert a code block to an HTMLNode - code is rendered literally, so it has no links
+def code_block_to_html_node(block, links=None):
+    # drop the opening and closing fence lines
+    code_text = "\n".join(block.lines[1:-1])
 
     # create a TextNode for the code text and convert to HTMLNode
     code_node = TextNode(code_text, TextType.PLAIN)
@@ -248,58 +278,50 @@ def code_block_to_html_node(block):
     return ParentNode("pre", [ParentNode("code", [child])])
 
 # convert a quote block to an HTMLNode
-def quote_block_to_html_node(block):
-    # if not a valid quote block, raise an error
-    if not is_quote_block(block):
-        raise ValueError("Invalid quote block")
-    
-    # split the block into lines
-    lines = block.split("\n")
-
+def quote_block_to_html_node(block, links=None):
     # remove leading > and any whitespace from each line and join with a space
     formatted_lines = []
-    for line in lines:
+    for line in block.lines:
         formatted_lines.append(line.lstrip(">").strip())
     quote_text = " ".join(formatted_lines)
 
     # convert the quote text to child nodes
-    child_nodes = text_to_child_nodes(quote_text)
+    child_nodes = text_to_child_nodes(quote_text, links)
 
     # return a ParentNode with tag "blockquote" and the child nodes
     return ParentNode("blockquote", child_nodes)
 
+# regex to match the number and dot at the start of an ordered list item
+ordered_list_marker = re.compile(r"^\d+\.\s+")
+
 # convert an ordered list block to an HTMLNode
-def ordered_list_block_to_html_node(block):
-    # if not a valid ordered list block, raise an error
-    if not is_ordered_list_block(block):
-        raise ValueError("Invalid ordered list block")
-    
-    # split the block into lines
-    items = block.split("\n")
-    
+def ordered_list_block_to_html_node(block, links=None):
     # remove leading number and dot, convert to child nodes, and wrap in <li> tags
     list_items = []
-    for item in items:
-        item_text = re.sub(r"^\d+\.\s+", "", item)
-        child_nodes = text_to_child_nodes(item_text)
+    for item in block.lines:
+        item_text = ordered_list_marker.sub("", item)
+        child_nodes = text_to_child_nodes(item_text, links)
         list_items.append(ParentNode("li", child_nodes))
     
     # return a ParentNode with tag "ol" and the list items
     return ParentNode("ol", list_items)
 
 # convert an unordered list block to an HTMLNode
-def unordered_list_block_to_html_node(block):
-    # if not a valid unordered list block, raise an error
-    if not is_unordered_list_block(block):
-        raise ValueError("Invalid unordered list block")
-    
-    # split the block into lines
-    items = block.split("\n")
-
+def unordered_list_block_to_html_node(block, links=None):
     # remove leading "- " and space, convert to child nodes, and wrap in <li> tags
     list_items = []
-    for item in items:
+    for item in block.lines:
         item_text = item[2:].strip()
-        child_nodes = text_to_child_nodes(item_text)
+        child_nodes = text_to_child_nodes(item_text, links)
         list_items.append(ParentNode("li", child_nodes))
-    return ParentNode("ul", list_items)
\ No newline at end of file
+    return ParentNode("ul", list_items)
+
+# converter for each block type
+block_converters = {
+    BlockType.PARAGRAPH: paragraph_block_to_html_node,
+    BlockType.HEADING: heading_block_to_html_node,
+    BlockType.CODE: code_block_to_html_node,
+    BlockType.QUOTE: quote_block_to_html_node,
+    BlockType.ORDERED_LIST: ordered_list_block_to_html_node,
+    BlockType.UNORDERED_LIST: unordered_list_block_to_html_node,
+}
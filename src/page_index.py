@@ -0,0 +1,195 @@
+# import necessary modules
+import os
+import sqlite3
+import logging
+from manifest import hash_file, cache_dir
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# file name of the page index inside the build caches
+INDEX_NAME = "pages.sqlite3"
+
+# version of the index schema - bump this to rebuild existing indexes from scratch
+INDEX_VERSION = 1
+
+# tables of the index - pages and their tags, and a hash of the content of each rendered listing page
+schema = """
+CREATE TABLE IF NOT EXISTS pages (
+    source TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    section TEXT NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT,
+    words INTEGER NOT NULL,
+    draft INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tags (
+    source TEXT NOT NULL REFERENCES pages (source) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (source, tag)
+);
+CREATE INDEX IF NOT EXISTS pages_section ON pages (section, date);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag);
+CREATE TABLE IF NOT EXISTS listings (
+    path TEXT PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+"""
+
+# order of pages in listings - newest first, undated pages last, then by title
+listing_order = "ORDER BY date IS NULL, date DESC, title, url"
+
+# url of a page from its output path, e.g. docs/blog/post/index.html -> /blog/post/
+def page_url(dest_dir, output_path):
+    relative = os.path.relpath(output_path, dest_dir).replace(os.sep, "/")
+    if relative == "index.html":
+        return "/"
+    if relative.endswith("/index.html"):
+        return "/" + relative[:-len("index.html")]
+    return "/" + relative
+
+# section of a page url - its first directory, or "" for pages at the top of the site
+def page_section(url):
+    parts = url.strip("/").split("/")
+    return parts[0] if len(parts) > 1 or (url.endswith("/") and parts[0]) else ""
+
+# metadata of every page in a local sqlite database, updated page by page as pages are generated
+# so listings can be queried without reading any markdown
+class PageIndex:
+    # constructor - open or create the database, by default in the build caches beside the output directory
+    def __init__(self, dest_dir, path=None):
+        self.dest_dir = dest_dir
+        self.path = path or os.path.join(cache_dir(dest_dir), INDEX_NAME)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.connection = self.connect()
+
+    # open the database, recreating it if it is unreadable or from another schema version
+    def connect(self):
+        connection = sqlite3.connect(self.path)
+        try:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, INDEX_VERSION):
+                raise sqlite3.DatabaseError(f"schema version {version}")
+        # start again from an empty index, every page is indexed again as it is generated
+        except sqlite3.DatabaseError as e:
+            logging.warning(f"Recreating unreadable page index: {self.path} - {e}")
+            connection.close()
+            os.remove(self.path)
+            connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.executescript(schema)
+        connection.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        return connection
+
+    # check if a page has a row in the index
+    def has(self, source_path):
+        source_path = os.path.normpath(source_path)
+        return self.connection.execute("SELECT 1 FROM pages WHERE source = ?", (source_path,)).fetchone() is not None
+
+    # check if a page in the index is published at a url
+    def has_url(self, url):
+        return self.connection.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    # source paths of every page in the index
+    def sources(self):
+        return {source for (source,) in self.connection.execute("SELECT source FROM pages")}
+
+    # record the metadata of a generated page, only writing the row if its source changed -
+    # returns True if the row was written
+    def update(self, source_path, output_path, summary):
+        source_path = os.path.normpath(source_path)
+        source_hash = hash_file(source_path)
+        url = page_url(self.dest_dir, output_path)
+
+        # skip pages whose source and output are unchanged since they were indexed
+        row = self.connection.execute("SELECT hash, url FROM pages WHERE source = ?", (source_path,)).fetchone()
+        if row == (source_hash, url):
+            return False
+
+        # replace the page and its tags
+        with self.connection:
+            self.connection.execute("DELETE FROM pages WHERE source = ?", (source_path,))
+            self.connection.execute(
+                "INSERT INTO pages (source, url, section, title, date, words, draft, hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (source_path, url, page_section(url), summary["title"], summary["date"], summary["words"],
+                 int(summary["draft"]), source_hash))
+            self.connection.executemany("INSERT OR IGNORE INTO tags (source, tag) VALUES (?, ?)",
+                                        [(source_path, tag) for tag in summary["tags"]])
+        return True
+
+    # forget a deleted page, or every page under a deleted directory
+    def remove(self, source_path):
+        source_path = os.path.normpath(source_path)
+        with self.connection:
+            self.connection.execute("DELETE FROM pages WHERE source = ? OR source LIKE ? ESCAPE '\\'",
+                                    (source_path, escape_like(source_path + os.sep) + "%"))
+
+    # forget every page that is not among the given source paths, returning how many were removed
+    def remove_missing(self, source_paths):
+        current = {os.path.normpath(path) for path in source_paths}
+        missing = [(source,) for (source,) in self.connection.execute("SELECT source FROM pages") if source not in current]
+        with self.connection:
+            self.connection.executemany("DELETE FROM pages WHERE source = ?", missing)
+        return len(missing)
+
+    # sections with pages to list, as (section, url of the section's own index page or None)
+    def sections(self):
+        return self.connection.execute(
+            "SELECT section, (SELECT url FROM pages AS own WHERE own.url = '/' || listed.section || '/') "
+            "FROM pages AS listed WHERE section != '' AND url != '/' || section || '/' AND draft = 0 "
+            "GROUP BY section ORDER BY section").fetchall()
+
+    # pages of a section in listing order, as (url, title, date, words)
+    def section_pages(self, section):
+        return self.connection.execute(
+            "SELECT url, title, date, words FROM pages "
+            f"WHERE section = ? AND url != '/' || section || '/' AND draft = 0 {listing_order}", (section,)).fetchall()
+
+    # every tag with the number of pages using it, in tag order
+    def tags(self):
+        return self.connection.execute(
+            "SELECT tag, COUNT(*) FROM tags JOIN pages USING (source) WHERE draft = 0 GROUP BY tag ORDER BY tag").fetchall()
+
+    # pages with a tag in listing order, as (url, title, date, words)
+    def tagged_pages(self, tag):
+        return self.connection.execute(
+            "SELECT url, title, date, words FROM pages JOIN tags USING (source) "
+            f"WHERE tag = ? AND draft = 0 {listing_order}", (tag,)).fetchall()
+
+    # hash of the content a listing page was last rendered from
+    def listing_hash(self, path):
+        row = self.connection.execute("SELECT hash FROM listings WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else None
+
+    # remember the hash of the content a listing page was rendered from
+    def set_listing_hash(self, path, digest):
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO listings (path, hash) VALUES (?, ?)", (path, digest))
+
+    # every listing page rendered by an earlier build
+    def listing_paths(self):
+        return [path for (path,) in self.connection.execute("SELECT path FROM listings ORDER BY path")]
+
+    # forget a listing page that is no longer produced
+    def remove_listing(self, path):
+        with self.connection:
+            self.connection.execute("DELETE FROM listings WHERE path = ?", (path,))
+
+    # number of pages in the index
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    # close the database
+    def close(self):
+        self.connection.close()
+
+    # represent the page index as a string
+    def __repr__(self):
+        return f"PageIndex({self.path}, {len(self)} pages)"
+
+# escape the wildcards of a LIKE pattern
+def escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,147 @@
+# import necessary modules
+import os
+import sys
+import pickle
+import hashlib
+import logging
+from document import Document
+from htmlnode import LeafNode, ParentNode
+from markdown_blocks import Block, BlockType
+from manifest import cache_dir
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# version of the parser output - bump this whenever parsing or html conversion changes,
+# so documents cached by an older parser are never reused
+PARSER_VERSION = "2"
+
+# directory of the parse cache inside the build caches, and its default size limit
+PARSE_CACHE_NAME = "parse"
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# file extension of cache entries
+CACHE_SUFFIX = ".pickle"
+
+# convert an HTMLNode tree to nested tuples - (tag, value, props) for leaves, (tag, [children], props) for parents
+def node_to_tuple(node):
+    if isinstance(node, LeafNode):
+        return (node.tag, node.value, node.props)
+    return (node.tag, [node_to_tuple(child) for child in node.children], node.props)
+
+# convert nested tuples back to an HTMLNode tree
+def tuple_to_node(data):
+    tag, value, props = data
+    if isinstance(value, list):
+        return ParentNode(tag, [tuple_to_node(child) for child in value], props)
+    return LeafNode(tag, value, props)
+
+# on-disk cache of parsed documents keyed by content hash and parser version, evicting least recently used entries
+class ParseCache:
+    # constructor
+    def __init__(self, directory, max_bytes=DEFAULT_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    # compute the cache key of a markdown string
+    def key(self, markdown):
+        digest = hashlib.sha256()
+        # pickles are only guaranteed to load into the same parser on the same python
+        digest.update(f"{PARSER_VERSION}\0{sys.version_info[0]}.{sys.version_info[1]}\0".encode("utf-8"))
+        digest.update(markdown.encode("utf-8"))
+        return digest.hexdigest()
+
+    # path of the cache entry for a key
+    def entry_path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    # parse a markdown string, reusing the cached document and html tree when the content was parsed before
+    # (converting the blocks of a new document through a block cache if given)
+    def parse(self, markdown, path=None, block_cache=None):
+        key = self.key(markdown)
+        document = self.get(key, path)
+        if document is not None:
+            self.hits += 1
+            return document
+
+        # parse and convert the document, then store both
+        self.misses += 1
+        document = Document.parse(markdown, path)
+        document.to_html_node(block_cache)
+        self.put(key, document)
+        return document
+
+    # load a cached document, or None if it is missing or unreadable
+    def get(self, key, path=None):
+        entry = self.entry_path(key)
+        try:
+            with open(entry, "rb") as cache_file:
+                metadata, blocks, children, links = pickle.load(cache_file)
+            # mark the entry as recently used for eviction
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        # a corrupt entry is treated as a miss and overwritten
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable parse cache entry: {entry} - {e}")
+            return None
+
+        document = Document([Block(BlockType(block_type), lines) for block_type, lines in blocks], metadata, path)
+        document.children = [tuple_to_node(child) for child in children]
+        document.links = links
+        return document
+
+    # store a parsed document with its html tree and links, written atomically so concurrent builds never see a partial entry
+    def put(self, key, document):
+        entry = self.entry_path(key)
+        temp_path = f"{entry}.{os.getpid()}.tmp"
+        data = (document.metadata,
+                [(block.block_type.value, block.lines) for block in document.blocks],
+                [node_to_tuple(child) for child in document.children],
+                document.links)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, "wb") as cache_file:
+                pickle.dump(data, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, entry)
+        # a cache that cannot be written only costs speed
+        except Exception as e:
+            logging.warning(f"Error writing parse cache entry: {entry} - {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    # remove the least recently used entries until the cache fits its size limit, returning the number removed
+    def prune(self):
+        if not os.path.isdir(self.directory):
+            return 0
+
+        # collect (last used, size, path) for every entry
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(CACHE_SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        # remove the oldest entries first
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        if removed:
+            logging.info(f"Evicted {removed} parse cache entries to stay under {self.max_bytes} bytes")
+        return removed
+
+    # represent the cache as a string
+    def __repr__(self):
+        return f"ParseCache({self.directory}, {self.max_bytes} bytes, {self.hits} hits, {self.misses} misses)"
@@ -0,0 +1,207 @@
+# import necessary modules
+import os
+import asyncio
+import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from document import Document, StreamedDocument, STREAM_MIN_SIZE
+from delta import replace_if_changed
+import tracing
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# number of files read at the same time - reads mostly wait on the disk or network
+READ_CONCURRENCY = 8
+
+# number of files written at the same time
+WRITE_CONCURRENCY = 4
+
+# pages buffered between stages per render worker - bounds the markdown and html held in memory
+QUEUE_PAGES_PER_WORKER = 4
+
+# pages taken from discovery per thread hand-off
+DISCOVER_BATCH = 16
+
+# read a markdown file
+def read_markdown(markdown_path):
+    with tracing.span("read", "page", path=markdown_path):
+        with open(markdown_path, "r", encoding="utf-8") as markdown_file:
+            return markdown_file.read()
+
+# render markdown to a complete html page using a compiled template, returning the page, its links, its summary,
+# including its search terms if search_terms is set, and the spans recorded in a worker process if trace is set
+def render_page(markdown, markdown_path, template, cache=None, block_cache=None, search_terms=False, trace=False):
+    if trace:
+        tracing.start()
+    with tracing.span("parse", "page"):
+        if cache is None:
+            document = Document.parse(markdown, markdown_path)
+        else:
+            document = cache.parse(markdown, markdown_path, block_cache)
+    with tracing.span("to_html_node", "page"):
+        html_node = document.to_html_node(block_cache)
+
+    # when tracing, serialize the page and fill the template separately so each phase gets its own span
+    if tracing.active is None:
+        html = template.render(Title=document.title, Content=html_node)
+    else:
+        with tracing.span("to_html", "page"):
+            content = html_node.to_html()
+        with tracing.span("template", "page"):
+            html = template.render(Title=document.title, Content=content)
+    events = tracing.stop().events if trace else None
+    return html, document.find_links(), page_summary(document, search_terms), events
+
+# listing metadata of a page, with its search terms if search_terms is set
+def page_summary(document, search_terms=False):
+    summary = document.summary()
+    if search_terms:
+        summary["terms"] = document.search_terms()
+    return summary
+
+# render a large markdown file straight into its page, one block at a time, returning its links, its summary
+# and the spans recorded in a worker process if trace is set
+def stream_page(markdown_path, dest_path, template, search_terms=False, trace=False):
+    if trace:
+        tracing.start()
+    with tracing.span("read_front_matter", "page", path=markdown_path):
+        document = StreamedDocument.load(markdown_path)
+    with tracing.span("write", "page", path=dest_path):
+        write_page(dest_path, template.iter_render({"Title": document.title, "Content": document.to_html_node()}))
+    events = tracing.stop().events if trace else None
+    return document.find_links(), page_summary(document, search_terms), events
+
+# write the fragments of a page atomically, keeping the existing file if it is identical - returns True if it was replaced
+def write_page(dest_path, fragments):
+    temp_path = dest_path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as dest_file:
+            dest_file.writelines(fragments)
+        return replace_if_changed(temp_path, dest_path)
+    # remove the partial file and let the caller report the error
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+# discover, read, render and write pages as concurrent stages connected by bounded queues - pages is an iterable
+# of (markdown path, destination path, compiled template), consumed on a thread as the first stage so pages are
+# read while the rest of the site is still being discovered - returning (markdown path, destination path,
+# generated, error, events, links, summary) for each page in discovery order
+async def run_pipeline(pages, jobs=1, cache=None, block_cache=None, stream_min_size=STREAM_MIN_SIZE,
+                       search_terms=False):
+    loop = asyncio.get_running_loop()
+    results, templates = [], []
+    pages_iterator = iter(pages)
+
+    # queues between the stages - full queues make the earlier stage wait
+    pending = asyncio.Queue(maxsize=jobs * QUEUE_PAGES_PER_WORKER)
+    to_render = asyncio.Queue(maxsize=jobs * QUEUE_PAGES_PER_WORKER)
+    to_write = asyncio.Queue(maxsize=jobs * QUEUE_PAGES_PER_WORKER)
+
+    # record a failed page
+    def fail(index, error):
+        content_path, dest_path = results[index][:2]
+        results[index] = (content_path, dest_path, False, str(error), None, [], {})
+
+    # record a generated page, with the spans recorded for it in a worker process
+    def succeed(index, events, links, summary):
+        content_path, dest_path = results[index][:2]
+        results[index] = (content_path, dest_path, True, None, events, links, summary)
+
+    # discover pages on a thread a batch at a time, handing each to the read stage, then stop the readers -
+    # even if discovery fails, so no stage is left waiting
+    async def discover_stage():
+        try:
+            with tracing.span("plan_build", "walk"):
+                while batch := await asyncio.to_thread(lambda: list(itertools.islice(pages_iterator, DISCOVER_BATCH))):
+                    for content_path, dest_path, template in batch:
+                        results.append((content_path, dest_path, False, "not generated", None, [], {}))
+                        templates.append(template)
+                        await pending.put(len(results) - 1)
+        finally:
+            for _ in range(READ_CONCURRENCY):
+                await pending.put(None)
+
+    # read pages on threads, handing their markdown to the render stage - large pages are handed over unread
+    async def read_stage():
+        while (index := await pending.get()) is not None:
+            try:
+                if await asyncio.to_thread(os.path.getsize, results[index][0]) >= stream_min_size:
+                    markdown = None
+                else:
+                    markdown = await asyncio.to_thread(read_markdown, results[index][0])
+            except Exception as e:
+                fail(index, e)
+                continue
+            await to_render.put((index, markdown))
+
+    # render pages on the executor, handing their html to the write stage
+    async def render_stage(executor, stage_block_cache, trace):
+        while (item := await to_render.get()) is not None:
+            index, markdown = item
+            content_path, dest_path = results[index][:2]
+
+            # render and write a large page in one go on the executor, without holding it in memory
+            if markdown is None:
+                try:
+                    links, summary, events = await loop.run_in_executor(executor, stream_page, content_path, dest_path,
+                                                                          templates[index], search_terms, trace)
+                    succeed(index, events, links, summary)
+                except Exception as e:
+                    fail(index, e)
+                continue
+
+            try:
+                html, links, summary, events = await loop.run_in_executor(executor, render_page, markdown,
+                                                                          content_path, templates[index], cache,
+                                                                          stage_block_cache, search_terms, trace)
+            except Exception as e:
+                fail(index, e)
+                continue
+            await to_write.put((index, html, links, summary, events))
+
+    # write pages on threads
+    async def write_stage():
+        while (item := await to_write.get()) is not None:
+            index, html, links, summary, events = item
+            dest_path = results[index][1]
+            try:
+                with tracing.span("write", "page", path=dest_path):
+                    await asyncio.to_thread(write_page, dest_path, (html,))
+            except Exception as e:
+                fail(index, e)
+                continue
+            succeed(index, events, links, summary)
+
+    # render on worker processes for several jobs, which record their spans and hand them back when tracing,
+    # otherwise on one thread so the block cache is never shared
+    if jobs > 1:
+        executor, stage_block_cache = ProcessPoolExecutor(max_workers=jobs), None
+    else:
+        executor, stage_block_cache = ThreadPoolExecutor(max_workers=1), block_cache
+    trace = jobs > 1 and tracing.active is not None
+
+    with executor:
+        discoverer = asyncio.create_task(discover_stage())
+        readers = [asyncio.create_task(read_stage()) for _ in range(READ_CONCURRENCY)]
+        renderers = [asyncio.create_task(render_stage(executor, stage_block_cache, trace)) for _ in range(jobs)]
+        writers = [asyncio.create_task(write_stage()) for _ in range(WRITE_CONCURRENCY)]
+
+        # shut the stages down in order once each has drained its input
+        await discoverer
+        await asyncio.gather(*readers)
+        for _ in renderers:
+            await to_render.put(None)
+        await asyncio.gather(*renderers)
+        for _ in writers:
+            await to_write.put(None)
+        await asyncio.gather(*writers)
+    return results
+
+# run the pipeline to completion from synchronous code
+def generate_pages_pipeline(pages, jobs=1, cache=None, block_cache=None, stream_min_size=STREAM_MIN_SIZE,
+                            search_terms=False):
+    logging.info(f"Generating pages through the async pipeline with {jobs} render workers...")
+    return asyncio.run(run_pipeline(pages, jobs, cache, block_cache, stream_min_size, search_terms))
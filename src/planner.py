@@ -0,0 +1,152 @@
+# import necessary modules
+import os
+import heapq
+import logging
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# rough rendering throughput of one worker, in bytes of markdown per second, used to estimate the cost of a plan
+ESTIMATED_BYTES_PER_SECOND = 2 * 1024 * 1024
+
+# fixed cost of a page on top of its size - reading, hashing, template and writing, in seconds
+ESTIMATED_SECONDS_PER_PAGE = 0.0002
+
+# find every markdown file under the content directory with one scandir per directory, yielding
+# (markdown path, destination path, size in bytes) in site order as they are found - nothing is created or written
+def discover_pages(content_dir, dest_dir):
+    try:
+        with os.scandir(content_dir) as iterator:
+            entries = sorted(iterator, key=lambda entry: entry.name)
+    # report unreadable directories and carry on with the rest of the site
+    except OSError as e:
+        logging.error(f"Error reading content directory: {content_dir} - {e}")
+        return
+
+    for entry in entries:
+        # skip hidden files and directories
+        if entry.name.startswith('.'):
+            continue
+        dest_path = os.path.join(dest_dir, entry.name)
+
+        # recurse into directories, every other file becomes an HTML page
+        if entry.is_dir():
+            yield from discover_pages(entry.path, dest_path)
+        else:
+            yield entry.path, os.path.splitext(dest_path)[0] + ".html", entry.stat().st_size
+
+# a page to generate, with the template it is rendered with and the reason it is generated
+class BuildJob:
+    # fixed attributes instead of a per-instance __dict__
+    __slots__ = ("source", "output", "size", "template", "template_hash", "dependencies", "reason")
+
+    # constructor
+    def __init__(self, source, output, size, template, template_hash, dependencies, reason):
+        self.source = source
+        self.output = output
+        self.size = size # bytes of markdown
+        self.template = template # path of the template
+        self.template_hash = template_hash # hash of the template and its partials
+        self.dependencies = dependencies # files the page is rendered from - its source, template and partials
+        self.reason = reason # "new", "changed", "moved", "template-changed", "output-missing", "build-changed",
+                             # "unindexed" or "full-build"
+
+    # estimated seconds to render the page on one worker
+    def cost(self):
+        return ESTIMATED_SECONDS_PER_PAGE + self.size / ESTIMATED_BYTES_PER_SECOND
+
+    # represent the job as a string
+    def __repr__(self):
+        return f"BuildJob({self.source}, {self.reason}, {self.size} bytes, {self.template})"
+
+# every page of a build - the jobs to run, and the pages that are up to date or can not be generated
+class BuildPlan:
+    # constructor
+    def __init__(self):
+        self.pages = [] # (markdown path, destination path) of every page found, in site order
+        self.jobs = [] # pages to generate, in site order
+        self.fresh = [] # (markdown path, destination path) of pages that are up to date
+        self.failed = [] # (markdown path, destination path) of pages whose template does not compile
+
+    # jobs with the largest first, so parallel runners do not finish on one big page started last
+    def largest_first(self):
+        return sorted(self.jobs, key=lambda job: (-job.size, job.source))
+
+    # total bytes of markdown to render
+    def total_size(self):
+        return sum(job.size for job in self.jobs)
+
+    # estimated seconds to run the jobs on a number of workers, each taking the next largest job when it is free
+    def estimate_seconds(self, workers=1):
+        loads = [0.0] * max(1, workers)
+        for job in self.largest_first():
+            heapq.heappush(loads, heapq.heappop(loads) + job.cost())
+        return max(loads)
+
+    # lines describing the plan, one per job, followed by its estimated cost
+    def describe(self, workers=1):
+        lines = [f"Build plan: {len(self.jobs)} pages to generate, {len(self.fresh)} up to date, "
+                 f"{len(self.failed)} with a broken template."]
+        for job in self.jobs:
+            lines.append(f"  {job.reason:16} {job.size:>10} B  {job.source} -> {job.output}  "
+                         f"[{', '.join(job.dependencies[1:])}]")
+        reasons = {}
+        for job in self.jobs:
+            reasons[job.reason] = reasons.get(job.reason, 0) + 1
+        if reasons:
+            lines.append("Reasons: " + ", ".join(f"{reason} {count}" for reason, count in sorted(reasons.items())))
+        lines.append(f"Estimated cost: {self.total_size() / 1024:.1f} KiB of markdown, about "
+                     f"{self.estimate_seconds(workers):.3f} s with {workers} worker{'s' if workers != 1 else ''}.")
+        return lines
+
+    # discover every page, pick its template and decide whether it must be generated, checking the manifest
+    # (every page is generated without one) and whether the page and search indexes already have it - each page
+    # is added to the plan and each job yielded as soon as it is found, so a pipeline can start on it
+    def discover(self, content_dir, dest_dir, layouts, manifest=None, page_index=None, search_index=None):
+        # read the indexed pages up front on the calling thread, which owns the page index connection,
+        # so the jobs can be discovered on another thread
+        indexed = page_index.sources() if page_index is not None else None
+        return self.discover_jobs(content_dir, dest_dir, layouts, manifest, indexed, search_index)
+
+    # discover the jobs of the plan, given the source paths in the page index (None without one)
+    def discover_jobs(self, content_dir, dest_dir, layouts, manifest, indexed, search_index):
+        for source, output, size in discover_pages(content_dir, dest_dir):
+            self.pages.append((source, output))
+
+            # pick and compile the template of the page
+            template_path = layouts.page_template(content_dir, source)
+            try:
+                template_hash = layouts.hash(template_path)
+                dependencies = [source] + layouts.get(template_path).dependencies
+            # skip pages whose template does not compile - they keep their previous output and are generated
+            # again once the template compiles
+            except Exception as e:
+                logging.error(f"Error loading template for {source}: {template_path} - {e}")
+                if manifest is not None:
+                    manifest.is_fresh(source, output, (template_path, None))
+                self.failed.append((source, output))
+                continue
+
+            # find out why the page must be generated, if it must
+            reason = "full-build" if manifest is None else manifest.change_reason(source, output,
+                                                                                  (template_path, template_hash))
+            if reason is None and ((indexed is not None and os.path.normpath(source) not in indexed)
+                                   or (search_index is not None and not search_index.has(output))):
+                reason = "unindexed"
+            if reason is None:
+                self.fresh.append((source, output))
+            else:
+                job = BuildJob(source, output, size, template_path, template_hash, dependencies, reason)
+                self.jobs.append(job)
+                yield job
+
+    # represent the plan as a string
+    def __repr__(self):
+        return f"BuildPlan({len(self.jobs)} jobs, {len(self.fresh)} fresh, {len(self.failed)} failed)"
+
+# plan a build, discovering every page before returning the plan
+def plan_build(content_dir, dest_dir, layouts, manifest=None, page_index=None, search_index=None):
+    plan = BuildPlan()
+    for _ in plan.discover(content_dir, dest_dir, layouts, manifest, page_index, search_index):
+        pass
+    return plan
@@ -0,0 +1,177 @@
+# import necessary modules
+import os
+import gzip
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# optional compressors, used when their modules are installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# file types worth compressing - images and fonts are already compressed
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".svg", ".json")
+
+# files smaller than this are served faster uncompressed than the compression saves
+DEFAULT_MIN_SIZE = 1024
+
+# compress with gzip at the maximum level, without a timestamp so identical input gives identical output
+def compress_gzip(data):
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+# compress with brotli at the maximum quality
+def compress_brotli(data):
+    return brotli.compress(data, quality=11)
+
+# compress with zstandard at the maximum standard level
+def compress_zstd(data):
+    return zstandard.ZstdCompressor(level=19).compress(data)
+
+# available encodings - sibling file extension -> compress function
+encoders = {".gz": compress_gzip}
+if brotli is not None:
+    encoders[".br"] = compress_brotli
+if zstandard is not None:
+    encoders[".zst"] = compress_zstd
+
+# totals for one file type - files, original bytes and compressed bytes per encoding
+class CompressionStats:
+    # constructor
+    def __init__(self):
+        self.files = 0
+        self.original = 0
+        self.compressed = {extension: 0 for extension in encoders}
+
+    # ratio of compressed to original size for an encoding
+    def ratio(self, extension):
+        return self.compressed[extension] / self.original if self.original else 0.0
+
+    # represent the stats as a string
+    def __repr__(self):
+        ratios = ", ".join(f"{extension[1:]} {self.ratio(extension):.1%}" for extension in self.compressed)
+        return f"{self.files} files, {self.original / 1024:.1f} KiB -> {ratios}"
+
+# check if every compressed sibling of a file was written from its current version
+def is_compressed(path, mtime_ns):
+    for extension in encoders:
+        try:
+            if os.stat(path + extension).st_mtime_ns != mtime_ns:
+                return False
+        except FileNotFoundError:
+            return False
+    return True
+
+# write the compressed siblings of a file, returning (original size, {extension: compressed size}), or None on error
+def compress_file(path):
+    try:
+        return write_compressed(path)
+    # log any errors encountered during compression, the plain file is still served
+    except Exception as e:
+        logging.error(f"Error compressing file: {path} - {e}")
+        return None
+
+# write the compressed siblings of a file
+def write_compressed(path):
+    with open(path, "rb") as source_file:
+        data = source_file.read()
+    stat = os.stat(path)
+
+    sizes = {}
+    for extension, compress in encoders.items():
+        compressed = compress(data)
+        temp_path = path + extension + ".tmp"
+        with open(temp_path, "wb") as compressed_file:
+            compressed_file.write(compressed)
+        # stamp the sibling with the source's mtime so later builds can tell it is up to date
+        os.utime(temp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(temp_path, path + extension)
+        sizes[extension] = len(compressed)
+    return len(data), sizes
+
+# remove compressed siblings whose source file no longer exists
+def remove_orphaned_siblings(dest_dir):
+    removed = []
+    for dirpath, _, filenames in os.walk(dest_dir):
+        for filename in filenames:
+            root, extension = os.path.splitext(filename)
+            if extension in (".gz", ".br", ".zst") and root.endswith(COMPRESSIBLE_EXTENSIONS) and root not in filenames:
+                path = os.path.join(dirpath, filename)
+                os.remove(path)
+                removed.append(path)
+                logging.info(f"Removed orphaned compressed file: {path}")
+    return removed
+
+# bring the compressed siblings of a collection of changed or deleted output files up to date, without walking
+# the output - siblings of deleted files and of files below the threshold are removed - returning the number of
+# files compressed
+def precompress_files(paths, min_size=DEFAULT_MIN_SIZE):
+    compressed = 0
+    for path in sorted(set(paths)):
+        if os.path.basename(path).startswith('.') or not path.endswith(COMPRESSIBLE_EXTENSIONS):
+            continue
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stat = None
+        if stat is None or stat.st_size < min_size:
+            for extension in encoders:
+                if os.path.exists(path + extension):
+                    os.remove(path + extension)
+            continue
+        if not is_compressed(path, stat.st_mtime_ns) and compress_file(path) is not None:
+            compressed += 1
+    return compressed
+
+# write compressed siblings for every compressible file in a directory across a pool of threads,
+# returning stats per file type - with skip_fresh, files whose siblings are up to date are skipped
+def precompress_directory(dest_dir, min_size=DEFAULT_MIN_SIZE, workers=None, skip_fresh=False):
+    # remove siblings left behind by deleted files
+    remove_orphaned_siblings(dest_dir)
+
+    # collect the files to compress
+    paths = []
+    skipped = 0
+    for dirpath, dirnames, filenames in os.walk(dest_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.startswith('.') or not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, filename)
+            stat = os.stat(path)
+            # remove siblings of files that shrank below the threshold
+            if stat.st_size < min_size:
+                for extension in encoders:
+                    if os.path.exists(path + extension):
+                        os.remove(path + extension)
+                continue
+            if skip_fresh and is_compressed(path, stat.st_mtime_ns):
+                skipped += 1
+                continue
+            paths.append(path)
+
+    # compress the files - zlib and the optional compressors release the GIL while compressing
+    stats = {}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        for path, result in zip(paths, executor.map(compress_file, paths)):
+            if result is None:
+                continue
+            original, sizes = result
+            file_stats = stats.setdefault(os.path.splitext(path)[1], CompressionStats())
+            file_stats.files += 1
+            file_stats.original += original
+            for extension, size in sizes.items():
+                file_stats.compressed[extension] += size
+
+    # report the compression ratio for each file type
+    logging.info(f"Precompressed {len(paths)} files ({', '.join(encoders)}), {skipped} already up to date.")
+    for extension, file_stats in sorted(stats.items()):
+        logging.info(f"  {extension[1:]}: {file_stats}")
+    return stats
@@ -0,0 +1,285 @@
+# import necessary modules
+import os
+import re
+import json
+import shutil
+import logging
+from collections import Counter
+from itertools import accumulate
+from markdown_blocks import BlockType, ordered_list_marker
+from split_nodes import text_to_textnodes
+from page_index import page_url
+from manifest import cache_dir
+from delta import write_json_atomic
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# directory of the search index in the output
+SEARCH_DIR = "search"
+
+# version of the index files - bump this to rebuild existing indexes from scratch
+SEARCH_VERSION = 1
+
+# number of leading characters of a term that pick its shard
+PREFIX_LENGTH = 3
+
+# number of pages whose url and title share one file
+DOCS_PER_CHUNK = 100
+
+# weight of a term in a heading compared to one in body text
+HEADING_WEIGHT = 5
+
+# file name of the state of the last index build inside the build caches
+STATE_NAME = "search.json"
+
+# client-side loader copied next to the index
+LOADER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "search_loader.js")
+
+# regex to match a term of page text
+term_pattern = re.compile(r"\w+")
+
+# regex to match a shard name that can be used as a file name as is
+plain_prefix = re.compile(r"^[a-z0-9]+$")
+
+# words too common to be worth indexing - also dropped from queries by the loader
+STOP_WORDS = ("an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "has", "have", "in", "is", "it",
+              "its", "not", "of", "on", "or", "that", "the", "this", "to", "was", "were", "with")
+stop_words = frozenset(STOP_WORDS)
+
+# split text into the terms that are indexed
+def text_terms(text):
+    return [term for term in term_pattern.findall(text.lower()) if len(term) > 1 and term not in stop_words]
+
+# shard of a term - its prefix, hex-encoded unless it is plain ascii letters and digits
+def shard_name(term):
+    prefix = term[:PREFIX_LENGTH]
+    return prefix if plain_prefix.match(prefix) else "_" + prefix.encode("utf-8").hex()
+
+# the inline text of a block with the weight of its terms - code blocks are not indexed
+def block_texts(block):
+    if block.block_type == BlockType.CODE:
+        return []
+    if block.block_type == BlockType.HEADING:
+        return [(block.lines[0].lstrip("#").strip(), HEADING_WEIGHT)]
+    if block.block_type == BlockType.QUOTE:
+        return [(" ".join(line.lstrip(">").strip() for line in block.lines), 1)]
+    if block.block_type == BlockType.ORDERED_LIST:
+        return [(ordered_list_marker.sub("", line), 1) for line in block.lines]
+    if block.block_type == BlockType.UNORDERED_LIST:
+        return [(line[2:].strip(), 1) for line in block.lines]
+    return [(" ".join(block.lines), 1)]
+
+# weighted term counts of a page, from the text of the inline nodes of its blocks - link text and
+# image alt text are indexed, urls and markup are not
+def page_terms(blocks):
+    counts = Counter()
+    for block in blocks:
+        for text, weight in block_texts(block):
+            if not text:
+                continue
+            for node in text_to_textnodes(text):
+                for term in text_terms(node.text):
+                    counts[term] += weight
+    return dict(counts)
+
+# decode a posting list of [id gap, score, id gap, score, ...] into (id, score) pairs
+def decode_postings(postings):
+    pairs, doc_id = [], 0
+    for gap, score in zip(postings[::2], postings[1::2]):
+        doc_id += gap
+        pairs.append((doc_id, score))
+    return pairs
+
+# encode (id, score) pairs in id order as a flat list of id gaps and scores, keeping the numbers short
+def encode_postings(pairs):
+    postings, previous = [], 0
+    for doc_id, score in pairs:
+        postings.extend((doc_id - previous, score))
+        previous = doc_id
+    return postings
+
+# read a json file of the index, or None if it does not exist
+def read_index_file(path):
+    try:
+        with open(path, "r", encoding="utf-8") as index_file:
+            return json.load(index_file)
+    except FileNotFoundError:
+        return None
+
+# inverted index of every page's terms, sharded by term prefix into small json files in the output so a
+# query only fetches the shards of its terms - only the shards of changed pages are rewritten
+class SearchIndex:
+    # constructor - the state is kept in the build caches beside the output directory by default
+    def __init__(self, dest_dir, base_path="/", state_path=None):
+        self.dest_dir = dest_dir
+        self.base_path = base_path
+        self.directory = os.path.join(dest_dir, SEARCH_DIR)
+        self.state_path = state_path or os.path.join(cache_dir(dest_dir), STATE_NAME)
+        self.pages = {} # url -> [id, title, shards of its terms]
+        self.next_id = 0
+        self.pending = {} # id -> terms of pages indexed since the last save
+        self.stale = set() # ids whose postings must be dropped from their shards
+        self.dirty_shards = set() # shards to rewrite
+        self.dirty_chunks = set() # chunks of urls and titles to rewrite
+
+    # load the state of the last index build, if the index it describes is still in the output
+    @classmethod
+    def load(cls, dest_dir, base_path="/", state_path=None):
+        index = cls(dest_dir, base_path, state_path)
+        try:
+            state = read_index_file(index.state_path)
+        # an unreadable state just means indexing every page again
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable search index state: {index.state_path} - {e}")
+            state = None
+
+        # the output may have been cleared or built for another base path since
+        meta_path = os.path.join(index.directory, "meta.json")
+        if (state and state.get("version") == SEARCH_VERSION and state.get("base_path") == base_path
+                and os.path.isfile(meta_path)):
+            index.pages = state["pages"]
+            index.next_id = state["next_id"]
+        return index
+
+    # check if the page written to an output path is in the index
+    def has(self, output_path):
+        return page_url(self.dest_dir, output_path) in self.pages
+
+    # mark the postings of a page for removal
+    def drop(self, url):
+        doc_id, _, shards = self.pages.pop(url)
+        self.stale.add(doc_id)
+        self.pending.pop(doc_id, None)
+        self.dirty_shards.update(shards)
+        self.dirty_chunks.add(doc_id // DOCS_PER_CHUNK)
+        return doc_id
+
+    # index the terms of a generated page, replacing those it had before
+    def add_page(self, output_path, title, terms):
+        url = page_url(self.dest_dir, output_path)
+        if url in self.pages:
+            doc_id = self.drop(url)
+        else:
+            doc_id = self.next_id
+            self.next_id += 1
+
+        shards = sorted({shard_name(term) for term in terms})
+        self.pages[url] = [doc_id, title, shards]
+        self.pending[doc_id] = terms
+        self.dirty_shards.update(shards)
+        self.dirty_chunks.add(doc_id // DOCS_PER_CHUNK)
+
+    # remove the page written to an output path from the index
+    def remove_page(self, output_path):
+        url = page_url(self.dest_dir, output_path)
+        if url in self.pages:
+            self.drop(url)
+
+    # remove every page that is not among the given output paths, returning how many were removed
+    def remove_missing(self, output_paths):
+        current = {page_url(self.dest_dir, path) for path in output_paths}
+        missing = [url for url in self.pages if url not in current]
+        for url in missing:
+            self.drop(url)
+        return len(missing)
+
+    # path of a file of the index
+    def index_path(self, *parts):
+        return os.path.join(self.directory, *parts)
+
+    # rewrite one shard, dropping the postings of stale pages and adding those of pending pages
+    def write_shard(self, shard, additions):
+        path = self.index_path("terms", f"{shard}.json")
+        postings = read_index_file(path) or {}
+
+        # only terms of stale or pending pages change, the postings of other terms are kept as they are
+        for term in set(postings) | set(additions):
+            if term not in additions and self.stale.isdisjoint(accumulate(postings[term][::2])):
+                continue
+            pairs = [pair for pair in decode_postings(postings.get(term, [])) if pair[0] not in self.stale]
+            pairs.extend(additions.get(term, ()))
+            if pairs:
+                postings[term] = encode_postings(sorted(pairs))
+            else:
+                postings.pop(term, None)
+
+        if postings:
+            write_json_atomic(path, postings, compact=True)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    # write the changed shards and chunks, the metadata and the loader, and the state for the next build
+    def save(self):
+        os.makedirs(self.index_path("terms"), exist_ok=True)
+        os.makedirs(self.index_path("docs"), exist_ok=True)
+
+        # group the postings of pending pages by shard and term
+        additions = {}
+        for doc_id, terms in self.pending.items():
+            for term, score in terms.items():
+                additions.setdefault(shard_name(term), {}).setdefault(term, []).append((doc_id, score))
+        for shard in sorted(self.dirty_shards):
+            self.write_shard(shard, additions.get(shard, {}))
+
+        # rewrite the url and title chunks of changed pages
+        chunks = {}
+        for url, (doc_id, title, _) in self.pages.items():
+            if doc_id // DOCS_PER_CHUNK in self.dirty_chunks:
+                chunks.setdefault(doc_id // DOCS_PER_CHUNK, {})[str(doc_id)] = [self.base_path + url[1:], title]
+        for chunk in sorted(self.dirty_chunks):
+            path = self.index_path("docs", f"{chunk}.json")
+            if chunk in chunks:
+                write_json_atomic(path, chunks[chunk], compact=True)
+            elif os.path.exists(path):
+                os.remove(path)
+
+        # the loader reads the layout of the index from its metadata
+        write_json_atomic(self.index_path("meta.json"), {"version": SEARCH_VERSION, "prefix_length": PREFIX_LENGTH,
+                                                         "docs_per_chunk": DOCS_PER_CHUNK, "stop_words": STOP_WORDS},
+                          compact=True)
+        shutil.copyfile(LOADER_PATH, self.index_path("search.js"))
+
+        # remember the pages for the next build
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        write_json_atomic(self.state_path, {"version": SEARCH_VERSION, "base_path": self.base_path,
+                                            "next_id": self.next_id, "pages": self.pages}, compact=True)
+        logging.info(f"Search index: {len(self.pending)} pages indexed, {len(self.dirty_shards)} shards and "
+                     f"{len(self.dirty_chunks)} page chunks rewritten, {len(self.pages)} pages in total.")
+        self.pending, self.stale, self.dirty_shards, self.dirty_chunks = {}, set(), set(), set()
+
+    # represent the search index as a string
+    def __repr__(self):
+        return f"SearchIndex({self.directory}, {len(self.pages)} pages)"
+
+# query an index in the output the way the loader does, returning [(url, title, score)] of the pages containing
+# every term, best first, along with the files read
+def query_index(directory, query, limit=10):
+    meta = read_index_file(os.path.join(directory, "meta.json"))
+    terms = list(dict.fromkeys(text_terms(query)))
+    files = ["meta.json"]
+    if not terms:
+        return [], files
+
+    # add up the scores of the pages that contain every term
+    scores = None
+    for term in terms:
+        shard = f"terms/{shard_name(term)}.json"
+        files.append(shard)
+        postings = (read_index_file(os.path.join(directory, shard)) or {}).get(term, [])
+        found = {}
+        for doc_id, score in decode_postings(postings):
+            if scores is None or doc_id in scores:
+                found[doc_id] = (0 if scores is None else scores[doc_id]) + score
+        scores = found
+    best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    # look up the url and title of the best pages
+    results = []
+    for doc_id, score in best:
+        chunk = f"docs/{doc_id // meta['docs_per_chunk']}.json"
+        if chunk not in files:
+            files.append(chunk)
+        url, title = read_index_file(os.path.join(directory, chunk))[str(doc_id)]
+        results.append((url, title, score))
+    return results, files
@@ -0,0 +1,58 @@
+// client-side search over the sharded index written by the build, fetching only the shards a query needs
+//
+//   import { search } from "/search/search.js";
+//   const results = await search("ring shire"); // [{ url, title, score }], best first
+
+// directory of the index, the one this script is served from
+const base = new URL(".", import.meta.url);
+
+// fetched index files, so each is only requested once
+const files = new Map();
+
+// fetch a json file of the index, treating a missing file as empty
+function load(path) {
+  if (!files.has(path)) {
+    files.set(path, fetch(new URL(path, base)).then((response) => (response.ok ? response.json() : {})));
+  }
+  return files.get(path);
+}
+
+// shard of a term - its prefix, hex-encoded unless it is plain ascii letters and digits
+function shardName(term, prefixLength) {
+  const prefix = Array.from(term).slice(0, prefixLength).join("");
+  if (/^[a-z0-9]+$/.test(prefix)) return prefix;
+  return "_" + Array.from(new TextEncoder().encode(prefix), (byte) => byte.toString(16).padStart(2, "0")).join("");
+}
+
+// find the pages containing every term of a query, best first
+export async function search(query, limit = 10) {
+  const meta = await load("meta.json");
+  const stopWords = new Set(meta.stop_words);
+  const words = query.toLowerCase().match(/[\p{L}\p{N}_]+/gu) || [];
+  const terms = [...new Set(words)].filter((term) => term.length > 1 && !stopWords.has(term));
+  if (!terms.length) return [];
+
+  // add up the scores of the pages that contain every term
+  const shards = await Promise.all(terms.map((term) => load(`terms/${shardName(term, meta.prefix_length)}.json`)));
+  let scores = null;
+  terms.forEach((term, index) => {
+    const postings = shards[index][term] || [];
+    const found = new Map();
+    let id = 0;
+    for (let i = 0; i < postings.length; i += 2) {
+      id += postings[i]; // postings are [id gap, score, ...] in id order
+      if (scores === null || scores.has(id)) {
+        found.set(id, (scores === null ? 0 : scores.get(id)) + postings[i + 1]);
+      }
+    }
+    scores = found;
+  });
+  const best = [...scores].sort((a, b) => b[1] - a[1] || a[0] - b[0]).slice(0, limit);
+
+  // look up the url and title of the best pages
+  const chunks = await Promise.all(best.map(([id]) => load(`docs/${Math.floor(id / meta.docs_per_chunk)}.json`)));
+  return best.map(([id, score], index) => {
+    const [url, title] = chunks[index][id];
+    return { url, title, score };
+  });
+}
@@ -0,0 +1,53 @@
+# import necessary modules
+import os
+import shutil
+import tempfile
+import unittest
+
+# template of the test sites, showing the title and content of each page
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+# test case working in a temporary directory, removed again after each test
+class TempDirTestCase(unittest.TestCase):
+    # create the temporary directory
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    # helper to write a file, creating its directory
+    def write(self, path, text):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    # helper to read a file
+    def read(self, path):
+        with open(path, "r", encoding="utf-8") as file:
+            return file.read()
+
+# test case building a small site in a temporary directory - content, static and output directories and a
+# template, to which each test case adds its pages
+class SiteTestCase(TempDirTestCase):
+    # template of the site
+    template_text = TEMPLATE
+
+    # run the test from the site directory, as the command line builds the site in the working directory
+    build_in_root = False
+
+    # create the directories and template of the site
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        for directory in (self.content, self.static, self.dest):
+            os.makedirs(directory)
+        self.write(self.template, self.template_text)
+
+        # restore the working directory before the temporary directory is removed
+        if self.build_in_root:
+            self.addCleanup(os.chdir, os.getcwd())
+            os.chdir(self.root)
@@ -1,26 +1,107 @@
 # import necessary modules
 import re
+from itertools import repeat
 from textnode import TextNode, TextType
 
+# regex to match every inline markdown syntax in a single scan - link, image, code, bold and italic. Each
+# alternative starts with a different character, so their order only decides which is tried first - links, the
+# most common, come first
+inline_pattern = re.compile(
+    r"\[([^\[\]]*)\]\(([^\(\)]*)\)"     # link text and url
+    r"|!\[([^\[\]]*)\]\(([^\(\)]*)\)"   # image alt text and url
+    r"|`([^`]*)`"                       # code
+    r"|\*\*(.*?)\*\*"                   # bold
+    r"|_([^_]*)_",                      # italic
+    re.DOTALL,
+)
+
+# regex to match links alone, for text without any other inline syntax
+link_pattern = re.compile(r"\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+# regex to find a delimiter left in plain text without a matching pair
+unmatched_pattern = re.compile(r"\*\*|_|`")
+
+# number of capturing groups in inline_pattern - re.split emits the plain text and then this many groups per match
+inline_groups = inline_pattern.groups
+
 # function to covert text into list of approptiate nodes
 def text_to_textnodes(text):
-    # start with a single plain text node
-    nodes = [TextNode(text, TextType.PLAIN)]
-    
-    # split by various markdown syntaxes
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    
-    # split by link markdown
-    nodes = split_nodes_link(nodes)
-    
-    # split by image markdown
-    nodes = split_nodes_image(nodes)
+    # if the text is empty, raise error
+    if not text:
+        raise ValueError("Node text is empty")
+
+    # text without code, bold, italic or images - the most common kind of paragraph - only needs the link regex
+    if "`" not in text and "**" not in text and "_" not in text and "![" not in text:
+        return link_textnodes(text)
+
+    # scan the text once - re.split returns the plain text between matches followed by each match's groups
+    parts = inline_pattern.split(text)
+    stride = inline_groups + 1
+
+    # check the plain text has no unmatched delimiters all at once, joined with a newline so delimiters in
+    # neighbouring runs cannot pair up across a match - substring tests are much faster than the regex
+    plain_text = "\n".join(parts[::stride])
+    if "**" in plain_text or "_" in plain_text or "`" in plain_text:
+        raise_unmatched_delimiter(plain_text, text)
+
+    nodes = [] # list to hold the text nodes
+    append = nodes.append
+
+    # look up the text types once, enum attribute access is slow in a hot loop
+    plain_type, bold_type, italic_type, code_type = TextType.PLAIN, TextType.BOLD, TextType.ITALIC, TextType.CODE
+    link_type, image_type = TextType.LINK, TextType.IMAGE
+
+    # iterate through the plain text and the groups of each match, taking each column with a strided slice
+    # instead of slicing every match out of the parts
+    for plain, label, href, alt, src, code, bold, italic in zip(*(parts[k::stride] for k in range(stride))):
+        # add the plain text before the match
+        if plain:
+            append(TextNode(plain, plain_type))
+
+        # add the node for the matched syntax - image and link nodes are kept even when the text is empty
+        if href is not None:
+            append(TextNode(label, link_type, href))
+        elif src is not None:
+            append(TextNode(alt, image_type, src))
+        elif code:
+            append(TextNode(code, code_type))
+        elif bold:
+            append(TextNode(bold, bold_type))
+        elif italic:
+            append(TextNode(italic, italic_type))
+
+    # add any remaining plain text after the last match
+    plain = parts[-1]
+    if plain:
+        append(TextNode(plain, plain_type))
 
     # return the final list of text nodes
     return nodes
 
+# function to convert text without any inline syntax but links into nodes, with the smaller link regex
+def link_textnodes(text):
+    # split the text into the plain text between links followed by each link's text and url
+    parts = link_pattern.split(text)
+    plains = parts[::3]
+
+    # the nodes alternate between plain text and links - build each kind with map, which calls the node class
+    # without a python loop, and interleave them with slice assignment
+    nodes = [None] * (2 * len(plains) - 1)
+    nodes[::2] = map(TextNode, plains, repeat(TextType.PLAIN))
+    nodes[1::2] = map(TextNode, parts[1::3], repeat(TextType.LINK), parts[2::3])
+
+    # drop the empty plain text between adjacent links and at either end
+    if "" in plains:
+        nodes = [node for node in nodes if node.text or node.text_type != TextType.PLAIN]
+
+    # return the final list of text nodes
+    return nodes
+
+# function to raise an error for a delimiter without a matching pair
+def raise_unmatched_delimiter(plain, text):
+    delimiter = unmatched_pattern.search(plain).group()
+    raise ValueError(f"Invalid markdown - unmatched delimiter '{delimiter}' in text: {text}")
+
 
 # function to split text nodes by a given delimiter
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
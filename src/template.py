@@ -0,0 +1,153 @@
+# import necessary modules
+import re
+from htmlnode import HTMLNode
+
+# regex to match {{ Name }} placeholders in a template
+placeholder_pattern = re.compile(r"\{\{\s*(.*?)\s*\}\}")
+
+# regex to match {% include "name" %} tags in a template
+include_pattern = re.compile(r'\{%\s*include\s+"([^"]+)"\s*%\}')
+
+# placeholders a page template is allowed to use
+TEMPLATE_PLACEHOLDERS = ("Title", "Content")
+
+# error raised for invalid templates or missing placeholder values
+class TemplateError(ValueError):
+    pass
+
+# replace include tags with the source of the partials they name, recursively - read_partial maps a partial
+# name to its (path, source), and the path of every partial used is added to the dependencies list
+def expand_includes(source, read_partial, dependencies, including=()):
+    def include(match):
+        if read_partial is None:
+            raise TemplateError(f"Template includes '{match.group(1)}' but no partials are available")
+        path, partial = read_partial(match.group(1))
+
+        # a partial that includes itself would never finish expanding
+        if path in including:
+            raise TemplateError(f"Partial includes itself: {' -> '.join(including + (path,))}")
+        if path not in dependencies:
+            dependencies.append(path)
+        return expand_includes(partial, read_partial, dependencies, including + (path,))
+    return include_pattern.sub(include, source)
+
+# regex to match the path of root-relative href and src attributes, up to any query or fragment
+url_pattern = re.compile(r'(href|src)="/([^"?#]*)')
+
+# adjust root-relative href and src attributes to start with the base path,
+# replacing asset paths with their fingerprinted paths if an asset map is given
+def rewrite_base_path(html, base_path, assets=None):
+    if assets:
+        return url_pattern.sub(lambda match: f'{match.group(1)}="{base_path}{assets.get(match.group(2), match.group(2))}', html)
+
+    # nothing to rewrite when the site is served from the root
+    if base_path == "/":
+        return html
+    return html.replace("href=\"/", f'href="{base_path}').replace("src=\"/", f'src="{base_path}')
+
+# url prefixes adjusted by the base path rewrite
+url_prefixes = ("href=\"/", "src=\"/")
+
+# characters that can end a partial url prefix split across two fragments
+url_prefix_chars = frozenset("".join(url_prefixes)) - {"/"}
+
+# longest partial url prefix that may need to be held back
+url_prefix_partial_len = max(len(prefix) for prefix in url_prefixes) - 1
+
+# adjust root-relative paths in a stream of html fragments, holding back any fragment tail that could be
+# the start of a url prefix split across fragments (or, with an asset map, of a url not yet closed)
+def iter_rewrite_base_path(fragments, base_path, assets=None):
+    # nothing to rewrite when the site is served from the root
+    if base_path == "/" and not assets:
+        yield from fragments
+        return
+
+    pending = ""
+    for fragment in fragments:
+        text = pending + fragment if pending else fragment
+        pending = ""
+
+        # check if the text ends with a partial url prefix
+        if text and text[-1] in url_prefix_chars:
+            for size in range(min(len(text), url_prefix_partial_len), 0, -1):
+                tail = text[-size:]
+                if any(prefix.startswith(tail) for prefix in url_prefixes):
+                    text, pending = text[:-size], tail
+                    break
+
+        # hold back a url whose closing quote has not arrived yet, so the whole path can be looked up
+        if assets:
+            start = max(text.rfind(prefix) for prefix in url_prefixes)
+            if start != -1 and text.find('"', text.index('"', start) + 1) == -1:
+                text, pending = text[:start], text[start:] + pending
+
+        yield rewrite_base_path(text, base_path, assets)
+
+    # flush the held back text
+    if pending:
+        yield rewrite_base_path(pending, base_path, assets)
+
+# compiled template, pre-split into static segments and placeholder slots
+class Template:
+    # constructor - compile the template source for a given base path and fingerprinted asset map,
+    # expanding the partials it includes through read_partial
+    def __init__(self, source, base_path="/", path=None, assets=None, read_partial=None):
+        self.path = path
+        self.base_path = base_path
+        self.assets = assets # asset path -> fingerprinted asset path, both without the leading /
+        self.segments = [] # static text between placeholders, with base path already applied
+        self.slots = [] # placeholder names, one between each pair of segments
+        self.dependencies = [path] if path else [] # files the compiled template was built from
+
+        # paste the included partials into the source
+        source = expand_includes(source, read_partial, self.dependencies, (path,) if path else ())
+
+        # split the source on placeholders
+        position = 0
+        for match in placeholder_pattern.finditer(source):
+            name = match.group(1)
+
+            # reject placeholders the generator does not know how to fill
+            if name not in TEMPLATE_PLACEHOLDERS:
+                location = f" in {path}" if path else ""
+                raise TemplateError(f"Unknown template placeholder '{{{{ {name} }}}}'{location}")
+
+            self.segments.append(rewrite_base_path(source[position:match.start()], base_path, assets))
+            self.slots.append(name)
+            position = match.end()
+
+        # add the static text after the last placeholder
+        self.segments.append(rewrite_base_path(source[position:], base_path, assets))
+
+    # read and compile a template file
+    @classmethod
+    def load(cls, path, base_path="/", assets=None, read_partial=None):
+        with open(path, "r", encoding="utf-8") as template_file:
+            return cls(template_file.read(), base_path, path, assets, read_partial)
+
+    # yield the rendered template piece by piece - values may be strings or HTMLNodes,
+    # which are streamed fragment by fragment without building their html string
+    def iter_render(self, values):
+        yield self.segments[0]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            # check a value was provided for the placeholder
+            if slot not in values:
+                raise TemplateError(f"No value provided for template placeholder '{{{{ {slot} }}}}'")
+            value = values[slot]
+            if isinstance(value, HTMLNode):
+                yield from iter_rewrite_base_path(value.iter_html(), self.base_path, self.assets)
+            else:
+                yield rewrite_base_path(value, self.base_path, self.assets)
+            yield segment
+
+    # render the template to a string
+    def render(self, **values):
+        return "".join(self.iter_render(values))
+
+    # write the rendered template straight to a file object
+    def write(self, file, **values):
+        file.writelines(self.iter_render(values))
+
+    # represent the template as a string
+    def __repr__(self):
+        return f"Template({self.path}, slots: {self.slots}, {self.base_path})"
@@ -0,0 +1,90 @@
+# import the necessary modules
+import os
+import unittest
+import parse_cache
+from block_cache import BlockCache, ENTRY_OVERHEAD
+from document import Document
+from site_test_case import TempDirTestCase
+
+# build a document with one paragraph per section
+def long_document(sections, edited=None):
+    parts = ["# Changelog"]
+    for i in range(sections):
+        text = "edited paragraph" if i == edited else f"Release {i} fixes **bug {i}** and adds [feature](/f/{i})."
+        parts.append(text)
+    return "\n\n".join(parts)
+
+# define the test case class
+class TestBlockCache(TempDirTestCase):
+    # test cached rendering matches rendering without a cache
+    def test_render_matches(self):
+        markdown = long_document(50) + "\n\n- a\n- **b**\n\n```\ncode\n```"
+        cache = BlockCache()
+        expected = Document.parse(markdown).to_html_node().to_html()
+        self.assertEqual(Document.parse(markdown).to_html_node(cache).to_html(), expected)
+        self.assertEqual(Document.parse(markdown).to_html_node(cache).to_html(), expected)
+
+    # test editing one paragraph re-renders only that paragraph
+    def test_edit_renders_one_block(self):
+        cache = BlockCache()
+        Document.parse(long_document(1000)).to_html_node(cache)
+        self.assertEqual((cache.hits, cache.misses), (0, 1001))
+
+        html = Document.parse(long_document(1000, edited=500)).to_html_node(cache).to_html()
+        self.assertEqual((cache.hits, cache.misses), (1000, 1002))
+        self.assertIn("<p>edited paragraph</p>", html)
+        self.assertAlmostEqual(cache.hit_rate, 1000 / 2002)
+
+    # test the least recently used blocks are evicted beyond the size limit
+    def test_eviction(self):
+        cache = BlockCache(max_bytes=10 * (ENTRY_OVERHEAD + 20))
+        Document.parse(long_document(100)).to_html_node(cache)
+        self.assertLessEqual(cache.size, cache.max_bytes)
+        self.assertLess(len(cache.fragments), 100)
+
+        # the most recent blocks are still cached
+        last = Document.parse("# Changelog\n\n" + long_document(100).split("\n\n")[-1])
+        hits = cache.hits
+        last.to_html_node(cache)
+        self.assertEqual(cache.hits, hits + 1)
+
+    # test the cache persists across processes and is dropped for another parser version
+    def test_persistence(self):
+        path = os.path.join(self.root, "blocks.pickle")
+        cache = BlockCache.load(path)
+        Document.parse(long_document(10)).to_html_node(cache)
+        cache.save()
+
+        loaded = BlockCache.load(path)
+        self.assertEqual(list(loaded.fragments.items()), list(cache.fragments.items()))
+
+        original = parse_cache.PARSER_VERSION
+        parse_cache.PARSER_VERSION = original + "-changed"
+        try:
+            self.assertEqual(len(BlockCache.load(path).fragments), 0)
+        finally:
+            parse_cache.PARSER_VERSION = original
+
+    # test the cache is only written when its blocks changed
+    def test_save_unchanged(self):
+        path = os.path.join(self.root, "blocks.pickle")
+        cache = BlockCache.load(path)
+        Document.parse(long_document(10)).to_html_node(cache)
+        cache.save()
+
+        # reusing the loaded blocks leaves the file alone, rendering a new one writes it
+        loaded = BlockCache.load(path)
+        os.remove(path)
+        loaded.save()
+        self.assertFalse(os.path.exists(path))
+        Document.parse(long_document(10)).to_html_node(loaded)
+        loaded.save()
+        self.assertFalse(os.path.exists(path))
+        Document.parse("# New\n\nA new block.").to_html_node(loaded)
+        loaded.save()
+        self.assertTrue(os.path.exists(path))
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
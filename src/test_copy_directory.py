@@ -0,0 +1,58 @@
+# import the necessary modules
+import os
+import shutil
+import unittest
+from copy_directory import sync_directory
+from site_test_case import TempDirTestCase
+
+# define the test case class
+class TestSyncDirectory(TempDirTestCase):
+    # create a small static tree in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "logo.png"), "png")
+
+    # test the first sync copies every file
+    def test_sync_copies_new_files(self):
+        result = sync_directory(self.static, self.dest)
+        self.assertEqual(sorted(result.copied), ["images/logo.png", "index.css"])
+        self.assertEqual(self.read(os.path.join(self.dest, "images", "logo.png")), "png")
+
+    # test unchanged files are skipped and changed files are copied
+    def test_sync_skips_unchanged_files(self):
+        sync_directory(self.static, self.dest)
+        css = os.path.join(self.static, "index.css")
+        self.write(css, "body { margin: 0 }")
+        result = sync_directory(self.static, self.dest)
+        self.assertEqual(result.copied, ["index.css"])
+        self.assertEqual(result.skipped, ["images/logo.png"])
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), "body { margin: 0 }")
+
+    # test checksum mode copies a file whose size and mtime match but contents differ
+    def test_sync_checksum(self):
+        sync_directory(self.static, self.dest)
+        dest_css = os.path.join(self.dest, "index.css")
+        stat = os.stat(dest_css)
+        self.write(dest_css, "body {x")
+        os.utime(dest_css, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(sync_directory(self.static, self.dest).copied, [])
+        self.assertEqual(sync_directory(self.static, self.dest, checksum=True).copied, ["index.css"])
+        self.assertEqual(self.read(dest_css), "body {}")
+
+    # test deleted static files are removed but other output is left untouched
+    def test_sync_removes_stale_files(self):
+        first = sync_directory(self.static, self.dest)
+        self.write(os.path.join(self.dest, "index.html"), "generated")
+        shutil.rmtree(os.path.join(self.static, "images"))
+        result = sync_directory(self.static, self.dest, previous=first.files)
+        self.assertEqual(result.removed, ["images/logo.png"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertEqual(self.read(os.path.join(self.dest, "index.html")), "generated")
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# import the necessary modules
+import os
+import json
+import unittest
+from delta import replace_if_changed, snapshot_outputs, compute_delta, DELTA_NAME
+from generate_content import generate_page
+import main as site
+from site_test_case import SiteTestCase
+
+# define the test case class
+class TestDelta(SiteTestCase):
+    # template of the site, referencing a static file
+    template_text = '<title>{{ Title }}</title><link href="/index.css">{{ Content }}'
+
+    # build from the site directory
+    build_in_root = True
+
+    # create a small site in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join("content", "index.md"), "# Home")
+        self.write(os.path.join("content", "blog", "post.md"), "# Post\n\nText")
+        self.write(os.path.join("static", "index.css"), "body {}")
+        self.write(os.path.join("static", "images", "logo.png"), "png")
+
+    # helper to run an incremental build and return the delta
+    def build(self):
+        with self.assertLogs(level="INFO"):
+            site.main(["--incremental"])
+        with open(os.path.join("docs", DELTA_NAME), encoding="utf-8") as file:
+            return json.load(file)
+
+    # test identical output leaves the existing file untouched
+    def test_replace_if_changed(self):
+        self.write("out.html", "same")
+        os.utime("out.html", ns=(0, 10**9))
+        self.write("out.html.tmp", "same")
+        self.assertFalse(replace_if_changed("out.html.tmp", "out.html"))
+        self.assertFalse(os.path.exists("out.html.tmp"))
+        self.assertEqual(os.stat("out.html").st_mtime_ns, 10**9)
+
+        self.write("out.html.tmp", "different")
+        self.assertTrue(replace_if_changed("out.html.tmp", "out.html"))
+        with open("out.html", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "different")
+
+    # test regenerating a page with the same output keeps its mtime
+    def test_generate_page_unchanged(self):
+        output = os.path.join("docs", "index.html")
+        generate_page(os.path.join("content", "index.md"), "template.html", output, "/")
+        os.utime(output, ns=(0, 10**9))
+        generate_page(os.path.join("content", "index.md"), "template.html", output, "/")
+        self.assertEqual(os.stat(output).st_mtime_ns, 10**9)
+
+    # test snapshots reuse hashes of files whose size and mtime are unchanged, and deltas compare hashes
+    def test_snapshot_and_compare(self):
+        first = snapshot_outputs("static")
+        self.assertEqual(sorted(first), ["images/logo.png", "index.css"])
+        stale = {path: entry[:2] + ["stale hash"] for path, entry in first.items()}
+        self.assertEqual(snapshot_outputs("static", stale), stale)
+
+        current = dict(first, **{"new.txt": [1, 1, "x"]})
+        current["index.css"] = [1, 1, "changed"]
+        del current["images/logo.png"]
+        self.assertEqual(compute_delta(first, current),
+                         {"added": ["new.txt"], "changed": ["index.css"], "removed": ["images/logo.png"]})
+
+    # test incremental builds report only what changed since the previous build
+    def test_build_delta(self):
+        first = self.build()
+        self.assertEqual(first["added"], ["blog/post.html", "images/logo.png", "index.css", "index.html"])
+
+        # nothing changed, nothing to deploy
+        self.assertEqual(self.build(), {"added": [], "changed": [], "removed": []})
+
+        # edit a page, add a static file and delete a page
+        self.write(os.path.join("content", "index.md"), "# Home\n\nNew text")
+        self.write(os.path.join("static", "robots.txt"), "ok")
+        os.remove(os.path.join("content", "blog", "post.md"))
+        self.assertEqual(self.build(), {"added": ["robots.txt"], "changed": ["index.html"], "removed": ["blog/post.html"]})
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+# import the necessary modules
+import os
+import datetime
+import tempfile
+import unittest
+from document import Document, StreamedDocument, FrontMatterError, parse_front_matter
+from markdown_blocks import BlockType, markdown_to_html_node
+
+# define the test case class
+class TestDocument(unittest.TestCase):
+    # test a document without front matter takes its title from the first heading
+    def test_title_from_heading(self):
+        document = Document.parse("Intro text\n\n# The Title\n\nBody")
+        self.assertEqual(document.title, "The Title")
+        self.assertEqual(document.metadata, {})
+        self.assertEqual([block.block_type for block in document.blocks],
+                         [BlockType.PARAGRAPH, BlockType.HEADING, BlockType.PARAGRAPH])
+
+    # test front matter fields are parsed and removed from the body
+    def test_front_matter(self):
+        markdown = """---
+title: "Front: Matter"
+date: 2024-03-01
+tags: [python, web]
+draft: true
+template: post.html
+---
+# Heading
+
+Body text"""
+        document = Document.parse(markdown)
+        self.assertEqual(document.title, "Front: Matter")
+        self.assertEqual(document.date, datetime.date(2024, 3, 1))
+        self.assertEqual(document.tags, ["python", "web"])
+        self.assertTrue(document.draft)
+        self.assertEqual(document.template, "post.html")
+        self.assertEqual(document.to_html_node().to_html(), "<div><h1>Heading</h1><p>Body text</p></div>")
+
+    # test block lists, comments and scalar types
+    def test_front_matter_values(self):
+        metadata = parse_front_matter(["# a comment", "tags:", "  - one", "  - 2", "count: 3", "draft: no", "name: plain"])
+        self.assertEqual(metadata, {"tags": ["one", 2], "count": 3, "draft": False, "name": "plain"})
+
+    # test invalid front matter raises an error naming the line
+    def test_invalid_front_matter(self):
+        with self.assertRaises(FrontMatterError) as context:
+            Document.parse("---\ntitle: ok\nnot a field\n---\n# Title")
+        self.assertIn("line 3", str(context.exception))
+
+    # test an unclosed front matter fence is treated as markdown
+    def test_unclosed_front_matter(self):
+        document = Document.parse("---\n\n# Title")
+        self.assertEqual(document.metadata, {})
+        self.assertEqual(document.title, "Title")
+
+    # test a document with no title raises an error
+    def test_no_title(self):
+        with self.assertRaises(ValueError):
+            Document.parse("just text")
+
+    # test the html matches converting the markdown directly
+    def test_html_matches_markdown_to_html_node(self):
+        markdown = "# Title\n\nSome **bold** text\n\n- a\n- b\n\n```\ncode\n```"
+        self.assertEqual(Document.parse(markdown).to_html_node().to_html(), markdown_to_html_node(markdown).to_html())
+
+    # test a streamed document reads the same front matter, title and html as one parsed in memory
+    def test_streamed_matches_parsed(self):
+        samples = [
+            "---\ntitle: Streamed\ntags: [a]\n---\n# Heading\n\nBody **text**\n",
+            "Intro\n\n```\ncode\n\n# not a title\n```\n\n# Title\n\n- a\n- b",
+            "---\nnot: closed\n\n# Title\n\n~~~\nunclosed fence\n\n> quote\n",
+        ]
+        for markdown in samples:
+            with tempfile.NamedTemporaryFile("w", suffix=".md", delete=False, encoding="utf-8") as file:
+                file.write(markdown)
+            try:
+                parsed = Document.parse(markdown)
+                streamed = StreamedDocument.load(file.name)
+                self.assertEqual((streamed.title, streamed.metadata), (parsed.title, parsed.metadata))
+                self.assertEqual(list(streamed.iter_blocks()), parsed.blocks)
+                self.assertEqual(streamed.to_html_node().to_html(), parsed.to_html_node().to_html())
+            finally:
+                os.remove(file.name)
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
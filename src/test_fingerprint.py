@@ -0,0 +1,82 @@
+# import the necessary modules
+import os
+import json
+import shutil
+import unittest
+from fingerprint import fingerprint_name, collect_assets, update_fingerprinted_assets, ASSET_MANIFEST_NAME
+from template import Template, rewrite_base_path, iter_rewrite_base_path
+from htmlnode import LeafNode, ParentNode
+from site_test_case import TempDirTestCase
+
+# asset map used by the rewriting tests
+ASSETS = {"index.css": "index.0123abcd.css", "images/logo.png": "images/logo.89efcdab.png"}
+
+# define the test case class
+class TestFingerprint(TempDirTestCase):
+    # create a static directory and an output directory
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "logo.png"), "png")
+        shutil.copytree(self.static, self.dest)
+
+    # test the hash is added before the extension
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name("css/index.css", "3f9a1c8d77"), "css/index.3f9a1c8d.css")
+        self.assertEqual(fingerprint_name("LICENSE", "3f9a1c8d77"), "LICENSE.3f9a1c8d")
+
+    # test every static file is mapped by its url path
+    def test_collect_assets(self):
+        assets = collect_assets(self.static)
+        self.assertEqual(sorted(assets), ["images/logo.png", "index.css"])
+        self.assertRegex(assets["images/logo.png"], r"^images/logo\.[0-9a-f]{8}\.png$")
+
+    # test asset references are rewritten along with the base path
+    def test_rewrite(self):
+        html = '<link href="/index.css"><img src="/images/logo.png?v=1"><a href="/blog">b</a><a href="https://x.org/index.css">x</a>'
+        self.assertEqual(rewrite_base_path(html, "/site/", ASSETS),
+                         '<link href="/site/index.0123abcd.css"><img src="/site/images/logo.89efcdab.png?v=1">'
+                         '<a href="/site/blog">b</a><a href="https://x.org/index.css">x</a>')
+
+    # test a url split across fragments is still rewritten
+    def test_rewrite_split_fragments(self):
+        fragments = ['<p><img src="/ima', 'ges/logo.png" alt="', 'x"></p><link hr', 'ef="/index.css">']
+        self.assertEqual("".join(iter_rewrite_base_path(fragments, "/", ASSETS)),
+                         '<p><img src="/images/logo.89efcdab.png" alt="x"></p><link href="/index.0123abcd.css">')
+
+    # test the template and markdown-generated tags both point at fingerprinted assets
+    def test_template(self):
+        template = Template('<link href="/index.css">{{ Content }}', "/site/", assets=ASSETS)
+        content = ParentNode("div", [LeafNode("img", "", {"src": "/images/logo.png", "alt": "logo"})])
+        self.assertEqual(template.render(Content=content),
+                         '<link href="/site/index.0123abcd.css"><div><img src="/site/images/logo.89efcdab.png" alt="logo"></img></div>')
+
+    # test fingerprinted copies are published, replaced when the content changes and removed when turned off
+    def test_update(self):
+        assets = collect_assets(self.static)
+        update_fingerprinted_assets(self.dest, assets)
+        css = os.path.join(self.dest, assets["index.css"])
+        with open(css, encoding="utf-8") as file:
+            self.assertEqual(file.read(), "body {}")
+        with open(os.path.join(self.dest, ASSET_MANIFEST_NAME), encoding="utf-8") as file:
+            self.assertEqual(json.load(file), assets)
+
+        # the copy is replaced, not modified, as static files are synced
+        os.remove(os.path.join(self.dest, "index.css"))
+        self.write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        shutil.copy2(os.path.join(self.static, "index.css"), os.path.join(self.dest, "index.css"))
+        changed = collect_assets(self.static)
+        update_fingerprinted_assets(self.dest, changed)
+        self.assertFalse(os.path.exists(css))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, changed["index.css"])))
+
+        update_fingerprinted_assets(self.dest, {})
+        self.assertFalse(os.path.exists(os.path.join(self.dest, changed["index.css"])))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, ASSET_MANIFEST_NAME)))
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
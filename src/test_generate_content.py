@@ -0,0 +1,77 @@
+# import the necessary modules
+import os
+import unittest
+import tracemalloc
+from generate_content import generate_page_recursive, generate_page
+from site_test_case import SiteTestCase
+
+# define the test case class
+class TestGeneratePages(SiteTestCase):
+    # template of the site, referencing a static file
+    template_text = '<title>{{ Title }}</title><link href="/index.css">{{ Content }}'
+
+    # create a small site in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n![logo](/images/logo.png)")
+        self.write(os.path.join(self.content, "blog", "one.md"), "# One\n\n[home](/)")
+        self.write(os.path.join(self.content, "blog", "two.md"), "# Two\n\n- a\n- b")
+        self.write(os.path.join(self.content, "blog", "deep", "three.md"), "# Three\n\n1. x\n2. y")
+        self.write(os.path.join(self.content, "blog", "broken.md"), "no title here")
+
+    # helper to build the site into a fresh directory and return its files
+    def build(self, name, jobs, **options):
+        dest = os.path.join(self.root, name)
+        os.makedirs(dest)
+        generate_page_recursive(self.content, self.template, dest, "/site/", jobs=jobs, **options)
+        outputs = {}
+        for dirpath, _, filenames in os.walk(dest):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, "rb") as file:
+                    outputs[os.path.relpath(path, dest)] = file.read()
+        return outputs
+
+    # test parallel rendering produces byte-identical output to the serial path
+    def test_parallel_matches_serial(self):
+        with self.assertLogs(level="ERROR"):
+            serial = self.build("serial", 1)
+        with self.assertLogs(level="ERROR") as logs:
+            parallel = self.build("parallel", 3)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(len(serial), 4)
+        self.assertIn("broken.md", logs.output[0])
+
+    # test streaming every page produces byte-identical output to rendering in memory
+    def test_streamed_matches_serial(self):
+        with self.assertLogs(level="ERROR"):
+            serial = self.build("serial", 1)
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(self.build("streamed", 1, stream_min_size=0), serial)
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(self.build("streamed_pipeline", 1, stream_min_size=0, pipeline=True), serial)
+
+    # test the memory used to stream a page stays the same as the page grows
+    def test_streamed_memory(self):
+        markdown_path = os.path.join(self.content, "large.md")
+        dest = os.path.join(self.root, "large.html")
+        section = "## Section\n\nSome *text* with a [link](/page) and `code`.\n\n- one\n- two\n\n"
+
+        # measure the peak memory of streaming a small and a five times larger page
+        peaks = []
+        for sections in (500, 2500):
+            self.write(markdown_path, "# Large\n\n" + section * sections)
+            tracemalloc.start()
+            try:
+                with self.assertLogs(level="INFO"):
+                    self.assertTrue(generate_page(markdown_path, self.template, dest, "/site/", stream_min_size=0))
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+        self.assertGreater(os.path.getsize(dest), 5 * os.path.getsize(markdown_path) // 4)
+        self.assertLess(peaks[1], peaks[0] + 32 * 1024)
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
 # import the necessary modules
+import io
+import sys
 import unittest
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -165,6 +167,41 @@ class TestParentNode(unittest.TestCase):
         node = ParentNode("div", [child], None)
         self.assertEqual(node.to_html(), "<div><span>child</span></div>")
 
+    # test iterating html fragments in document order
+    def test_iter_html(self):
+        child = ParentNode("p", [LeafNode(None, "Hello "), LeafNode("b", "world")])
+        node = ParentNode("div", [child, LeafNode("i", "!")])
+        self.assertEqual(list(node.iter_html()), ["<div>", "<p>", "Hello ", "<b>world</b>", "</p>", "<i>!</i>", "</div>"])
+
+    # test writing html fragments to a list buffer and a file object
+    def test_write_html(self):
+        node = ParentNode("div", [ParentNode("span", [LeafNode("b", "bold")])], {"class": "box"})
+        buffer = []
+        node.write_html(buffer)
+        self.assertEqual("".join(buffer), node.to_html())
+        file = io.StringIO()
+        node.write_html(file)
+        self.assertEqual(file.getvalue(), '<div class="box"><span><b>bold</b></span></div>')
+
+    # test deeply nested trees do not hit the recursion limit
+    def test_to_html_deep_tree(self):
+        depth = sys.getrecursionlimit() * 2
+        node = LeafNode(None, "x")
+        for _ in range(depth):
+            node = ParentNode("span", [node])
+        self.assertEqual(node.to_html(), "<span>" * depth + "x" + "</span>" * depth)
+
+    # test invalid nested parent raises error
+    def test_to_html_invalid_nested_parent(self):
+        node = ParentNode("div", [ParentNode("span", None)])
+        with self.assertRaises(ValueError):
+            node.to_html() # expect ValueError
+
+    # test nodes use slots instead of a per-instance dict
+    def test_no_instance_dict(self):
+        for node in (HTMLNode(), LeafNode("b", "bold"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
 # run the tests
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
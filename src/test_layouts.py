@@ -0,0 +1,108 @@
+# import the necessary modules
+import os
+import unittest
+from generate_content import generate_page_recursive
+from layouts import Layouts
+from manifest import BuildManifest
+from watch import SiteWatcher
+from site_test_case import SiteTestCase
+
+# define the test case class
+class TestLayouts(SiteTestCase):
+    # default template of the site, sharing its header with the blog layout
+    template_text = '{% include "header.html" %}<main>{{ Content }}</main>'
+
+    # create a site with a blog layout, a landing layout and a shared header in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.layouts = os.path.join(self.root, "layouts")
+        self.write(os.path.join(self.layouts, "blog.html"), '{% include "header.html" %}<article>{{ Content }}</article>')
+        self.write(os.path.join(self.layouts, "landing.html"), "<h1>Welcome</h1>{{ Content }}")
+        self.write(os.path.join(self.layouts, "partials", "header.html"), "<title>{{ Title }}</title>")
+        self.write(os.path.join(self.content, "index.md"), "---\ntemplate: landing\n---\n# Home")
+        self.write(os.path.join(self.content, "docs", "guide.md"), "# Guide")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.content, "blog", "drafts", "idea.md"), "# Idea")
+
+    # helper to read an output file
+    def read_output(self, *parts):
+        with open(os.path.join(self.dest, *parts), encoding="utf-8") as file:
+            return file.read()
+
+    # helper to run an incremental build, returning the number of pages generated
+    def build(self):
+        self.manifest = BuildManifest.load(self.dest, "/")
+        with self.assertLogs(level="INFO") as self.logs:
+            generated = generate_page_recursive(self.content, self.template, self.dest, "/", self.manifest)
+            self.manifest.save()
+        return generated
+
+    # test pages use the layout of their front matter, their directory or its nearest parent, or the default template
+    def test_resolve(self):
+        self.build()
+        self.assertEqual(self.read_output("index.html"), "<h1>Welcome</h1><div><h1>Home</h1></div>")
+        self.assertEqual(self.read_output("blog", "post.html"), "<title>Post</title><article><div><h1>Post</h1></div></article>")
+        self.assertEqual(self.read_output("blog", "drafts", "idea.html"),
+                         "<title>Idea</title><article><div><h1>Idea</h1></div></article>")
+        self.assertEqual(self.read_output("docs", "guide.html"), "<title>Guide</title><main><div><h1>Guide</h1></div></main>")
+
+    # test each template and partial is compiled once per build and depends on its partials
+    def test_compiled_once(self):
+        layouts = Layouts(self.template)
+        blog = layouts.resolve("blog/drafts")
+        self.assertEqual(blog, os.path.join(self.layouts, "blog.html"))
+        self.assertIs(layouts.get(blog), layouts.get(layouts.resolve("blog")))
+        self.assertEqual(layouts.get(blog).dependencies, [blog, os.path.join(self.layouts, "partials", "header.html")])
+        layouts.get(layouts.template_path)
+        self.assertEqual(len(layouts.templates), 2)
+        self.assertEqual(len(layouts.partials), 1)
+
+    # test editing a layout re-renders only the pages using it, and editing a partial the pages including it
+    def test_dependencies(self):
+        self.assertEqual(self.build(), 4)
+        self.assertEqual(self.build(), 0)
+
+        self.write(os.path.join(self.layouts, "blog.html"), "<section>{{ Content }}</section>")
+        self.assertEqual(self.build(), 2)
+        self.assertEqual(self.read_output("blog", "post.html"), "<section><div><h1>Post</h1></div></section>")
+
+        self.write(os.path.join(self.layouts, "partials", "header.html"), "<title>{{ Title }} - Site</title>")
+        self.assertEqual(self.build(), 1)
+        self.assertEqual(self.read_output("docs", "guide.html"), "<title>Guide - Site</title><main><div><h1>Guide</h1></div></main>")
+
+        # a new section layout takes over the pages of its section
+        self.write(os.path.join(self.layouts, "docs.html"), "<aside>{{ Content }}</aside>")
+        self.assertEqual(self.build(), 1)
+
+    # test a layout that fails to compile skips its pages but keeps their previous output
+    def test_invalid_layout(self):
+        self.build()
+        self.write(os.path.join(self.layouts, "blog.html"), "{{ Author }}")
+        self.assertEqual(self.build(), 0)
+        errors = [line for line in self.logs.output if line.startswith("ERROR")]
+        self.assertEqual(len(errors), 2)
+        self.assertIn("blog.html", errors[0])
+        self.assertIn("<article>", self.read_output("blog", "post.html"))
+        self.write(os.path.join(self.layouts, "blog.html"), "<section>{{ Content }}</section>")
+        self.assertEqual(self.build(), 2)
+
+    # test the watcher re-renders only the pages of a changed layout
+    def test_watch_layout_change(self):
+        self.build()
+        watcher = SiteWatcher(self.content, os.path.join(self.root, "static"), self.template, self.dest, "/",
+                              self.manifest)
+        self.write(os.path.join(self.layouts, "blog.html"), "<section>{{ Content }}</section>")
+        with self.assertLogs(level="INFO"):
+            self.assertEqual(watcher.rebuild({os.path.join(self.layouts, "blog.html")}), (2, 0))
+        self.assertEqual(self.read_output("blog", "drafts", "idea.html"), "<section><div><h1>Idea</h1></div></section>")
+
+        # a page moved to another layout by its front matter is re-rendered on its own
+        self.write(os.path.join(self.content, "docs", "guide.md"), "---\ntemplate: blog\n---\n# Guide")
+        with self.assertLogs(level="INFO"):
+            self.assertEqual(watcher.rebuild({os.path.join(self.content, "docs", "guide.md")}), (1, 0))
+        self.assertEqual(self.read_output("docs", "guide.html"), "<section><div><h1>Guide</h1></div></section>")
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
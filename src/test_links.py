@@ -0,0 +1,106 @@
+# import the necessary modules
+import os
+import unittest
+from links import LinkIndex, LINK, IMAGE
+from block_cache import BlockCache
+from document import Document
+import main as site
+from site_test_case import SiteTestCase
+
+# define the test case class
+class TestLinks(unittest.TestCase):
+    # test links and images are recorded as they are rendered, also for blocks served from a block cache
+    def test_find_links(self):
+        markdown = ("# See [home](/)\n\nText ![logo](/images/logo.png) and `[code](/not-a-link)`\n\n"
+                    "```\n[fenced](/not-a-link)\n```\n\n- [one](one.html)\n- **[bold](/not-a-link)**\n\n[home](/)")
+        expected = [(LINK, "/"), (IMAGE, "/images/logo.png"), (LINK, "one.html")]
+        self.assertEqual(Document.parse(markdown).find_links(), expected)
+        cache = BlockCache()
+        for _ in range(2):
+            document = Document.parse(markdown)
+            document.to_html_node(cache)
+            self.assertEqual(document.find_links(), expected)
+        self.assertEqual(cache.hits, 5)
+
+    # test links are resolved against the output paths like a static file server would
+    def test_check(self):
+        index = LinkIndex("docs", "/site/")
+        index.add_page(os.path.join("docs", "blog", "post", "index.html"), [
+            (LINK, "/"), (LINK, "/blog/post"), (LINK, "/contact/"), (LINK, "/about"), (LINK, "../other.html#top"),
+            (LINK, "https://example.com"), (LINK, "mailto:me@example.com"), (LINK, "#section"), (LINK, "./"),
+            (IMAGE, "/images/logo.png"), (IMAGE, "/images/missing.png"), (LINK, "/missing"),
+            (LINK, "../../../outside.html"), (LINK, "/site/index.html"), (LINK, "/site/tom"),
+        ])
+        # a page under a directory named like the base path is found
+        outputs = {"index.html", "blog/post/index.html", "contact/index.html", "about.html", "blog/other.html",
+                   "images/logo.png", "site/tom.html"}
+        self.assertEqual(index.check(outputs), [
+            ("blog/post/index.html", IMAGE, "/images/missing.png", "missing image"),
+            ("blog/post/index.html", LINK, "/missing", "no such page or file"),
+            ("blog/post/index.html", LINK, "../../../outside.html", "points outside the site"),
+            ("blog/post/index.html", LINK, "/site/index.html",
+             "not found, and already starts with the base path /site/, which is added at build time"),
+        ])
+
+        # a removed page no longer reports its links
+        index.remove_page(os.path.join("docs", "blog", "post", "index.html"))
+        self.assertEqual(index.check(outputs), [])
+
+    # test a rebuild only checks the pages it changed and the pages linking to outputs it added or removed
+    def test_check_changed(self):
+        index = LinkIndex("docs")
+        index.add_page(os.path.join("docs", "index.html"), [(LINK, "/blog/"), (IMAGE, "/logo.png")])
+        index.add_page(os.path.join("docs", "about.html"), [(LINK, "/")])
+        index.add_page(os.path.join("docs", "blog", "index.html"), [(LINK, "/about")])
+        self.assertEqual(index.check({"index.html", "about.html", "blog/index.html"}),
+                         [("index.html", IMAGE, "/logo.png", "missing image")])
+
+        # adding the image re-checks the page showing it
+        index.add_output(os.path.join("docs", "logo.png"))
+        self.assertEqual(index.changed, {"index.html"})
+        self.assertEqual(index.check_changed(), [])
+
+        # removing a page re-checks the pages linking to it, an edited page is checked on its own
+        index.remove_page(os.path.join("docs", "about.html"))
+        index.add_page(os.path.join("docs", "index.html"), [(LINK, "/blog")])
+        self.assertEqual(index.changed, {"about.html", "blog/index.html", "index.html"})
+        self.assertEqual(index.check_changed(), [("blog/index.html", LINK, "/about", "no such page or file")])
+        self.assertEqual(index.broken_links(), [("blog/index.html", LINK, "/about", "no such page or file")])
+
+class TestBuildLinks(SiteTestCase):
+    # build from the site directory
+    build_in_root = True
+
+    # create a small site with a broken link in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join("content", "index.md"), "# Home\n\n[post](/blog/post) ![logo](/logo.png)")
+        self.write(os.path.join("content", "blog", "post.md"), "# Post\n\n[back](/) [gone](/blog/gone)")
+        self.write(os.path.join("static", "logo.png"), "png")
+
+    # helper to build the site, returning the broken link warnings
+    def build(self, *args):
+        with self.assertLogs(level="INFO") as logs:
+            site.main(list(args))
+        return [line for line in logs.output if "Broken" in line]
+
+    # test broken links are reported, also for pages an incremental build skipped
+    def test_report(self):
+        for args in ((), ("--incremental",), ("--incremental",)):
+            broken = self.build(*args)
+            self.assertEqual(len(broken), 1)
+            self.assertIn("Broken link in blog/post.html: /blog/gone", broken[0])
+
+    # test the build can be made to fail on broken links
+    def test_fail(self):
+        with self.assertRaises(SystemExit):
+            self.build("--fail-on-broken-links", "--trace", "trace.json")
+        # the trace of the failed build is still written
+        self.assertTrue(os.path.isfile("trace.json"))
+        self.write(os.path.join("content", "blog", "gone.md"), "# Gone")
+        self.assertEqual(self.build("--fail-on-broken-links"), [])
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
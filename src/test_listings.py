@@ -0,0 +1,151 @@
+# import the necessary modules
+import os
+import shutil
+import unittest
+from generate_content import generate_page_recursive
+from manifest import BuildManifest
+from page_index import PageIndex, page_url, page_section, INDEX_NAME
+from listings import ListingRenderer, tag_slug, tag_slugs
+from layouts import Layouts
+from site_test_case import SiteTestCase
+
+# define the test case class
+class TestListings(SiteTestCase):
+    # create a small blog in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.post("first", "2024-01-01", "[python]")
+        self.post("second", "2024-02-01", "[python, web]")
+        self.post("third", "2024-03-01", "[web]")
+        self.index = PageIndex(self.dest, os.path.join(self.root, "pages.sqlite3"))
+
+    # close the index before the temporary directory is removed
+    def tearDown(self):
+        self.index.close()
+
+    # helper to write a blog post
+    def post(self, name, date, tags, section="blog"):
+        self.write(os.path.join(self.content, section, f"{name}.md"),
+                   f"---\ndate: {date}\ntags: {tags}\n---\n# Post {name}\n\nSome words here")
+
+    # helper to read an output file
+    def read_output(self, *parts):
+        with open(os.path.join(self.dest, *parts), encoding="utf-8") as file:
+            return file.read()
+
+    # helper to run an incremental build and render the listings, returning the listing urls written
+    def build(self):
+        manifest = BuildManifest.load(self.dest, "/")
+        with self.assertLogs(level="INFO"):
+            generate_page_recursive(self.content, self.template, self.dest, "/", manifest, page_index=self.index)
+            manifest.save()
+            renderer = ListingRenderer(self.index, Layouts(self.template), self.dest, manifest.build_hash, 2)
+            return renderer.render()
+
+    # test urls and sections derived from output paths
+    def test_page_url(self):
+        self.assertEqual(page_url("docs", os.path.join("docs", "index.html")), "/")
+        self.assertEqual(page_url("docs", os.path.join("docs", "blog", "post", "index.html")), "/blog/post/")
+        self.assertEqual(page_url("docs", os.path.join("docs", "blog", "post.html")), "/blog/post.html")
+        self.assertEqual([page_section(url) for url in ("/", "/about.html", "/blog/", "/blog/post.html")],
+                         ["", "", "blog", "blog"])
+        self.assertEqual(tag_slug("Middle Earth!"), "middle-earth")
+        self.assertEqual(tag_slug("日本"), "日本")
+
+    # test generated pages are indexed with their metadata
+    def test_index(self):
+        self.build()
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.section_pages("blog")[0], ("/blog/third.html", "Post third", "2024-03-01", 5))
+        self.assertEqual(self.index.tags(), [("python", 2), ("web", 2)])
+        self.assertFalse(self.index.update(os.path.join(self.content, "blog", "first.md"),
+                                           os.path.join(self.dest, "blog", "first.html"), {}))
+
+    # test archives are paginated newest first and tag pages are generated
+    def test_listing_pages(self):
+        written = self.build()
+        self.assertEqual(sorted(written), ["/blog/", "/blog/page/2/", "/tags/", "/tags/python/", "/tags/web/"])
+        archive = self.read_output("blog", "index.html")
+        self.assertLess(archive.index("Post third"), archive.index("Post second"))
+        self.assertNotIn("Post first", archive)
+        self.assertIn('<a href="/blog/page/2/" rel="next">Older</a>', archive)
+        self.assertIn("Post first", self.read_output("blog", "page", "2", "index.html"))
+        self.assertIn('<a href="/tags/python/">python</a> (2)', self.read_output("tags", "index.html"))
+
+    # test a new post re-renders only the listings it appears on, and deleted sections lose their listings
+    def test_affected_listings(self):
+        self.build()
+        self.assertEqual(self.build(), [])
+
+        self.post("news", "2024-04-01", "[announcements]", section="news")
+        self.assertEqual(sorted(self.build()), ["/news/", "/tags/", "/tags/announcements/"])
+
+        shutil.rmtree(os.path.join(self.content, "news"))
+        self.assertEqual(self.build(), ["/tags/"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "news", "index.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "tags", "announcements", "index.html")))
+
+    # test tags with the same slug get their own pages, which are left alone by the next build
+    def test_tag_collisions(self):
+        self.post("cpp", "2024-04-01", "[C++, 日本]")
+        self.post("csharp", "2024-05-01", "[C#, 中文]")
+        self.post("c", "2024-06-01", "[c]")
+        slugs = tag_slugs(["C++", "C#", "c", "日本", "中文"])
+        self.assertEqual(slugs["c"], "c")
+        self.assertEqual((slugs["日本"], slugs["中文"]), ("日本", "中文"))
+        self.assertEqual(len(set(slugs.values())), 5)
+        self.assertRegex(slugs["C++"], r"^c-[0-9a-f]{8}$")
+
+        self.build()
+        for tag, post in (("C++", "Post cpp"), ("C#", "Post csharp"), ("c", "Post c"), ("日本", "Post cpp"),
+                          ("中文", "Post csharp")):
+            self.assertIn(post, self.read_output("tags", slugs[tag], "index.html"))
+        self.assertIn('<a href="/tags/%E6%97%A5%E6%9C%AC/">日本</a> (1)', self.read_output("tags", "index.html"))
+        self.assertEqual(self.build(), [])
+
+    # test links to pages whose urls need escaping are quoted like the navigation and tag links
+    def test_quoted_page_links(self):
+        self.post("日本 notes", "2024-04-01", "[python]")
+        self.build()
+        link = '<a href="/blog/%E6%97%A5%E6%9C%AC%20notes.html">Post 日本 notes</a>'
+        self.assertIn(link, self.read_output("blog", "index.html"))
+        self.assertIn(link, self.read_output("tags", "python", "index.html"))
+
+    # test a section with its own index page starts its archive on a separate page
+    def test_section_index_page(self):
+        self.write(os.path.join(self.content, "blog", "index.md"), "# My Blog")
+        self.build()
+        self.assertIn("My Blog", self.read_output("blog", "index.html"))
+        self.assertIn("Post third", self.read_output("blog", "page", "1", "index.html"))
+        self.assertIn('<a href="/blog/page/1/" rel="prev">Newer</a>', self.read_output("blog", "page", "2", "index.html"))
+
+    # test a section index page added after its archive was rendered replaces the archive instead of being removed
+    def test_section_index_page_added(self):
+        self.build()
+        self.assertIn("Post third", self.read_output("blog", "index.html"))
+        self.write(os.path.join(self.content, "blog", "index.md"), "# My Blog")
+        self.assertIn("/blog/page/1/", self.build())
+        self.assertIn("My Blog", self.read_output("blog", "index.html"))
+        self.assertIn("Post third", self.read_output("blog", "page", "1", "index.html"))
+        self.assertEqual(self.build(), [])
+        self.assertIn("My Blog", self.read_output("blog", "index.html"))
+
+    # test listings use the layout of their section, and a layout change re-renders only its listings
+    def test_section_layout(self):
+        self.build()
+        os.makedirs(os.path.join(self.root, "layouts"))
+        self.write(os.path.join(self.root, "layouts", "blog.html"), "<h1>Blog</h1>{{ Content }}")
+        self.assertEqual(sorted(self.build()), ["/blog/", "/blog/page/2/"])
+        self.assertTrue(self.read_output("blog", "page", "2", "index.html").startswith("<h1>Blog</h1>"))
+        self.assertTrue(self.read_output("tags", "index.html").startswith("<title>Tags</title>"))
+
+    # test the page index is kept in the build caches beside the output directory by default
+    def test_default_index_path(self):
+        PageIndex(self.dest).close()
+        self.assertTrue(os.path.isfile(os.path.join(self.root, ".cache", INDEX_NAME)))
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
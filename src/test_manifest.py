@@ -0,0 +1,99 @@
+# import the necessary modules
+import os
+import json
+import unittest
+from generate_content import generate_page_recursive
+from links import LinkIndex
+from manifest import BuildManifest, MANIFEST_NAME, LINKS_NAME, cache_dir
+from site_test_case import SiteTestCase
+
+# define the test case class
+class TestBuildManifest(SiteTestCase):
+    # create a small site in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nHello")
+
+    # helper to run an incremental build, returning the links of every page
+    def build(self, base_path="/"):
+        manifest = BuildManifest.load(self.dest, base_path)
+        links = LinkIndex(self.dest, base_path)
+        generate_page_recursive(self.content, self.template, self.dest, base_path, manifest, links=links)
+        manifest.remove_stale()
+        manifest.save()
+        return links.pages
+
+    # test unchanged pages are skipped on the second build
+    def test_skips_unchanged_pages(self):
+        self.build()
+        index_html = os.path.join(self.dest, "index.html")
+        self.write(index_html, "untouched")
+        self.build()
+        self.assertEqual(self.read(index_html), "untouched")
+
+    # test a changed page is rebuilt while others are skipped
+    def test_rebuilds_changed_page(self):
+        self.build()
+        post_html = os.path.join(self.dest, "blog", "post.html")
+        index_html = os.path.join(self.dest, "index.html")
+        self.write(index_html, "untouched")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nEdited")
+        self.build()
+        self.assertIn("Edited", self.read(post_html))
+        self.assertEqual(self.read(index_html), "untouched")
+
+    # test a template change invalidates every page
+    def test_template_change_rebuilds_all(self):
+        self.build()
+        index_html = os.path.join(self.dest, "index.html")
+        self.write(index_html, "untouched")
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.build()
+        self.assertEqual(self.read(index_html), "<h1>Home</h1><div><h1>Home</h1><p>Welcome</p></div>")
+
+    # test a base path change invalidates every page
+    def test_base_path_change_rebuilds_all(self):
+        self.build()
+        index_html = os.path.join(self.dest, "index.html")
+        self.write(index_html, "untouched")
+        self.build("/site/")
+        self.assertNotEqual(self.read(index_html), "untouched")
+
+    # test the links of each page are kept in a compact file beside the manifest, written only when they change
+    def test_links_file(self):
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\n[home](/) ![logo](/logo.png)")
+        expected = {"blog/post.html": [("link", "/"), ("image", "/logo.png")], "index.html": []}
+        self.assertEqual(self.build(), expected)
+        links_path = os.path.join(self.dest, LINKS_NAME)
+        self.assertEqual(json.loads(self.read(links_path)),
+                         {os.path.join(self.content, "blog", "post.md"): [["link", "/"], ["image", "/logo.png"]]})
+        self.assertNotIn("links", self.read(os.path.join(self.dest, MANIFEST_NAME)))
+
+        # skipped pages get their links from the file, which is left alone while they are unchanged
+        os.utime(links_path, ns=(0, 0))
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nEdited")
+        self.assertEqual(self.build(), expected)
+        self.assertEqual(os.stat(links_path).st_mtime_ns, 0)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[post](/blog/post)")
+        self.assertEqual(self.build()["index.html"], [("link", "/blog/post")])
+        self.assertNotEqual(os.stat(links_path).st_mtime_ns, 0)
+
+    # test outputs of deleted sources are removed
+    def test_removes_deleted_pages(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    # test the build caches live beside the output directory, whichever directory the build runs from
+    def test_cache_dir(self):
+        expected = os.path.join(self.root, ".cache")
+        self.assertEqual(cache_dir(self.dest), expected)
+        self.assertEqual(cache_dir(os.path.relpath(self.dest) + os.sep), expected)
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
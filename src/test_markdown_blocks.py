@@ -1,6 +1,6 @@
 # import the necessary modules
 import unittest
-from markdown_blocks import markdown_to_blocks, BlockType, block_to_block_type, markdown_to_html_node
+from markdown_blocks import markdown_to_blocks, BlockType, block_to_block_type, markdown_to_html_node, scan_blocks, Block
 from generate_content import extract_title
 
 # define the test case class
@@ -202,6 +202,59 @@ This is an invalid code block
         with self.assertRaises(ValueError):
             markdown_to_html_node(markdown)
 
+    # test scanning markdown into typed blocks with their lines split
+    def test_scan_blocks(self):
+        md = """
+# Title
+Intro paragraph
+on two lines
+
+> quoted
+
+1. one
+2. two
+"""
+        self.assertEqual(
+            list(scan_blocks(md)),
+            [
+                Block(BlockType.HEADING, ["# Title"]),
+                Block(BlockType.PARAGRAPH, ["Intro paragraph", "on two lines"]),
+                Block(BlockType.QUOTE, ["> quoted"]),
+                Block(BlockType.ORDERED_LIST, ["1. one", "2. two"]),
+            ],
+        )
+
+    # test fenced code blocks keep blank lines
+    def test_code_with_blank_line(self):
+        markdown = """
+```
+first line
+
+second line
+```
+
+after
+"""
+        self.assertEqual(markdown_to_blocks(markdown), ["```\nfirst line\n\nsecond line\n```", "after"])
+        node = markdown_to_html_node(markdown)
+        self.assertEqual(
+            node.to_html(),
+            "<div><pre><code>first line\n\nsecond line</code></pre><p>after</p></div>",
+        )
+
+    # test a closing fence must be at least as long as the opening fence
+    def test_code_longer_fence(self):
+        markdown = "````\n```\nnested\n```\n````"
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            "<div><pre><code>```\nnested\n```</code></pre></div>",
+        )
+
+    # test a list with a line that breaks the pattern is a paragraph
+    def test_broken_list_is_paragraph(self):
+        self.assertEqual(block_to_block_type("1. First item\n3. Third item"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("- Item 1\nItem 2"), BlockType.PARAGRAPH)
+
     # test extracting title from markdown
     def test_extract_title(self):
         markdown = """
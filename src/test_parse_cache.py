@@ -0,0 +1,127 @@
+# import the necessary modules
+import os
+import unittest
+import parse_cache
+from parse_cache import ParseCache
+from document import Document
+from generate_content import generate_page_recursive
+from site_test_case import TempDirTestCase, SiteTestCase
+import main as site
+from block_cache import BLOCK_CACHE_NAME
+
+# markdown covering every block type
+MARKDOWN = """---
+title: Cached
+tags: [a, b]
+---
+# Heading
+
+Some **bold**, _italic_, `code`, a [link](/x) and ![image](/y.png).
+
+> a quote
+
+- one
+- two
+
+1. first
+2. second
+
+```
+code block
+```"""
+
+# define the test case class
+class TestParseCache(TempDirTestCase):
+    # create a cache in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.cache = ParseCache(os.path.join(self.root, "cache"))
+
+    # test a cached document is the same as a freshly parsed one
+    def test_round_trip(self):
+        first = self.cache.parse(MARKDOWN, "page.md")
+        second = self.cache.parse(MARKDOWN, "page.md")
+        expected = Document.parse(MARKDOWN, "page.md")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(second.to_html_node().to_html(), expected.to_html_node().to_html())
+        self.assertEqual(second.to_html_node().to_html(), first.to_html_node().to_html())
+        self.assertEqual(second.blocks, expected.blocks)
+        self.assertEqual((second.title, second.tags, second.path), ("Cached", ["a", "b"], "page.md"))
+        self.assertEqual(second.find_links(), [("link", "/x"), ("image", "/y.png")])
+
+    # test changing the parser version invalidates cached documents
+    def test_parser_version(self):
+        self.cache.parse(MARKDOWN)
+        original = parse_cache.PARSER_VERSION
+        parse_cache.PARSER_VERSION = original + "-changed"
+        try:
+            self.cache.parse(MARKDOWN)
+        finally:
+            parse_cache.PARSER_VERSION = original
+        self.assertEqual(self.cache.misses, 2)
+
+    # test a corrupt entry is treated as a miss
+    def test_corrupt_entry(self):
+        self.cache.parse(MARKDOWN)
+        with open(self.cache.entry_path(self.cache.key(MARKDOWN)), "wb") as file:
+            file.write(b"not a pickle")
+        with self.assertLogs(level="WARNING"):
+            document = self.cache.parse(MARKDOWN)
+        self.assertEqual(document.title, "Cached")
+        self.assertEqual(self.cache.misses, 2)
+
+    # test pruning removes the least recently used entries first
+    def test_prune(self):
+        documents = [f"# Page {i}\n\n" + "text " * 200 for i in range(3)]
+        for index, markdown in enumerate(documents):
+            self.cache.parse(markdown)
+            # give each entry a distinct last-used time
+            os.utime(self.cache.entry_path(self.cache.key(markdown)), ns=(index * 10**9, index * 10**9))
+
+        # using the oldest entry makes it the most recently used
+        self.cache.parse(documents[0])
+        size = os.path.getsize(self.cache.entry_path(self.cache.key(documents[0])))
+        self.cache.max_bytes = size * 2
+        self.assertEqual(self.cache.prune(), 1)
+        self.assertFalse(os.path.exists(self.cache.entry_path(self.cache.key(documents[1]))))
+        self.assertTrue(os.path.exists(self.cache.entry_path(self.cache.key(documents[0]))))
+
+    # test a template-only rebuild parses nothing
+    def test_template_rebuild_skips_parsing(self):
+        content = os.path.join(self.root, "content")
+        dest = os.path.join(self.root, "docs")
+        template = os.path.join(self.root, "template.html")
+        os.makedirs(dest)
+        for name in ("a", "b"):
+            self.write(os.path.join(content, f"{name}.md"), MARKDOWN)
+        self.write(template, "{{ Title }}{{ Content }}")
+        generate_page_recursive(content, template, dest, "/", cache=self.cache)
+
+        self.write(template, "<h1>{{ Title }}</h1>{{ Content }}")
+        generate_page_recursive(content, template, dest, "/", cache=self.cache)
+        self.assertEqual((self.cache.hits, self.cache.misses), (3, 1))
+        self.assertTrue(self.read(os.path.join(dest, "a.html")).startswith("<h1>Cached</h1><div><h1>Heading</h1>"))
+
+
+# define the test case class of builds from the command line
+class TestParseCacheBuild(SiteTestCase):
+    # build from the site directory
+    build_in_root = True
+
+    # test builds cache parsed pages and rendered blocks beside the output directory unless --no-cache is given
+    def test_default_on(self):
+        self.write(os.path.join("content", "index.md"), MARKDOWN)
+        parse_dir = os.path.join(self.root, ".cache", parse_cache.PARSE_CACHE_NAME)
+        with self.assertLogs(level="INFO"):
+            site.main(["--no-cache"])
+        self.assertFalse(os.path.exists(parse_dir))
+        self.assertFalse(os.path.exists(os.path.join(self.root, ".cache", BLOCK_CACHE_NAME)))
+        with self.assertLogs(level="INFO"):
+            site.main([])
+        self.assertEqual(len(os.listdir(parse_dir)), 1)
+        self.assertTrue(os.path.isfile(os.path.join(self.root, ".cache", BLOCK_CACHE_NAME)))
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
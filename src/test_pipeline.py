@@ -0,0 +1,75 @@
+# import the necessary modules
+import os
+import unittest
+from generate_content import generate_page_recursive
+from block_cache import BlockCache
+from manifest import BuildManifest
+from page_index import PageIndex
+from site_test_case import SiteTestCase
+
+# define the test case class
+class TestPipeline(SiteTestCase):
+    # template of the site, with a link the base path is added to
+    template_text = '<title>{{ Title }}</title><a href="/blog/">{{ Content }}</a>'
+
+    # create a small site in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nSome **bold** text")
+        for number in range(12):
+            self.write(os.path.join(self.content, "blog", f"post{number}.md"),
+                       f"# Post {number}\n\n- one\n- two\n\n```\ncode {number}\n```")
+
+    # helper to generate the site into a directory and read back every output file
+    def generate(self, name, **options):
+        dest = os.path.join(self.root, name)
+        os.makedirs(dest)
+        with self.assertLogs(level="INFO") as self.logs:
+            generate_page_recursive(self.content, self.template, dest, "/base/", **options)
+        outputs = {}
+        for dirpath, dirnames, filenames in os.walk(dest):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                outputs[os.path.relpath(path, dest)] = self.read(path)
+        return outputs
+
+    # test the pipeline writes the same pages as the serial path
+    def test_matches_serial(self):
+        serial = self.generate("serial")
+        self.assertEqual(len(serial), 13)
+        self.assertEqual(self.generate("pipeline", pipeline=True, block_cache=BlockCache()), serial)
+        self.assertEqual(self.generate("pipeline_jobs", pipeline=True, jobs=2), serial)
+
+    # test a failing page is reported without stopping the others
+    def test_page_error(self):
+        self.write(os.path.join(self.content, "blog", "post3.md"), "no title")
+        outputs = self.generate("pipeline", pipeline=True)
+        self.assertEqual(len(outputs), 12)
+        errors = [line for line in self.logs.output if line.startswith("ERROR")]
+        self.assertEqual(len(errors), 1)
+        self.assertIn("post3.md", errors[0])
+
+    # test incremental pipeline builds check the page index, whose connection belongs to this thread
+    def test_incremental_page_index(self):
+        for jobs in (1, 2):
+            dest = os.path.join(self.root, f"incremental{jobs}")
+            os.makedirs(dest)
+            index = PageIndex(dest, os.path.join(self.root, f"pages{jobs}.sqlite3"))
+            self.addCleanup(index.close)
+
+            # the second build skips every page, a page missing from the index is generated again
+            generated = []
+            for build in range(3):
+                if build == 2:
+                    index.remove(os.path.join(self.content, "index.md"))
+                manifest = BuildManifest.load(dest, "/")
+                with self.assertLogs(level="INFO"):
+                    generated.append(generate_page_recursive(self.content, self.template, dest, "/", manifest,
+                                                             jobs=jobs, pipeline=True, page_index=index))
+                manifest.save()
+            self.assertEqual(generated, [13, 0, 1])
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+# import the necessary modules
+import io
+import os
+import shutil
+import unittest
+import contextlib
+import main as site
+from site_test_case import SiteTestCase
+from generate_content import generate_page_recursive, size_batches
+from layouts import Layouts
+from manifest import BuildManifest
+from planner import discover_pages, plan_build, BuildJob, BuildPlan
+
+# define the test case class
+class TestPlanner(SiteTestCase):
+    # create a small site in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, ".hidden.md"), "# Hidden")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\n" + "words " * 100)
+        self.write(os.path.join(self.content, "blog", "deep", "long.md"), "# Long\n\n" + "words " * 1000)
+
+    # helper to plan an incremental build, returning the reason of each job by file name
+    def plan(self):
+        plan = plan_build(self.content, self.dest, Layouts(self.template), BuildManifest.load(self.dest, "/"))
+        return {os.path.basename(job.source): job.reason for job in plan.jobs}
+
+    # helper to run an incremental build
+    def build(self):
+        manifest = BuildManifest.load(self.dest, "/")
+        with self.assertLogs(level="INFO"):
+            generate_page_recursive(self.content, self.template, self.dest, "/", manifest)
+            manifest.save()
+
+    # test discovery finds every page in site order with its size, without creating any directory
+    def test_discover_pages(self):
+        dest = os.path.join(self.root, "out")
+        pages = list(discover_pages(self.content, dest))
+        self.assertEqual([(os.path.relpath(source, self.content), os.path.relpath(output, dest))
+                          for source, output, _ in pages],
+                         [(os.path.join("blog", "deep", "long.md"), os.path.join("blog", "deep", "long.html")),
+                          (os.path.join("blog", "post.md"), os.path.join("blog", "post.html")),
+                          ("index.md", "index.html")])
+        self.assertEqual(pages[2][2], len("# Home"))
+        self.assertFalse(os.path.exists(dest))
+
+    # test each job records why it runs and what it depends on
+    def test_reasons(self):
+        self.assertEqual(self.plan(), {"long.md": "new", "post.md": "new", "index.md": "new"})
+        self.build()
+        self.assertEqual(self.plan(), {})
+
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nEdited")
+        os.remove(os.path.join(self.dest, "index.html"))
+        os.makedirs(os.path.join(self.root, "layouts"))
+        self.write(os.path.join(self.root, "layouts", "deep.html"), "unused")
+        self.write(os.path.join(self.root, "layouts", "blog.html"), "<main>{{ Content }}</main>")
+        self.assertEqual(self.plan(), {"long.md": "template-changed", "post.md": "changed", "index.md": "output-missing"})
+
+        plan = plan_build(self.content, self.dest, Layouts(self.template, "/site/"), BuildManifest.load(self.dest, "/site/"))
+        self.assertEqual({job.reason for job in plan.jobs}, {"build-changed"})
+        self.assertEqual(plan.jobs[0].dependencies, [plan.jobs[0].source, os.path.join(self.root, "layouts", "blog.html")])
+        self.assertEqual({job.reason for job in plan_build(self.content, self.dest, Layouts(self.template)).jobs},
+                         {"full-build"})
+
+    # test parallel runners get the largest jobs first, and the estimate spreads them over the workers
+    def test_largest_first(self):
+        plan = BuildPlan()
+        plan.jobs = [BuildJob(f"{size}.md", f"{size}.html", size * 1024 * 1024, "t.html", "", [], "new")
+                     for size in (1, 4, 2, 3)]
+        self.assertEqual([job.size // (1024 * 1024) for job in plan.largest_first()], [4, 3, 2, 1])
+        self.assertAlmostEqual(plan.estimate_seconds(1), sum(job.cost() for job in plan.jobs))
+        self.assertAlmostEqual(plan.estimate_seconds(2), plan.jobs[1].cost() + plan.jobs[0].cost())
+        self.assertEqual(plan.total_size(), 10 * 1024 * 1024)
+
+        # batches for the process pool keep the largest pages apart
+        self.assertEqual(size_batches([job.size for job in plan.largest_first()] + [1024] * 4, 4),
+                         [(0, 1), (1, 2), (2, 3), (3, 8)])
+
+    # test a dry run prints the plan without writing any output
+    def test_dry_run(self):
+        previous_cwd = os.getcwd()
+        os.chdir(self.root)
+        try:
+            shutil.rmtree("docs")
+            output = io.StringIO()
+            with self.assertLogs(level="INFO"), contextlib.redirect_stdout(output):
+                site.main(["--dry-run", "--jobs", "2", "--trace", "trace.json"])
+        finally:
+            os.chdir(previous_cwd)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], "Build plan: 3 pages to generate, 0 up to date, 0 with a broken template.")
+        self.assertIn("long.md", lines[1])
+        self.assertTrue(lines[-1].startswith("Estimated cost:") and lines[-1].endswith("with 2 workers."))
+        # only the trace of the plan is written
+        self.assertEqual(sorted(os.listdir(self.root)), ["content", "static", "template.html", "trace.json"])
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
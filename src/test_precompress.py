@@ -0,0 +1,70 @@
+# import the necessary modules
+import os
+import gzip
+import unittest
+from precompress import precompress_directory, precompress_files, encoders
+from site_test_case import TempDirTestCase
+
+# define the test case class
+class TestPrecompress(TempDirTestCase):
+    # create an output directory with compressible and incompressible files
+    def setUp(self):
+        super().setUp()
+        self.page = os.path.join(self.root, "blog", "post.html")
+        self.write(self.page, "<p>hello world</p>" * 500)
+        self.write(os.path.join(self.root, "index.css"), "body { margin: 0; }\n" * 200)
+        self.write(os.path.join(self.root, "small.js"), "let x = 1;")
+        self.write(os.path.join(self.root, "image.png"), "png" * 1000)
+        self.write(os.path.join(self.root, ".build-manifest.json"), "{}" * 1000)
+
+    # test siblings are written only for compressible files above the threshold
+    def test_precompress(self):
+        stats = precompress_directory(self.root, workers=2)
+        with gzip.open(self.page + ".gz", "rt", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<p>hello world</p>" * 500)
+        self.assertTrue(os.path.exists(os.path.join(self.root, "index.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "small.js.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "image.png.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.root, ".build-manifest.json.gz")))
+        self.assertEqual(sorted(stats), [".css", ".html"])
+        self.assertEqual(stats[".html"].files, 1)
+        self.assertLess(stats[".html"].ratio(".gz"), 0.1)
+
+    # test up to date siblings are skipped and changed files are recompressed
+    def test_skip_fresh(self):
+        precompress_directory(self.root)
+        self.assertEqual(precompress_directory(self.root, skip_fresh=True), {})
+
+        # a rewritten page gets a new mtime and is compressed again
+        self.write(self.page, "<p>changed</p>" * 500)
+        os.utime(self.page, ns=(0, 10**9))
+        stats = precompress_directory(self.root, skip_fresh=True)
+        self.assertEqual(list(stats), [".html"])
+        with gzip.open(self.page + ".gz", "rt", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "<p>changed</p>" * 500)
+
+    # test siblings of deleted files are removed
+    def test_orphans(self):
+        precompress_directory(self.root)
+        os.remove(self.page)
+        precompress_directory(self.root, skip_fresh=True)
+        for extension in encoders:
+            self.assertFalse(os.path.exists(self.page + extension))
+
+    # test only the given files are brought up to date, and siblings of deleted or shrunk files are removed
+    def test_precompress_files(self):
+        stylesheet = os.path.join(self.root, "index.css")
+        self.assertEqual(precompress_files([self.page, stylesheet, os.path.join(self.root, "image.png")]), 2)
+        self.assertTrue(os.path.exists(self.page + ".gz"))
+        self.assertEqual(precompress_files([self.page]), 0)
+
+        self.write(stylesheet, "body {}")
+        os.remove(self.page)
+        self.assertEqual(precompress_files([self.page, stylesheet]), 0)
+        self.assertFalse(os.path.exists(self.page + ".gz"))
+        self.assertFalse(os.path.exists(stylesheet + ".gz"))
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# import the necessary modules
+import os
+import json
+import shutil
+import unittest
+from document import Document
+from generate_content import generate_page_recursive
+from manifest import BuildManifest
+from site_test_case import SiteTestCase
+from search import SearchIndex, page_terms, shard_name, query_index, encode_postings, decode_postings, HEADING_WEIGHT, \
+    STATE_NAME
+
+# define the test case class
+class TestSearch(SiteTestCase):
+    # create a small site in a temporary directory
+    def setUp(self):
+        super().setUp()
+        # the state of the last index build is kept in the build caches beside the output directory
+        self.state = os.path.join(self.root, ".cache", STATE_NAME)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome to the shire")
+        self.write(os.path.join(self.content, "blog", "ring.md"), "# The Ring\n\nOne ring to rule them all in the shire")
+        self.write(os.path.join(self.content, "blog", "road.md"), "# The Road\n\nThe road goes ever on")
+
+    # helper to run an incremental build with a search index, returning the shard files written
+    def build(self):
+        manifest = BuildManifest.load(self.dest, "/")
+        index = SearchIndex.load(self.dest, "/site/")
+        shards = os.path.join(self.dest, "search", "terms")
+        before = {name: os.stat(os.path.join(shards, name)).st_mtime_ns for name in os.listdir(shards)} \
+            if os.path.isdir(shards) else {}
+        with self.assertLogs(level="INFO"):
+            generate_page_recursive(self.content, self.template, self.dest, "/", manifest, search_index=index)
+            manifest.save()
+            index.save()
+        return sorted(name[:-len(".json")] for name in os.listdir(shards)
+                      if before.get(name) != os.stat(os.path.join(shards, name)).st_mtime_ns)
+
+    # helper to query the index in the output
+    def search(self, query):
+        return query_index(os.path.join(self.dest, "search"), query)[0]
+
+    # test terms come from the text of inline nodes, with headings weighted and code blocks skipped
+    def test_page_terms(self):
+        document = Document.parse("# Bilbo's Party\n\nA **long** [party](/party.html) for Bilbo\n\n"
+                                  "```\nhidden code\n```\n\n- the ![shire map](/map.png)")
+        terms = page_terms(document.blocks)
+        self.assertEqual(terms["bilbo"], HEADING_WEIGHT + 1)
+        self.assertEqual(terms["party"], HEADING_WEIGHT + 1)
+        self.assertEqual(terms["long"], 1)
+        self.assertEqual(terms["map"], 1)
+        for skipped in ("the", "a", "html", "png", "hidden", "code"):
+            self.assertNotIn(skipped, terms)
+        self.assertEqual(document.search_terms(), terms)
+
+    # test shard names and posting lists
+    def test_shards(self):
+        self.assertEqual(shard_name("shire"), "shi")
+        self.assertEqual(shard_name("ok"), "ok")
+        self.assertEqual(shard_name("élan"), "_" + "éla".encode("utf-8").hex())
+        pairs = [(3, 1), (7, 5), (20, 2)]
+        self.assertEqual(encode_postings(pairs), [3, 1, 4, 5, 13, 2])
+        self.assertEqual(decode_postings(encode_postings(pairs)), pairs)
+
+    # test pages containing every query term are found, best first, fetching only the shards of the terms
+    def test_query(self):
+        self.build()
+        self.assertEqual(sorted(url for url, _, _ in self.search("shire")), ["/site/", "/site/blog/ring.html"])
+        self.assertEqual(self.search("Ring SHIRE"), [("/site/blog/ring.html", "The Ring", HEADING_WEIGHT + 2)])
+        self.assertEqual(self.search("shire dragon"), [])
+        self.assertEqual(self.search("the"), [])
+        _, files = query_index(os.path.join(self.dest, "search"), "road ever")
+        self.assertEqual(files, ["meta.json", "terms/roa.json", "terms/eve.json", "docs/0.json"])
+        self.assertTrue(os.path.isfile(os.path.join(self.dest, "search", "search.js")))
+
+    # test an edited page only rewrites the shards of its old and new terms, and deleted pages are dropped
+    def test_incremental(self):
+        self.build()
+        self.assertEqual(self.build(), [])
+
+        self.write(os.path.join(self.content, "blog", "road.md"), "# The Road\n\nThe road goes further")
+        self.assertEqual(self.build(), ["fur", "goe", "roa"])
+        self.assertEqual(self.search("further"), [("/site/blog/road.html", "The Road", 1)])
+        self.assertEqual(self.search("ever"), [])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "search", "terms", "eve.json")))
+
+        os.remove(os.path.join(self.content, "blog", "ring.md"))
+        self.build()
+        self.assertEqual(self.search("ring"), [])
+        self.assertEqual([url for url, _, _ in self.search("shire")], ["/site/"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "search", "terms", "rin.json")))
+
+    # test an index whose output was cleared is rebuilt from scratch
+    def test_cleared_output(self):
+        self.build()
+        shutil.rmtree(os.path.join(self.dest, "search"))
+        self.assertEqual(len(SearchIndex.load(self.dest, "/site/").pages), 0)
+        with open(self.state, encoding="utf-8") as file:
+            self.assertEqual(len(json.load(file)["pages"]), 3)
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
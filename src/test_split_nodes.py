@@ -201,6 +201,48 @@ class TestSplitNodes(unittest.TestCase):
         ]
         self.assertEqual(new_nodes, expected_nodes)
 
+    # test links whose url contains an underscore are not split as italic
+    def test_text_to_textnodes_link_with_underscore(self):
+        new_nodes = text_to_textnodes("Read [the docs](https://example.com/a_b_c) now")
+        expected_nodes = [
+            TextNode("Read ", TextType.PLAIN),
+            TextNode("the docs", TextType.LINK, "https://example.com/a_b_c"),
+            TextNode(" now", TextType.PLAIN)
+        ]
+        self.assertEqual(new_nodes, expected_nodes)
+
+    # test delimiters inside code are kept as literal text
+    def test_text_to_textnodes_code_with_delimiters(self):
+        new_nodes = text_to_textnodes("Call `snake_case(**kwargs)` here")
+        expected_nodes = [
+            TextNode("Call ", TextType.PLAIN),
+            TextNode("snake_case(**kwargs)", TextType.CODE),
+            TextNode(" here", TextType.PLAIN)
+        ]
+        self.assertEqual(new_nodes, expected_nodes)
+
+    # test text with only links, including adjacent links, one with empty text and one at each end
+    def test_text_to_textnodes_only_links(self):
+        new_nodes = text_to_textnodes("[first](/a)[](/b) and * stars [last](/c)")
+        expected_nodes = [
+            TextNode("first", TextType.LINK, "/a"),
+            TextNode("", TextType.LINK, "/b"),
+            TextNode(" and * stars ", TextType.PLAIN),
+            TextNode("last", TextType.LINK, "/c")
+        ]
+        self.assertEqual(new_nodes, expected_nodes)
+
+    # test converting text with an unmatched delimiter raises error
+    def test_text_to_textnodes_unmatched_delimiter(self):
+        with self.assertRaises(ValueError) as context:
+            text_to_textnodes("This is **bold text and _italic_")
+        self.assertTrue("unmatched delimiter '**'" in str(context.exception))
+
+    # test converting empty text raises error
+    def test_text_to_textnodes_empty(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("")
+
 # run the tests if this script is executed
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,80 @@
+# import the necessary modules
+import unittest
+from htmlnode import LeafNode, ParentNode
+from template import Template, TemplateError, rewrite_base_path, iter_rewrite_base_path
+
+# define the test case class
+class TestTemplate(unittest.TestCase):
+    # test the template is split into segments and slots
+    def test_compile(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        self.assertEqual(template.segments, ["<title>", "</title><article>", "</article>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    # test rendering fills the placeholders
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title>{{Content}}")
+        self.assertEqual(template.render(Title="Home", Content="<p>Hi</p>"), "<title>Home</title><p>Hi</p>")
+
+    # test rendering matches the previous replace-based output with a base path
+    def test_render_base_path(self):
+        source = '<link href="/index.css" /><title>{{ Title }}</title>{{ Content }}'
+        content = '<a href="/blog">blog</a><img src="/logo.png" alt="">'
+        expected = source.replace("{{ Title }}", "Home").replace("{{ Content }}", content)
+        expected = expected.replace('href="/', 'href="/site/').replace('src="/', 'src="/site/')
+        template = Template(source, "/site/")
+        self.assertEqual(template.render(Title="Home", Content=content), expected)
+
+    # test repeated placeholders are all filled
+    def test_repeated_placeholder(self):
+        template = Template("{{ Title }}|{{ Title }}")
+        self.assertEqual(template.render(Title="A", Content=""), "A|A")
+
+    # test unknown placeholders raise an error
+    def test_unknown_placeholder(self):
+        with self.assertRaises(TemplateError):
+            Template("<p>{{ Author }}</p>")
+
+    # test missing values raise an error
+    def test_missing_value(self):
+        template = Template("{{ Title }}{{ Content }}")
+        with self.assertRaises(TemplateError):
+            template.render(Title="Home")
+
+    # test the root base path leaves urls unchanged
+    def test_rewrite_root_base_path(self):
+        self.assertEqual(rewrite_base_path('<a href="/x">', "/"), '<a href="/x">')
+
+    # test streaming an HTMLNode value matches rendering its html string
+    def test_render_html_node(self):
+        content = ParentNode("div", [LeafNode("a", "home", {"href": "/"}), LeafNode("img", "", {"src": "/logo.png"})])
+        template = Template('<link href="/index.css">{{ Content }}', "/site/")
+        self.assertEqual(template.render(Title="", Content=content),
+                         template.render(Title="", Content=content.to_html()))
+
+    # test url prefixes split across fragments are still rewritten
+    def test_rewrite_split_fragments(self):
+        fragments = ['<a hr', 'ef="', '/x">', 'src=', '"/y" s', 'rc']
+        self.assertEqual("".join(iter_rewrite_base_path(fragments, "/site/")),
+                         rewrite_base_path("".join(fragments), "/site/"))
+
+    # test included partials are pasted in recursively, with the base path applied and their paths recorded
+    def test_include(self):
+        partials = {"header.html": '<a href="/">{% include "logo.html" %}</a>', "logo.html": "{{ Title }}"}
+        read_partial = lambda name: (name, partials[name])
+        template = Template('{% include "header.html" %}{{ Content }}', "/site/", "page.html", None, read_partial)
+        self.assertEqual(template.render(Title="Home", Content="<p>Hi</p>"), '<a href="/site/">Home</a><p>Hi</p>')
+        self.assertEqual(template.dependencies, ["page.html", "header.html", "logo.html"])
+
+    # test partials that include themselves and includes without partials raise an error
+    def test_include_errors(self):
+        partials = {"a.html": '{% include "b.html" %}', "b.html": '{% include "a.html" %}'}
+        with self.assertRaisesRegex(TemplateError, "a.html -> b.html -> a.html"):
+            Template('{% include "a.html" %}', read_partial=lambda name: (name, partials[name]))
+        with self.assertRaises(TemplateError):
+            Template('{% include "a.html" %}')
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
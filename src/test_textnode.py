@@ -55,6 +55,11 @@ class TestTextNode(unittest.TestCase):
         node = TextNode("This is an image", TextType.IMAGE, "http://example.com/image.png")
         self.assertEqual(repr(node), "TextNode(This is an image, TextType.IMAGE, http://example.com/image.png)")
 
+    # test text nodes use slots instead of a per-instance dict
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 class TestTextNodeToHTMLNode(unittest.TestCase):
     # test text node to html node conversion for plain text
     def test_plain(self):
@@ -0,0 +1,78 @@
+# import the necessary modules
+import os
+import json
+import shutil
+import unittest
+import tracing
+from generate_content import generate_page, generate_page_recursive
+from site_test_case import SiteTestCase
+
+# define the test case class
+class TestTracing(SiteTestCase):
+    # template of the site, with a link the base path is added to
+    template_text = '<title>{{ Title }}</title><a href="/x">x</a>{{ Content }}'
+
+    # create a page beside the site in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.markdown = os.path.join(self.root, "page.md")
+        self.write(self.markdown, "# Title\n\nSome **bold** [link](/home) text.")
+
+    # make sure tracing is off
+    def tearDown(self):
+        tracing.stop()
+
+    # test spans are shared no-ops while tracing is off
+    def test_span_off(self):
+        self.assertIs(tracing.span("read"), tracing.null_span)
+
+    # test each phase of a page is recorded as a complete event
+    def test_page_phases(self):
+        tracer = tracing.start()
+        generate_page(self.markdown, self.template, os.path.join(self.root, "traced.html"), "/site/")
+        names = [event["name"] for event in tracer.events]
+        self.assertEqual(names, ["read", "parse", "load_template", "to_html_node", "to_html", "template", "write"])
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in tracer.events))
+
+    # test tracing does not change the output
+    def test_output_unchanged(self):
+        generate_page(self.markdown, self.template, os.path.join(self.root, "plain.html"), "/site/")
+        tracing.start()
+        generate_page(self.markdown, self.template, os.path.join(self.root, "traced.html"), "/site/")
+        self.assertEqual(self.read(os.path.join(self.root, "plain.html")), self.read(os.path.join(self.root, "traced.html")))
+
+    # test spans recorded in worker processes are collected and saved
+    def test_parallel_trace(self):
+        for name in ("a", "b", "c"):
+            shutil.copy(self.markdown, os.path.join(self.content, f"{name}.md"))
+
+        tracer = tracing.start()
+        generate_page_recursive(self.content, self.template, self.dest, "/", jobs=2)
+        path = os.path.join(self.root, "trace.json")
+        tracing.stop().save(path)
+
+        events = json.loads(self.read(path))["traceEvents"]
+        self.assertEqual(len(events), len(tracer.events))
+        self.assertEqual(sum(event["name"] == "generate_page" for event in events), 3)
+        self.assertEqual(sum(event["name"] == "plan_build" for event in events), 1)
+
+    # test the pipeline records the same page phases as the serial path, in this process and in workers
+    def test_pipeline_trace(self):
+        for name in ("a", "b", "c"):
+            shutil.copy(self.markdown, os.path.join(self.content, f"{name}.md"))
+
+        for jobs in (1, 2):
+            dest = os.path.join(self.root, f"docs{jobs}")
+            os.makedirs(dest)
+            tracer = tracing.start()
+            generate_page_recursive(self.content, self.template, dest, "/", jobs=jobs, pipeline=True)
+            tracing.stop()
+            names = [event["name"] for event in tracer.events]
+            for name in ("read", "parse", "to_html_node", "to_html", "template", "write"):
+                self.assertEqual(names.count(name), 3, (jobs, name))
+            self.assertEqual(names.count("plan_build"), 1)
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# import the necessary modules
+import os
+import errno
+import unittest
+import transfer
+from transfer import FileTransfer, TRANSFER_MODES
+from copy_directory import copy_directory
+from site_test_case import TempDirTestCase
+
+# define the test case class
+class TestFileTransfer(TempDirTestCase):
+    # create a source tree in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.root, "static")
+        for i in range(20):
+            self.write(os.path.join(self.source, "images", f"{i}.png"), f"image {i}" * (i + 1))
+        self.write(os.path.join(self.source, "index.css"), "body {}")
+
+    # test every mode copies the tree with identical contents, inline and on a pool
+    def test_modes_copy_tree(self):
+        for mode in TRANSFER_MODES:
+            for workers in (1, 4):
+                dest = os.path.join(self.root, f"docs-{mode}-{workers}")
+                with FileTransfer(mode, workers) as file_transfer:
+                    copy_directory(self.source, dest, transfer=file_transfer)
+                self.assertEqual(file_transfer.failed, [])
+                self.assertEqual(self.read(os.path.join(dest, "images", "7.png")), "image 7" * 8)
+                self.assertEqual(sum(file_transfer.counts.values()), 21)
+
+    # test hardlink mode shares the inode, and a later copy does not write through to the source
+    def test_hardlink_then_copy(self):
+        dest = os.path.join(self.root, "docs")
+        with FileTransfer("hardlink") as file_transfer:
+            copy_directory(self.source, dest, transfer=file_transfer)
+        source_css = os.path.join(self.source, "index.css")
+        dest_css = os.path.join(dest, "index.css")
+        self.assertEqual(os.stat(source_css).st_ino, os.stat(dest_css).st_ino)
+        with FileTransfer("copy") as file_transfer:
+            file_transfer.transfer(os.path.join(self.source, "images", "1.png"), dest_css)
+        self.assertEqual(self.read(source_css), "body {}")
+
+    # test an unsupported technique falls back to the next one and is not retried
+    def test_fallback_when_unsupported(self):
+        calls = []
+        def unsupported(source, destination):
+            calls.append(source)
+            raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+        original = transfer.transfer_functions["reflink"]
+        transfer.transfer_functions["reflink"] = unsupported
+        try:
+            dest = os.path.join(self.root, "docs")
+            with FileTransfer("reflink", 4) as file_transfer:
+                copy_directory(self.source, dest, transfer=file_transfer)
+        finally:
+            transfer.transfer_functions["reflink"] = original
+        self.assertEqual(file_transfer.failed, [])
+        self.assertIn("reflink", file_transfer.unsupported)
+        self.assertEqual(file_transfer.counts["reflink"], 0)
+        self.assertLess(len(calls), 21)
+        self.assertEqual(self.read(os.path.join(dest, "index.css")), "body {}")
+
+    # test an invalid mode raises error
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            FileTransfer("teleport")
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+# import the necessary modules
+import os
+import gzip
+import unittest
+from links import LinkIndex
+from manifest import BuildManifest
+from generate_content import generate_page_recursive
+from watch import SiteWatcher, PollingWatcher, FULL_REBUILD
+from site_test_case import SiteTestCase
+
+# define the test case class
+class TestSiteWatcher(SiteTestCase):
+    # build a small site in a temporary directory
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+
+        manifest = BuildManifest.load(self.dest, "/")
+        generate_page_recursive(self.content, self.template, self.dest, "/", manifest)
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.dest, "/", manifest)
+
+    # test a markdown change re-renders only that page
+    def test_page_change(self):
+        post = os.path.join(self.dest, "blog", "post.html")
+        index_mtime = os.stat(os.path.join(self.dest, "index.html")).st_mtime_ns
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Edited")
+        self.assertEqual(self.watcher.rebuild({os.path.join(self.content, "blog", "post.md")}), (1, 0))
+        self.assertEqual(self.read(post), "<title>Edited</title><div><h1>Edited</h1></div>")
+        self.assertEqual(os.stat(os.path.join(self.dest, "index.html")).st_mtime_ns, index_mtime)
+
+    # test deleting a markdown file removes its page
+    def test_page_deleted(self):
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.watcher.rebuild({os.path.join(self.content, "blog", "post.md")})
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post.html")))
+        self.assertEqual(len(self.watcher.manifest.pages), 1)
+
+    # test a template change re-renders every page without touching static files
+    def test_template_change(self):
+        self.write(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+        self.assertEqual(self.watcher.rebuild({self.template}), (2, 0))
+        self.assertEqual(self.read(os.path.join(self.dest, "index.html")), "<h2>Home</h2><div><h1>Home</h1></div>")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+
+    # test a page deleted along with a template change loses its output
+    def test_template_change_and_deletion(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        os.remove(post)
+        self.write(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+        with self.assertLogs(level="INFO"):
+            self.assertEqual(self.watcher.rebuild({self.template, post}), (1, 0))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post.html")))
+        self.assertNotIn(post, self.watcher.manifest.pages)
+
+    # test a static change copies only that file
+    def test_static_change(self):
+        stylesheet = os.path.join(self.static, "index.css")
+        self.assertEqual(self.watcher.rebuild({stylesheet}), (0, 1))
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), "body {}")
+        self.assertEqual(self.watcher.manifest.static, ["index.css"])
+
+        # deleting it removes the copy
+        os.remove(stylesheet)
+        self.watcher.rebuild({stylesheet})
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+
+    # test a rebuild checks the links of the pages it affects and leaves the manifest to be written later
+    def test_links_and_save(self):
+        self.watcher.links = LinkIndex(self.dest)
+        self.watcher.links.report()
+        index = os.path.join(self.content, "index.md")
+        self.write(index, "# Home\n\n[post](/blog/post)")
+        with self.assertLogs(level="INFO") as logs:
+            self.watcher.rebuild({index})
+        self.assertIn("Checked the links of 1 changed pages: 0 broken in the site.", logs.output[-1])
+
+        # deleting the page breaks the link to it
+        post = os.path.join(self.content, "blog", "post.md")
+        os.remove(post)
+        with self.assertLogs(level="WARNING") as logs:
+            self.watcher.rebuild({post})
+        self.assertIn("Broken link in index.html: /blog/post", logs.output[0])
+
+        self.assertFalse(os.path.exists(self.watcher.manifest.path))
+        self.watcher.flush()
+        self.assertEqual(BuildManifest.load(self.dest, "/").previous_outputs, {index: os.path.join(self.dest, "index.html")})
+
+    # test a static file that can not be copied is logged without stopping the rebuild
+    def test_static_error(self):
+        os.makedirs(os.path.join(self.static, "css"))
+        stylesheet = os.path.join(self.static, "css", "site.css")
+        self.write(stylesheet, "body {}")
+        self.write(os.path.join(self.dest, "css"), "not a directory")
+        with self.assertLogs(level="ERROR") as logs:
+            self.assertEqual(self.watcher.rebuild({stylesheet, os.path.join(self.static, "index.css")}), (0, 1))
+        self.assertIn("Error copying file", logs.output[0])
+        self.assertEqual(self.watcher.manifest.static, ["index.css"])
+
+    # test lost events rebuild everything
+    def test_full_rebuild(self):
+        self.assertEqual(self.watcher.rebuild({FULL_REBUILD}), (2, 1))
+
+    # test the polling watcher reports changed files
+    def test_polling_watcher(self):
+        watcher = PollingWatcher([self.content, self.template])
+        path = os.path.join(self.content, "new.md")
+        self.write(path, "# New")
+        self.assertEqual(watcher.changes(1), {path})
+        self.assertEqual(watcher.changes(0), set())
+
+    # test a rebuild refreshes the compressed siblings of the pages it changes and removes those of deleted pages
+    def test_precompress(self):
+        self.watcher.precompress_min_size = 0
+        post = os.path.join(self.content, "blog", "post.md")
+        output = os.path.join(self.dest, "blog", "post.html")
+        self.write(post, "# Post\n\nEdited")
+        self.watcher.rebuild({post})
+        with gzip.open(output + ".gz", "rt", encoding="utf-8") as file:
+            self.assertEqual(file.read(), self.read(output))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.html.gz")))
+
+        os.remove(post)
+        self.watcher.rebuild({post})
+        self.assertFalse(os.path.exists(output + ".gz"))
+
+
+# run the tests if this script is executed
+if __name__ == "__main__":
+    unittest.main()
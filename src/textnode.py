@@ -13,6 +13,9 @@ class TextType(Enum):
 
 # text node class
 class TextNode:
+    # fixed attributes instead of a per-instance __dict__, every inline run creates a text node
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -0,0 +1,62 @@
+# import necessary modules
+import os
+import json
+import time
+import logging
+import threading
+import contextlib
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# tracer recording spans while tracing is on, None while it is off
+active = None
+
+# context manager returned by span() while tracing is off - shared so no span is ever allocated
+null_span = contextlib.nullcontext()
+
+# records timed spans as chrome trace events (viewable in chrome://tracing or ui.perfetto.dev)
+class Tracer:
+    # constructor
+    def __init__(self):
+        self.events = []
+        self.pid = os.getpid()
+
+    # record how long the body of a with block takes
+    @contextlib.contextmanager
+    def span(self, name, category="build", **args):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            # complete event with microsecond timestamp and duration
+            event = {"name": name, "cat": category, "ph": "X", "ts": start / 1000, "dur": (end - start) / 1000,
+                     "pid": self.pid, "tid": threading.get_ident()}
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    # write the recorded events as a chrome trace file
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, trace_file)
+        logging.info(f"Wrote {len(self.events)} trace events to {path}")
+
+# start recording spans, returning the tracer
+def start():
+    global active
+    active = Tracer()
+    return active
+
+# stop recording spans, returning the tracer that was active
+def stop():
+    global active
+    tracer, active = active, None
+    return tracer
+
+# time a phase of the build if tracing is on
+def span(name, category="build", **args):
+    if active is None:
+        return null_span
+    return active.span(name, category, **args)
@@ -0,0 +1,169 @@
+# import necessary modules
+import os
+import errno
+import shutil
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# ioctl request to clone a file's extents (linux/fs.h), shared with the source until either is modified
+FICLONE = 0x40049409
+
+# errors that mean a technique is not supported here, rather than that the copy failed
+unsupported_errors = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTTY, errno.EPERM}
+
+# techniques tried in order for each transfer mode - each falls back to the next when unsupported
+TRANSFER_MODES = {
+    "auto": ("reflink", "zerocopy", "copy"),
+    "copy": ("copy",),
+    "zerocopy": ("zerocopy", "copy"),
+    "reflink": ("reflink", "zerocopy", "copy"),
+    "hardlink": ("hardlink", "copy"),
+}
+
+# copy a file in userspace, preserving metadata
+def copy_file_standard(source, destination):
+    shutil.copy2(source, destination)
+
+# copy a file inside the kernel with copy_file_range, or sendfile where that is not available
+def copy_file_zerocopy(source, destination):
+    with open(source, "rb") as source_file, open(destination, "wb") as destination_file:
+        source_fd, destination_fd = source_file.fileno(), destination_file.fileno()
+        remaining = os.fstat(source_fd).st_size
+        copy = os.copy_file_range if hasattr(os, "copy_file_range") else None
+        offset = 0
+        while remaining > 0:
+            if copy is not None:
+                sent = copy(source_fd, destination_fd, remaining)
+            else:
+                sent = os.sendfile(destination_fd, source_fd, offset, remaining)
+                offset += sent
+            # stop if the kernel copied nothing, e.g. the file shrank while copying
+            if sent == 0:
+                break
+            remaining -= sent
+    shutil.copystat(source, destination)
+
+# clone a file's extents on copy-on-write filesystems (btrfs, xfs, ...)
+def copy_file_reflink(source, destination):
+    import fcntl
+    with open(source, "rb") as source_file, open(destination, "wb") as destination_file:
+        fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+    shutil.copystat(source, destination)
+
+# hardlink a file - only suitable for local previews, as the output shares the source's inode
+def copy_file_hardlink(source, destination):
+    os.link(source, destination)
+
+# function for each technique
+transfer_functions = {
+    "copy": copy_file_standard,
+    "zerocopy": copy_file_zerocopy,
+    "reflink": copy_file_reflink,
+    "hardlink": copy_file_hardlink,
+}
+
+# transfers static files with a pluggable technique across a bounded pool of threads
+class FileTransfer:
+    # constructor
+    def __init__(self, mode="auto", workers=1):
+        # check the transfer mode is known
+        if mode not in TRANSFER_MODES:
+            raise ValueError(f"Invalid transfer mode: {mode}")
+
+        self.mode = mode
+        self.techniques = TRANSFER_MODES[mode]
+        self.unsupported = set() # techniques that failed as unsupported, skipped from then on
+        self.counts = {technique: 0 for technique in self.techniques} # files transferred per technique
+        self.failed = [] # (source, destination, key, error) for each failed transfer
+        self.lock = threading.Lock()
+
+        # run transfers inline for a single worker, otherwise on a thread pool
+        # with a bounded number of transfers in flight to cap memory use
+        self.executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        self.slots = threading.BoundedSemaphore(workers * 4)
+        self.pending = set() # queued transfers not yet finished
+
+    # transfer one file, falling back through the mode's techniques
+    def transfer(self, source, destination):
+        # remove any existing destination first, it may be a hardlink sharing the source's inode
+        if os.path.lexists(destination):
+            os.remove(destination)
+
+        for technique in self.techniques:
+            # skip techniques already known not to work, but always allow the final fallback
+            if technique in self.unsupported and technique != self.techniques[-1]:
+                continue
+            try:
+                transfer_functions[technique](source, destination)
+            except OSError as e:
+                # fall back to the next technique if this one is not supported here
+                if e.errno in unsupported_errors and technique != self.techniques[-1]:
+                    with self.lock:
+                        if technique not in self.unsupported:
+                            logging.info(f"Transfer technique '{technique}' not supported ({e.strerror}) - falling back")
+                            self.unsupported.add(technique)
+                    if os.path.lexists(destination):
+                        os.remove(destination)
+                    continue
+                raise
+            with self.lock:
+                self.counts[technique] += 1
+            return technique
+
+    # transfer a file now or on the pool, recording failures under the given key
+    def submit(self, source, destination, key=None):
+        # run inline without a pool
+        if self.executor is None:
+            self.run(source, destination, key)
+            return
+
+        # wait for a free slot before queueing more work
+        self.slots.acquire()
+        future = self.executor.submit(self.run, source, destination, key)
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self.finished)
+
+    # release the slot of a finished transfer
+    def finished(self, future):
+        with self.lock:
+            self.pending.discard(future)
+        self.slots.release()
+
+    # transfer a file, logging the outcome
+    def run(self, source, destination, key):
+        try:
+            technique = self.transfer(source, destination)
+            # log the file copying for debugging
+            logging.info(f"Copied file ({technique}): {source} to {destination}")
+        # log any errors encountered during file copying
+        except Exception as e:
+            logging.error(f"Error copying file: {source} to {destination} - {e}")
+            with self.lock:
+                self.failed.append((source, destination, key, e))
+
+    # wait for every queued transfer to finish, returning the failed transfers
+    def wait(self):
+        with self.lock:
+            pending = list(self.pending)
+        wait(pending)
+        return self.failed
+
+    # wait for every queued transfer to finish and shut down the pool
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        return self.failed
+
+    # support use as a context manager
+    def __enter__(self):
+        return self
+
+    # close the transfer when leaving the context
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,462 @@
+# import necessary modules
+import os
+import time
+import errno
+import ctypes
+import select
+import struct
+import logging
+from copy_directory import sync_directory
+from fingerprint import collect_assets, update_fingerprinted_assets
+from generate_content import generate_page, generate_page_recursive, page_output_path
+from links import LinkIndex
+from listings import listing_output_path
+from layouts import Layouts
+from manifest import BuildManifest
+from precompress import precompress_directory, precompress_files
+from transfer import FileTransfer
+
+# configure logging for debugging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# seconds without further events before a burst of changes is rebuilt
+DEBOUNCE_SECONDS = 0.02
+
+# seconds between scans when polling for changes
+POLL_INTERVAL = 0.1
+
+# seconds without further changes before the manifest of the rebuilds is written - writing it after every
+# rebuild would take longer than the rebuild itself on a large site
+SAVE_DELAY_SECONDS = 2.0
+
+# marker reported when events were lost and everything must be rebuilt
+FULL_REBUILD = object()
+
+# inotify event flags (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+# events that mean a watched entry changed
+watch_mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# size of the fixed part of an inotify event - wd, mask, cookie, name length
+event_header = struct.Struct("iIII")
+
+# check if a path is a hidden file or inside a hidden directory, relative to a root
+def is_hidden(path, root):
+    return any(part.startswith('.') for part in os.path.relpath(path, root).split(os.sep))
+
+# record the modification time and size of every file under the given paths
+def take_snapshot(paths):
+    snapshot = {}
+    stack = list(paths)
+    while stack:
+        path = stack.pop()
+        try:
+            if os.path.isdir(path):
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            stack.append(entry.path)
+                        else:
+                            stat = entry.stat()
+                            snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            elif os.path.exists(path):
+                stat = os.stat(path)
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        # entries may disappear while scanning
+        except FileNotFoundError:
+            continue
+    return snapshot
+
+# watcher that finds changes by comparing snapshots of the watched files
+class PollingWatcher:
+    # constructor
+    def __init__(self, paths):
+        self.paths = paths
+        self.snapshot = take_snapshot(paths)
+
+    # wait up to timeout seconds (forever if None) for changes, returning the changed paths
+    def changes(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # sleep for a poll interval, or whatever is left of the timeout
+            delay = POLL_INTERVAL if deadline is None else min(POLL_INTERVAL, max(0, deadline - time.monotonic()))
+            time.sleep(delay)
+
+            # compare the current files with the previous snapshot
+            current = take_snapshot(self.paths)
+            changed = {path for path in current.keys() | self.snapshot.keys() if current.get(path) != self.snapshot.get(path)}
+            self.snapshot = current
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    # nothing to release
+    def close(self):
+        pass
+
+# watcher that receives change events from the linux kernel through inotify
+class InotifyWatcher:
+    # constructor - raises OSError if inotify is not available
+    def __init__(self, paths):
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.directories = {} # watch descriptor -> directory path
+        self.files = set() # individual files watched through their parent directory
+        self.file_directories = set() # parent directories watched only for those files
+        for path in paths:
+            if os.path.isdir(path):
+                self.add_tree(path)
+            else:
+                directory = os.path.dirname(path) or "."
+                self.files.add(os.path.normpath(path))
+                self.file_directories.add(directory)
+                self.add_directory(directory)
+
+    # watch a single directory
+    def add_directory(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), watch_mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.directories[wd] = path
+
+    # watch a directory and every directory below it, returning the files found
+    def add_tree(self, path):
+        found = set()
+        for dirpath, dirnames, filenames in os.walk(path):
+            self.add_directory(dirpath)
+            found.update(os.path.join(dirpath, filename) for filename in filenames)
+        return found
+
+    # check if a path is watched - everything in watched trees, only the named files elsewhere
+    def is_watched(self, path, directory):
+        return directory not in self.file_directories or os.path.normpath(path) in self.files
+
+    # wait up to timeout seconds (forever if None) for changes, returning the changed paths
+    def changes(self, timeout=None):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        # read every pending event
+        changed = set()
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = event_header.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + event_header.size:offset + event_header.size + length].rstrip(b"\0"))
+            offset += event_header.size + length
+
+            # events were dropped, so the caller has to rebuild everything
+            if mask & IN_Q_OVERFLOW:
+                changed.add(FULL_REBUILD)
+                continue
+
+            # forget directories that were removed
+            if mask & IN_IGNORED:
+                self.directories.pop(wd, None)
+                continue
+
+            directory = self.directories.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, name)
+            if not self.is_watched(path, directory):
+                continue
+            changed.add(path)
+
+            # watch new directories, reporting the files already inside them
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                changed.update(self.add_tree(path))
+        return changed
+
+    # stop watching
+    def close(self):
+        os.close(self.fd)
+
+# create the most efficient watcher available for the paths
+def create_watcher(paths):
+    try:
+        return InotifyWatcher(paths)
+    except (OSError, AttributeError) as e:
+        logging.info(f"inotify unavailable ({e}) - polling for changes every {POLL_INTERVAL}s")
+        return PollingWatcher(paths)
+
+# watches the site sources and rebuilds only what each change affects
+class SiteWatcher:
+    # constructor
+    def __init__(self, content_path, static_path, template_path, dest_path, base_path, manifest, jobs=1, cache=None,
+                 block_cache=None, assets=None, links=None, listings=None, search_index=None, layouts=None,
+                 precompress_min_size=None):
+        self.content_path = content_path
+        self.static_path = static_path
+        self.template_path = template_path
+        self.dest_path = dest_path
+        self.base_path = base_path
+        self.manifest = manifest
+        self.jobs = jobs
+        self.cache = cache
+        self.block_cache = block_cache # kept in memory across rebuilds
+        self.assets = assets # fingerprinted asset map, None when not fingerprinting
+        self.links = links # link index checked after each rebuild, None to skip checking
+        self.listings = listings # renderer of the archive and tag pages, None when not generating listings
+        self.search_index = search_index # full-text search index, None when not indexing
+        self.layouts = layouts or Layouts(template_path, base_path, assets) # templates compiled since the last change
+        self.precompress_min_size = precompress_min_size # smallest file to precompress, None when not precompressing
+        self.transfer = FileTransfer("auto")
+        self.unsaved = False # whether the manifest has changes that are not written yet
+        self.touched = set() # output files written or removed by the current rebuild
+
+    # check if a path is inside a directory
+    def is_under(self, path, directory):
+        path, directory = os.path.abspath(path), os.path.abspath(directory)
+        return path == directory or path.startswith(directory + os.sep)
+
+    # rebuild everything affected by a set of changed paths, returning (pages rendered, static files changed)
+    def rebuild(self, changed):
+        # rebuild everything if events were lost
+        everything = FULL_REBUILD in changed
+        if everything:
+            changed = {self.template_path, self.static_path}
+
+        template_changed = any(os.path.abspath(path) == os.path.abspath(self.template_path)
+                               or self.is_under(path, self.layouts.directory) for path in changed)
+        pages = sorted(path for path in changed if self.is_under(path, self.content_path)
+                       and not is_hidden(path, self.content_path))
+        static = sorted(path for path in changed if self.is_under(path, self.static_path))
+
+        self.touched = set()
+        copied = sum(self.sync_static(path) for path in static)
+
+        # a changed asset gets a new fingerprint, which every page referencing it must pick up
+        if static and self.assets is not None:
+            assets = collect_assets(self.static_path)
+            update_fingerprinted_assets(self.dest_path, assets)
+            if assets != self.assets:
+                self.assets = assets
+                template_changed = True
+
+        # a template change re-renders the pages using it but leaves static files alone
+        if template_changed:
+            rendered = self.rebuild_templates(everything)
+        else:
+            rendered = sum(self.rebuild_page(path) for path in pages)
+        self.unsaved = True
+
+        # re-render the listing pages affected by the changed pages
+        if self.listings is not None:
+            self.listings.render()
+            if self.links is not None:
+                for url in self.listings.written:
+                    self.links.add_output(listing_output_path(self.dest_path, url))
+                for url in self.listings.removed:
+                    self.links.remove_output(listing_output_path(self.dest_path, url))
+            self.touched.update(listing_output_path(self.dest_path, url)
+                                for url in self.listings.written + self.listings.removed)
+
+        # rewrite the search index shards of the changed pages
+        if self.search_index is not None:
+            self.search_index.save()
+
+        # bring the compressed siblings of the changed outputs up to date - a template change may have re-rendered
+        # any page, so the whole output is checked, as is the search index, whose shards are not tracked
+        if self.precompress_min_size is not None:
+            if template_changed:
+                precompress_directory(self.dest_path, self.precompress_min_size, skip_fresh=True)
+            else:
+                if self.search_index is not None:
+                    precompress_directory(self.search_index.directory, self.precompress_min_size, skip_fresh=True)
+                precompress_files(self.touched, self.precompress_min_size)
+
+        # check the links of the changed pages, and of the pages linking to outputs that were added or removed
+        if self.links is not None:
+            self.links.report()
+        return rendered, copied
+
+    # write the manifest if rebuilds changed it since it was last written
+    def flush(self):
+        if self.unsaved:
+            self.manifest.save()
+            self.unsaved = False
+
+    # recompile the templates and re-render the pages whose template or partials changed, or every page if
+    # everything is set - pages whose layout fails to compile keep their previous output
+    def rebuild_templates(self, everything=False):
+        self.layouts = Layouts(self.template_path, self.base_path, self.assets)
+
+        # check every page against the template hashes recorded in the manifest, which also re-renders every page
+        # when the asset fingerprints changed
+        self.manifest.save()
+        self.unsaved = False
+        manifest = BuildManifest.load(self.dest_path, self.base_path, self.assets)
+        if everything:
+            manifest.previous = {}
+        if self.links is not None:
+            self.links = LinkIndex(self.dest_path, self.base_path)
+        page_index = None
+        if self.listings is not None:
+            self.listings.layouts, self.listings.build_hash = self.layouts, manifest.build_hash
+            page_index = self.listings.page_index
+        rendered = generate_page_recursive(self.content_path, self.template_path, self.dest_path, self.base_path,
+                                           manifest, self.jobs, self.cache, self.block_cache, self.assets,
+                                           links=self.links, page_index=page_index, search_index=self.search_index,
+                                           layouts=self.layouts)
+
+        # remove the outputs of pages deleted in the same burst of changes, as a full build does
+        manifest.remove_stale()
+        self.manifest = manifest
+        return rendered or 0
+
+    # re-render a single page, or remove the outputs of a deleted page or directory
+    def rebuild_page(self, path):
+        # a new directory renders every page inside it
+        if os.path.isdir(path):
+            return sum(self.rebuild_page(os.path.join(dirpath, filename))
+                       for dirpath, _, filenames in os.walk(path) for filename in filenames
+                       if not is_hidden(os.path.join(dirpath, filename), self.content_path))
+
+        # a deleted source removes its output
+        if not os.path.isfile(path):
+            for output in self.manifest.remove_source(path):
+                self.touched.add(output)
+                if self.links is not None:
+                    self.links.remove_page(output)
+                if self.search_index is not None:
+                    self.search_index.remove_page(output)
+            if self.listings is not None:
+                self.listings.page_index.remove(path)
+            return 0
+
+        output = page_output_path(self.content_path, self.dest_path, path)
+        try:
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+            page_links, summary = [], {}
+            template_path = self.layouts.page_template(self.content_path, path)
+            if generate_page(path, template_path, output, self.base_path, self.layouts.get(template_path),
+                             cache=self.cache, block_cache=self.block_cache, links=page_links, summary=summary,
+                             search_terms=self.search_index is not None):
+                self.manifest.record(path, output, page_links, (template_path, self.layouts.hash(template_path)))
+                self.touched.add(output)
+                if self.links is not None:
+                    self.links.add_page(output, page_links)
+                if self.listings is not None:
+                    self.listings.page_index.update(path, output, summary)
+                if self.search_index is not None:
+                    self.search_index.add_page(output, summary["title"], summary["terms"])
+                return 1
+        # handle any errors during page generation
+        except Exception as e:
+            logging.error(f"Error generating page for {path}: {e}")
+        return 0
+
+    # copy a single changed static file or directory, or remove a deleted one - files may be renamed or deleted
+    # again before they are copied, which is logged and left to the event that follows
+    def sync_static(self, path):
+        relative = os.path.relpath(path, self.static_path)
+        destination = os.path.join(self.dest_path, relative)
+
+        # a new or moved directory is synced as a whole
+        if os.path.isdir(path):
+            try:
+                result = sync_directory(path, destination, transfer=self.transfer)
+            # handle any errors while syncing the directory
+            except OSError as e:
+                logging.error(f"Error syncing directory: {path} to {destination} - {e}")
+                return 0
+            self.manifest.static = sorted(set(self.manifest.static) | {os.path.join(relative, file) for file in result.files})
+            if self.links is not None:
+                for file in result.copied:
+                    self.links.add_output(os.path.join(destination, file))
+            self.touched.update(os.path.join(destination, file) for file in result.copied + result.removed)
+            return len(result.copied)
+
+        # a changed file is transferred on its own
+        if os.path.isfile(path):
+            try:
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                self.transfer.transfer(path, destination)
+            # handle any errors while copying the file
+            except OSError as e:
+                logging.error(f"Error copying file: {path} to {destination} - {e}")
+                return 0
+            if relative not in self.manifest.static:
+                self.manifest.static = sorted(self.manifest.static + [relative])
+            if self.links is not None:
+                self.links.add_output(destination)
+            self.touched.add(destination)
+            logging.info(f"Copied file: {path} to {destination}")
+            return 1
+
+        # a deleted file or directory removes what was synced from it, keeping files that could not be removed
+        # in the manifest so they are removed later
+        removed = [file for file in self.manifest.static if file == relative or file.startswith(relative + os.sep)]
+        for file in list(removed):
+            file_path = os.path.join(self.dest_path, file)
+            if os.path.lexists(file_path):
+                try:
+                    os.remove(file_path)
+                # handle any errors while removing the file
+                except OSError as e:
+                    logging.error(f"Error removing file: {file_path} - {e}")
+                    removed.remove(file)
+                    continue
+                logging.info(f"Removed file: {file_path}")
+            self.touched.add(file_path)
+            if self.links is not None:
+                self.links.remove_output(file_path)
+        self.manifest.static = [file for file in self.manifest.static if file not in removed]
+        return len(removed)
+
+    # watch for changes until interrupted, rebuilding after each burst of events
+    def run(self):
+        watcher = create_watcher([self.content_path, self.static_path, self.template_path, self.layouts.directory])
+        logging.info("Watching for changes - press Ctrl+C to stop.")
+        try:
+            while True:
+                # write the manifest once the changes have stopped for a while
+                changed = watcher.changes(SAVE_DELAY_SECONDS if self.unsaved else None)
+                if not changed:
+                    self.flush()
+                    continue
+
+                # wait for the burst of events to settle before rebuilding
+                while True:
+                    more = watcher.changes(DEBOUNCE_SECONDS)
+                    if not more:
+                        break
+                    changed |= more
+
+                # a failed rebuild is logged and the watcher keeps going, the next change rebuilds again
+                start = time.perf_counter()
+                try:
+                    rendered, copied = self.rebuild(changed)
+                except Exception as e:
+                    logging.error(f"Error rebuilding after changes to {len(changed)} paths: {e}")
+                    continue
+                elapsed = (time.perf_counter() - start) * 1000
+                logging.info(f"Rebuilt {rendered} pages and {copied} static files in {elapsed:.1f} ms.")
+                if self.block_cache is not None:
+                    self.block_cache.log_stats()
+        except KeyboardInterrupt:
+            logging.info("Stopped watching.")
+        finally:
+            watcher.close()
+            self.flush()
+            # keep the rendered blocks for the next session
+            if self.block_cache is not None:
+                self.block_cache.save()